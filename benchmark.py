@@ -0,0 +1,639 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from timeseries_module.loader import load_dataset
+from timeseries_module.pipeline import run_pipeline
+from timeseries_module.missing_values import methods as mv_methods
+from timeseries_module.outliers import methods as outlier_methods
+from timeseries_module.rolling import methods as rolling_methods
+from timeseries_module.outliers.interface import handle_outliers
+from timeseries_module.rolling.interface import compute_rolling
+
+DATA_DIR = Path(__file__).parent / "data"
+DEFAULT_HISTORY = Path(__file__).parent / "output" / "benchmarks" / "history.json"
+DEFAULT_SIZES = "1e3,1e4,1e5,1e6"
+DEFAULT_TABLE_SIZES = "1e5,1e6,1e7"
+
+# Shipped datasets: file name -> (time column, value column)
+DATASETS = {
+    "4threads.csv": ("time", "cpu_utilization_percent"),
+    "6threads.csv": ("time", "cpu_utilization_percent"),
+    "data1.csv": ("date", "value"),
+    "data2.csv": ("date", "value"),
+    "data3.csv": ("date", "value"),
+    "data4.csv": ("date", "value"),
+    "data5.csv": ("date", "value"),
+    "data6.csv": ("date", "value"),
+    "data8.csv": ("Date", "Value"),
+    "outliers_data.csv": ("date", "value"),
+    "seasonal_daily_2025.csv": ("Date", "Value"),
+    "trend_daily_2025.csv": ("Date", "Value"),
+    "temperature_2014_18.csv": ("datetime", "Temperature"),
+    "solar_data_khulna_from_jan_2014_to_nov_2022.csv": ("datetime", "Irradiance"),
+}
+
+# Methods whose cost grows faster than the rest are capped to keep a sweep finishing.
+MAX_POINTS = {
+    "remove_outliers_lof": 100_000,
+    "remove_outliers_linear_regression": 1_000_000,
+}
+
+
+def parse_sizes(text: str) -> list[int]:
+    """
+    Accepts a comma separated list of sizes, e.g. "1e3,1e4,50000".
+    """
+    sizes = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        n = int(float(part))
+        if n <= 0:
+            raise ValueError(f"Size must be > 0, got '{part}'")
+        sizes.append(n)
+    if not sizes:
+        raise ValueError("At least one size is required")
+    return sorted(set(sizes))
+
+
+def synthetic_series(n: int, nan_rate: float = 0.01, outlier_rate: float = 0.005, seed: int = 0) -> pd.DataFrame:
+    """
+    Build a per-second series of `n` points: daily sine + noise, with a
+    fraction of NaNs and spiky outliers injected at random positions.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    values = 50 + 20 * np.sin(2 * np.pi * t / 86_400) + rng.normal(0, 2, n)
+
+    n_out = int(n * outlier_rate)
+    if n_out:
+        idx = rng.choice(n, n_out, replace=False)
+        values[idx] += rng.choice([-1, 1], n_out) * rng.uniform(30, 60, n_out)
+
+    n_nan = int(n * nan_rate)
+    if n_nan:
+        values[rng.choice(n, n_nan, replace=False)] = np.nan
+
+    return pd.DataFrame({
+        "date_time": pd.date_range("2025-01-01", periods=n, freq="s", tz="UTC"),
+        "reading": values,
+    })
+
+
+def load_shipped_datasets() -> dict:
+    """
+    Read every shipped CSV in `data/` that has a known layout.
+    Returns name -> (df, time_column, value_column).
+    """
+    out = {}
+    for name, (time_col, value_col) in DATASETS.items():
+        path = DATA_DIR / name
+        if not path.exists():
+            continue
+        # Layout and timestamp format are detected; later runs reuse the binary sidecar
+        df = load_dataset(path)
+        out[name] = (df, time_col, value_col)
+    return out
+
+
+def build_cases() -> list[tuple[str, str, callable]]:
+    """
+    Every benchmarked callable as (group, name, fn(df, value_column, time_column)).
+    New methods are picked up from the `methods` packages automatically.
+    """
+    cases = []
+    for name in mv_methods.__all__:
+        if name in mv_methods.GRID_FUNCTIONS:
+            continue
+        fn = getattr(mv_methods, name)
+        cases.append(("missing_values", name, lambda df, v, t, fn=fn: fn(df, v)))
+    cases.append((
+        "missing_values", "resample_regular",
+        lambda df, v, t: mv_methods.resample_regular(df, v, t, fill=mv_methods.linear_interpolation, max_gap="1h"),
+    ))
+
+    for name in outlier_methods.__all__:
+        if not name.startswith("remove_outliers_"):
+            continue
+        fn = getattr(outlier_methods, name)
+        cases.append((
+            "outliers", name,
+            lambda df, v, t, fn=fn: handle_outliers(df, fn, value_column=v, sensitivity_degree="medium", time_column=t),
+        ))
+
+    for name in rolling_methods.__all__:
+        # Single-series methods only (cov/corr/beta/pairwise need a second series)
+        if not name.startswith("rolling_") or name in rolling_methods.CROSS_SERIES:
+            continue
+        fn = getattr(rolling_methods, name)
+        cases.append(("rolling", name, lambda df, v, t, fn=fn: compute_rolling(df, fn, value_column=v)))
+
+    cases.append((
+        "pipeline", "run_pipeline",
+        lambda df, v, t: run_pipeline(
+            input_df=df,
+            output_path="",
+            outlier_sensitivity_degree="medium",
+            value_column=v,
+            missing_value_function=mv_methods.linear_interpolation,
+            outlier_fn=outlier_methods.remove_outliers_zscore,
+            time_column=t,
+            rolling_fn=rolling_methods.rolling_mean,
+            export=False,
+        ),
+    ))
+    return cases
+
+
+def measure(fn, repeat: int) -> dict:
+    """
+    Time `fn` (best of `repeat`) and measure its peak traced allocation in a separate run,
+    so the tracemalloc overhead never leaks into the timings.
+    A failing case is recorded with its error instead of aborting the whole sweep.
+    """
+    try:
+        fn()
+    except Exception as e:
+        return {"seconds": None, "median_seconds": None, "peak_bytes": None, "error": f"{type(e).__name__}: {e}"}
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": min(timings), "median_seconds": float(np.median(timings)), "peak_bytes": peak}
+
+
+def measure_once(fn) -> dict:
+    """
+    Single traced run for steps with side effects (DB writes), where repeating
+    would change the data being measured. Timings include tracemalloc overhead.
+    """
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        fn()
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    except Exception as e:
+        return {"seconds": None, "median_seconds": None, "peak_bytes": None, "error": f"{type(e).__name__}: {e}"}
+    finally:
+        tracemalloc.stop()
+    return {"seconds": seconds, "median_seconds": seconds, "peak_bytes": peak}
+
+
+def scaling_exponent(points: list[dict]) -> float | None:
+    """
+    Slope of log(seconds) vs log(n): ~1.0 is linear, ~2.0 quadratic.
+    """
+    pts = [(p["n"], p["seconds"]) for p in points if p["seconds"]]
+    if len(pts) < 2:
+        return None
+    x, y = np.log([p[0] for p in pts]), np.log([p[1] for p in pts])
+    return float(np.polyfit(x, y, 1)[0])
+
+
+def run_memory_benchmarks(sizes, nan_rate, outlier_rate, repeat, only=None, datasets=True) -> list[dict]:
+    results = []
+    cases = [c for c in build_cases() if only is None or c[1] in only or c[0] in only]
+
+    for group, name, fn in cases:
+        curve = []
+        for n in sizes:
+            if n > MAX_POINTS.get(name, n):
+                continue
+            df = synthetic_series(n, nan_rate=nan_rate, outlier_rate=outlier_rate)
+            r = measure(lambda: fn(df, "reading", "date_time"), repeat if n < 1_000_000 else 1)
+            r.update({"n": n, "rows_per_sec": n / r["seconds"] if r["seconds"] else None})
+            curve.append(r)
+            if "error" in r:
+                print(f"[{group}] {name:<36} n={n:<10} FAILED: {r['error']}", file=sys.stderr)
+                break
+            print(f"[{group}] {name:<36} n={n:<10} {r['seconds'] * 1e3:10.2f} ms "
+                  f"{r['peak_bytes'] / 2**20:9.1f} MiB")
+
+        if datasets:
+            for ds_name, (df, t, v) in load_shipped_datasets().items():
+                if len(df) > MAX_POINTS.get(name, len(df)):
+                    continue
+                r = measure(lambda: fn(df, v, t), repeat)
+                results.append({
+                    "group": group, "case": name, "input": ds_name, "n": len(df), **r,
+                    "rows_per_sec": len(df) / r["seconds"] if r["seconds"] else None,
+                })
+
+        results.append({
+            "group": group, "case": name, "input": "synthetic",
+            "nan_rate": nan_rate, "outlier_rate": outlier_rate,
+            "curve": curve, "scaling_exponent": scaling_exponent(curve),
+        })
+    return results
+
+
+def check_cross_series(n: int = 1_000_000, window: int = 50, tolerance: float = 1e-4) -> list[dict]:
+    """
+    Compare rolling_cov / rolling_corr / rolling_beta with pandas' Series.rolling().cov / corr
+    on a long trended pair with NaNs, where running sums are most prone to cancel.
+    A deviation above `tolerance` is recorded as the case's error (pandas' own online
+    updates drift by ~1e-5 on this series; differences of global cumsums reached ~1e-3).
+    """
+    rng = np.random.default_rng(0)
+    t = np.arange(n)
+    a = 0.01 * t + rng.normal(size=n)
+    b = 0.02 * t + 0.5 * a + rng.normal(size=n)
+    a[rng.choice(n, n // 100, replace=False)] = np.nan
+    df = pd.DataFrame({"a": a, "b": b})
+    roll = df["a"].rolling(window, min_periods=2)
+    # pandas' variance of b on the rows where a is present, for the beta reference
+    b_var = df["b"].where(df["a"].notna()).rolling(window, min_periods=2).var(ddof=0)
+    checks = {
+        "rolling_cov": (lambda: rolling_methods.rolling_cov(df, "a", "b", window, min_periods=2, ddof=1),
+                        roll.cov(df["b"])),
+        "rolling_corr": (lambda: rolling_methods.rolling_corr(df, "a", "b", window), roll.corr(df["b"])),
+        "rolling_beta": (lambda: rolling_methods.rolling_beta(df, "a", "b", window),
+                         roll.cov(df["b"], ddof=0) / b_var),
+    }
+    results = []
+    for name, (fn, expected) in checks.items():
+        start = time.perf_counter()
+        got = fn().iloc[:, -1]
+        seconds = time.perf_counter() - start
+        diff = float(np.nanmax(np.abs(got.to_numpy() - expected.to_numpy())))
+        r = {"group": "rolling", "case": name, "input": "trend-check", "n": n, "window": window,
+             "seconds": seconds, "max_abs_diff_vs_pandas": diff}
+        if not diff <= tolerance or not np.array_equal(got.isna(), expected.isna()):
+            r["error"] = f"differs from pandas by {diff:.3g} (tolerance {tolerance:g}) or in its NaNs"
+            print(f"[rolling] {name:<36} n={n:<10} FAILED: {r['error']}", file=sys.stderr)
+        else:
+            print(f"[rolling] {name:<36} n={n:<10} max |diff| vs pandas {diff:.2e}")
+        results.append(r)
+    return results
+
+
+# --------------------------------------------------------------------------
+# Throwaway local Postgres for the DB pipelines
+# --------------------------------------------------------------------------
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _pg_binary(name: str) -> str:
+    pg_bin = os.getenv("PG_BIN")
+    path = shutil.which(name, path=pg_bin) if pg_bin else shutil.which(name)
+    if path is None:
+        raise RuntimeError(f"'{name}' not found; put the Postgres binaries on PATH or set PG_BIN.")
+    return path
+
+
+class ThrowawayPostgres:
+    """
+    Start a private Postgres cluster in a temp directory (initdb + pg_ctl),
+    point the DB_* environment variables at it and remove it on exit.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.port = None
+
+    def __enter__(self):
+        self.root = Path(tempfile.mkdtemp(prefix="ts_bench_pg_"))
+        self.port = _free_port()
+        data = self.root / "data"
+        subprocess.run([_pg_binary("initdb"), "-D", str(data), "-U", "bench", "--auth=trust"],
+                       check=True, stdout=subprocess.DEVNULL)
+        subprocess.run([_pg_binary("pg_ctl"), "-D", str(data), "-l", str(self.root / "pg.log"), "-w",
+                        "-o", f"-p {self.port} -k {self.root} -c fsync=off", "start"],
+                       check=True, stdout=subprocess.DEVNULL)
+
+        os.environ.update({
+            "DB_NAME": "postgres", "DB_USER": "bench", "DB_PASSWORD": "",
+            "DB_HOST": "127.0.0.1", "DB_PORT": str(self.port),
+        })
+
+        from database.insertion import get_db_conn
+
+        schema_sql = (Path(__file__).parent / "database" / "schema.sql").read_text()
+        conn = get_db_conn()
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute('CREATE EXTENSION IF NOT EXISTS "uuid-ossp"')
+                    cur.execute(schema_sql)
+        finally:
+            conn.close()
+        return self
+
+    def __exit__(self, *exc):
+        subprocess.run([_pg_binary("pg_ctl"), "-D", str(self.root / "data"), "-m", "immediate", "stop"],
+                       stdout=subprocess.DEVNULL)
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def run_db_benchmarks(sizes, nan_rate, outlier_rate) -> list[dict]:
+    from database.insertion import get_db_conn, insert_job, insert_readings_batch
+    from database.outlier_io import read_hardware_usage
+    from outlier_pipeline import process_outliers
+    from rolling_pipeline import process_rolling_windows
+    from job_processor import process_job
+
+    results = []
+    with ThrowawayPostgres():
+        for n in sizes:
+            df = synthetic_series(n, nan_rate=nan_rate, outlier_rate=outlier_rate)
+            df["reading"] = df["reading"].clip(0, 100).round(4)
+
+            conn = get_db_conn()
+            try:
+                with conn:
+                    with conn.cursor() as cur:
+                        job_id = insert_job(cur, datetime.now(timezone.utc), "CPU", f"benchmark n={n}")
+                rows = [
+                    (dt.to_pydatetime(), None if pd.isna(v) else float(v), job_id)
+                    for dt, v in zip(df["date_time"], df["reading"])
+                ]
+
+                def insert():
+                    with conn:
+                        with conn.cursor() as cur:
+                            insert_readings_batch(cur, rows)
+
+                steps = {"insert_readings_batch": insert}
+                _run_db_steps(steps, n, results)
+            finally:
+                conn.close()
+
+            steps = {
+                "read_hardware_usage": lambda: read_hardware_usage(job_id=job_id),
+                "process_outliers": lambda: process_outliers(job_id=job_id),
+                "process_outliers_bitmap": lambda: process_outliers(job_id=job_id, storage="bitmap"),
+                "process_rolling_windows": lambda: process_rolling_windows(
+                    window_name="mean", value_column="reading", job_id=job_id),
+                # Same job and parameters again: the merge should write (almost) nothing
+                "process_rolling_windows_rerun": lambda: process_rolling_windows(
+                    window_name="mean", value_column="reading", job_id=job_id),
+                "process_rolling_windows_sql": lambda: process_rolling_windows(
+                    window_name="mean", value_column="reading", job_id=job_id, backend="sql"),
+                # Outliers + rolling mean from one read and one transaction
+                "process_job": lambda: process_job(job_id),
+            }
+            _run_db_steps(steps, n, results)
+            results += _outlier_storage_sizes(job_id, n)
+    return results
+
+
+def _outlier_storage_sizes(job_id: str, n: int) -> list[dict]:
+    """
+    On-disk bytes per job of the row-per-reading outlier table vs the bitmap.
+    """
+    from database.insertion import get_db_conn
+
+    conn = get_db_conn()
+    try:
+        with conn.cursor() as cur:
+            # Share of the partitioned table's size that belongs to this job
+            cur.execute(
+                """
+                SELECT (SELECT sum(pg_total_relation_size(relid)) FROM pg_partition_tree('public.outlier'))
+                       * (SELECT count(*) FROM public."outlier" WHERE job_id = %s)
+                       / greatest((SELECT count(*) FROM public."outlier"), 1)
+                """,
+                (job_id,),
+            )
+            rows_bytes = cur.fetchone()[0]
+            cur.execute('SELECT pg_column_size(o.*) FROM public."outlier_bitmap" o WHERE job_id = %s', (job_id,))
+            bitmap_bytes = cur.fetchone()[0]
+        conn.rollback()
+    finally:
+        conn.close()
+
+    out = []
+    for name, size in (("outlier_rows", rows_bytes), ("outlier_bitmap", bitmap_bytes)):
+        size = int(size or 0)
+        out.append({"group": "database", "case": f"{name}_bytes", "n": n, "bytes": size})
+        print(f"[database] {name + '_bytes':<33} n={n:<10} {size / 1024:10.1f} KiB")
+    return out
+
+
+def _run_db_steps(steps: dict, n: int, results: list[dict]) -> None:
+    for name, step in steps.items():
+        r = measure_once(step)
+        results.append({"group": "database", "case": name, "n": n, **r,
+                        "rows_per_sec": n / r["seconds"] if r["seconds"] else None})
+        if "error" in r:
+            print(f"[database] {name:<33} n={n:<10} FAILED: {r['error']}", file=sys.stderr)
+        else:
+            print(f"[database] {name:<33} n={n:<10} {r['seconds'] * 1e3:10.2f} ms")
+
+
+def run_db_scaling_benchmarks(table_sizes, job_rows: int = 10_000, chunk: int = 1_000_000) -> list[dict]:
+    """
+    Per-job read latency while hardware_usage grows around one fixed-size job.
+
+    The table is filled server-side (generate_series) with other jobs, one second
+    apart and spanning several months, so the reads exercise the (job_id, date_time)
+    index and monthly partition pruning rather than the table size.
+    """
+    from database.insertion import get_db_conn, insert_job
+    from database.outlier_io import read_hardware_usage
+    from database.partitions import ensure_partitions
+
+    fill_sql = """
+        INSERT INTO public."hardware_usage" (date_time, reading, job_id)
+        SELECT %(base)s + make_interval(secs => %(offset)s + g), round((random() * 100)::numeric, 4), %(job)s
+        FROM generate_series(0, %(n)s - 1) AS g
+    """
+
+    results = []
+    with ThrowawayPostgres():
+        # Filler spans (base, now); the measured job sits in the current month
+        span = max(table_sizes)
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        base = now - pd.Timedelta(seconds=span + job_rows).to_pytimedelta()
+        ensure_partitions(base, now + pd.Timedelta(seconds=job_rows).to_pytimedelta())
+
+        conn = get_db_conn()
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    job_id = insert_job(cur, now, "CPU", "benchmark read target")
+                    cur.execute(fill_sql, {"base": now, "offset": 0, "n": job_rows, "job": job_id})
+
+            filled = job_rows
+            for size in table_sizes:
+                while filled < size:
+                    n = min(chunk, size - filled)
+                    with conn:
+                        with conn.cursor() as cur:
+                            filler = insert_job(cur, base, "CPU", "benchmark filler")
+                            cur.execute(fill_sql, {"base": base, "offset": filled, "n": n, "job": filler})
+                    filled += n
+                with conn:
+                    with conn.cursor() as cur:
+                        cur.execute('ANALYZE public."hardware_usage"')
+
+                window_end = now + pd.Timedelta(seconds=job_rows // 10).to_pytimedelta()
+                steps = {
+                    "read_job": lambda: read_hardware_usage(job_id=job_id),
+                    "read_job_bounded": lambda: read_hardware_usage(job_id=job_id, start=now, end=window_end),
+                }
+                for name, step in steps.items():
+                    r = measure_once(step)
+                    results.append({"group": "db_scaling", "case": name, "n": filled, "job_rows": job_rows,
+                                    **r})
+                    if "error" in r:
+                        print(f"[db_scaling] {name:<31} table={filled:<10} FAILED: {r['error']}",
+                              file=sys.stderr)
+                    else:
+                        print(f"[db_scaling] {name:<31} table={filled:<10} {r['seconds'] * 1e3:10.2f} ms")
+        finally:
+            conn.close()
+    return results
+
+
+# --------------------------------------------------------------------------
+# History
+# --------------------------------------------------------------------------
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=Path(__file__).parent)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def load_history(path: Path) -> list[dict]:
+    if not path.exists():
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def append_history(path: Path, record: dict) -> None:
+    history = load_history(path)
+    history.append(record)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(history, f, indent=1)
+
+
+def _case_key(r: dict) -> tuple:
+    return r["group"], r["case"], r.get("input", "db")
+
+
+def compare(previous: dict, current: dict) -> None:
+    """
+    Print the per-case change in largest-size throughput against a previous run.
+    """
+    def largest(results):
+        out = {}
+        for r in results:
+            point = r["curve"][-1] if r.get("curve") else (r if "seconds" in r else None)
+            if point and point.get("seconds"):
+                out[_case_key(r) + (point["n"],)] = point["seconds"]
+        return out
+
+    before, after = largest(previous["results"]), largest(current["results"])
+    print(f"\nCompared with {previous.get('commit')} ({previous['timestamp']}):")
+    for key in sorted(after):
+        if key in before and before[key] > 0:
+            change = (after[key] - before[key]) / before[key] * 100
+            print(f"  {'/'.join(map(str, key)):<70} {change:+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark every timeseries_module method, the full pipeline and the DB pipelines."
+    )
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f'Synthetic series sizes (default "{DEFAULT_SIZES}", up to e.g. 1e7).')
+    parser.add_argument("--nan-rate", type=float, default=0.01, help="Fraction of NaN points.")
+    parser.add_argument("--outlier-rate", type=float, default=0.005, help="Fraction of injected outliers.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case (best is kept).")
+    parser.add_argument("--only", nargs="*", help="Restrict to these case names or groups.")
+    parser.add_argument("--no-datasets", action="store_true", help="Skip the shipped data/*.csv inputs.")
+    parser.add_argument("--db", action="store_true",
+                        help="Also benchmark the DB pipelines against a throwaway local Postgres.")
+    parser.add_argument("--db-scaling", nargs="?", const=DEFAULT_TABLE_SIZES, default=None, metavar="SIZES",
+                        help="Time per-job reads while hardware_usage grows to these row counts "
+                             f'(default "{DEFAULT_TABLE_SIZES}", up to e.g. 1e8).')
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY, help="JSON history file.")
+    parser.add_argument("--compare", action="store_true", help="Compare with the previous run in the history.")
+    args = parser.parse_args()
+
+    try:
+        sizes = parse_sizes(args.sizes)
+    except ValueError as e:
+        print(f"[Args] {e}", file=sys.stderr)
+        sys.exit(1)
+    if not (0 <= args.nan_rate < 1 and 0 <= args.outlier_rate < 1):
+        print("[Args] --nan-rate and --outlier-rate must be in [0, 1).", file=sys.stderr)
+        sys.exit(1)
+
+    results = run_memory_benchmarks(sizes, args.nan_rate, args.outlier_rate, max(args.repeat, 1),
+                                    only=set(args.only) if args.only else None,
+                                    datasets=not args.no_datasets)
+    if not args.only or set(rolling_methods.CROSS_SERIES) & set(args.only) or "rolling" in args.only:
+        results += check_cross_series()
+    if args.db:
+        try:
+            results += run_db_benchmarks(sizes, args.nan_rate, args.outlier_rate)
+        except (RuntimeError, subprocess.CalledProcessError) as e:
+            print(f"[DB] Skipping DB benchmarks: {e}", file=sys.stderr)
+    if args.db_scaling:
+        try:
+            results += run_db_scaling_benchmarks(parse_sizes(args.db_scaling))
+        except ValueError as e:
+            print(f"[Args] {e}", file=sys.stderr)
+            sys.exit(1)
+        except (RuntimeError, subprocess.CalledProcessError) as e:
+            print(f"[DB] Skipping DB scaling benchmarks: {e}", file=sys.stderr)
+
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "sizes": sizes,
+        "results": results,
+    }
+    previous = load_history(args.history)
+    append_history(args.history, record)
+    print(f"[DONE] {len(results)} results appended to {args.history}")
+
+    if args.compare and previous:
+        compare(previous[-1], record)
+
+
+if __name__ == "__main__":
+    main()
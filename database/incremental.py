@@ -0,0 +1,88 @@
+from typing import Sequence
+
+import pandas as pd
+
+from .usage_io import normalize_usage
+
+__all__ = [
+    "lock_watermark",
+    "advance_watermark",
+    "read_increment",
+    "pending_jobs",
+]
+
+
+def lock_watermark(cur, job_id: str, stage: str) -> int:
+    """
+    Return the job's last processed hardware_usage.id for `stage` (0 if never run),
+    row-locked until the transaction ends so one stage of a job never runs twice at once.
+    """
+    cur.execute(
+        """
+        INSERT INTO public."processing_watermark" (job_id, stage) VALUES (%s, %s)
+        ON CONFLICT (job_id, stage) DO NOTHING
+        """,
+        (job_id, stage),
+    )
+    cur.execute(
+        'SELECT last_id FROM public."processing_watermark" WHERE job_id = %s AND stage = %s FOR UPDATE',
+        (job_id, stage),
+    )
+    return cur.fetchone()[0]
+
+
+def advance_watermark(cur, job_id: str, stage: str, last_id: int) -> None:
+    cur.execute(
+        """
+        UPDATE public."processing_watermark" SET last_id = %s, updated_at = now()
+        WHERE job_id = %s AND stage = %s
+        """,
+        (int(last_id), job_id, stage),
+    )
+
+
+def read_increment(conn, job_id: str, after_id: int, context_rows: int) -> pd.DataFrame:
+    """
+    hardware_usage rows of a job with id > after_id, preceded by up to
+    `context_rows` already-processed rows (the latest by date_time), in
+    (date_time, id) order. Callers compute over the whole frame and keep
+    only the rows with id > after_id.
+
+    Like the rollup watermark, this assumes a job's ids are committed in
+    order (single writer per job, as in stress_test.py).
+    Returns columns: id, job_id, reading, date_time
+    """
+    df = pd.read_sql(
+        """
+        SELECT id, job_id, reading, date_time FROM (
+            (SELECT id, job_id, reading, date_time FROM public."hardware_usage"
+             WHERE job_id = %(job)s AND id <= %(after)s
+             ORDER BY date_time DESC, id DESC LIMIT %(context)s)
+            UNION ALL
+            (SELECT id, job_id, reading, date_time FROM public."hardware_usage"
+             WHERE job_id = %(job)s AND id > %(after)s)
+        ) t
+        ORDER BY date_time, id
+        """,
+        conn,
+        params={"job": job_id, "after": int(after_id), "context": max(int(context_rows), 0)},
+    )
+    return normalize_usage(df)
+
+
+def pending_jobs(cur, stages: Sequence[str]) -> list[str]:
+    """
+    Jobs with hardware_usage rows beyond their watermark for any of `stages`.
+    """
+    cur.execute(
+        """
+        SELECT h.job_id
+        FROM (SELECT job_id, max(id) AS max_id FROM public."hardware_usage" GROUP BY job_id) h
+        CROSS JOIN unnest(%s::text[]) AS s(stage)
+        LEFT JOIN public."processing_watermark" w ON w.job_id = h.job_id AND w.stage = s.stage
+        WHERE h.max_id > coalesce(w.last_id, 0)
+        GROUP BY h.job_id
+        """,
+        (list(stages),),
+    )
+    return [str(r[0]) for r in cur.fetchall()]
@@ -1,8 +1,10 @@
+import io
 import os
 import sys
-from typing import Iterable, Tuple
+from typing import Iterable, Sequence, Tuple
 from datetime import datetime
 
+import numpy as np
 from dotenv import load_dotenv
 import psycopg2
 from psycopg2.extras import execute_values
@@ -13,9 +15,21 @@ __all__ = [
     "get_db_conn",
     "insert_job",
     "insert_readings_batch",
+    "notify_readings",
+    "insert_metric_series",
+    "insert_metric_block",
 ]
 
-def get_db_conn():
+# NOTIFY channel fired (on commit) for every job that received hardware_usage rows;
+# the payload is the job id. See processing_worker.py.
+READINGS_CHANNEL = "hardware_usage_batch"
+
+def get_db_conn(exit_on_failure: bool = True):
+    """
+    Open a connection from the DB_* environment variables.
+    By default a failure exits the process; long-running writers pass
+    exit_on_failure=False to get the exception and retry later instead.
+    """
     try:
         return psycopg2.connect(
             dbname=os.getenv("DB_NAME"),
@@ -23,17 +37,33 @@ def get_db_conn():
             password=os.getenv("DB_PASSWORD"),
             host=os.getenv("DB_HOST"),
             port=os.getenv("DB_PORT"),
+            connect_timeout=10,
         )
     except Exception as e:
         print(f"[DB] Connection failed: {e}", file=sys.stderr)
+        if not exit_on_failure:
+            raise
         sys.exit(2)
 
 
-def insert_job(cur, start_time_utc: datetime, resource: str, description: str) -> str:
+def insert_job(cur, start_time_utc: datetime, resource: str, description: str, job_id: str | None = None) -> str:
     """
     Insert a new job row and return its ID.
-    Assumes 'resource' matches ENUM resource_type ('CPU','RAM').
+    Assumes 'resource' matches ENUM resource_type ('CPU','RAM','MULTI').
+    Pass `job_id` to use a client-generated UUID (a job can then be recorded
+    before the database is reachable); re-inserting the same id is a no-op.
     """
+    if job_id is not None:
+        cur.execute(
+            """
+            INSERT INTO public."job" (id, start_time, resource, description)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (id) DO NOTHING
+            """,
+            (job_id, start_time_utc, resource, description),
+        )
+        return job_id
+
     cur.execute(
         """
         INSERT INTO public."job" (start_time, resource, description)
@@ -53,6 +83,7 @@ def insert_readings_batch(
     Bulk insert hardware readings.
 
     rows: iterable of (date_time, reading, job_id)
+    Listeners on READINGS_CHANNEL are notified when the transaction commits.
     """
     rows = list(rows)
     if not rows:
@@ -65,3 +96,66 @@ def insert_readings_batch(
         """,
         rows,
     )
+    notify_readings(cur, {str(r[2]) for r in rows})
+
+
+def notify_readings(cur, job_ids: Iterable[str]) -> None:
+    """
+    Queue a READINGS_CHANNEL notification per job; Postgres delivers them on
+    commit (and drops them on rollback), folding duplicates within a transaction.
+    """
+    for job_id in sorted(set(job_ids)):
+        cur.execute("SELECT pg_notify(%s, %s)", (READINGS_CHANNEL, job_id))
+
+
+def insert_metric_series(cur, job_id: str, names: Sequence[str]) -> list[int]:
+    """
+    Register one metric_series row per metric name for a MULTI job
+    (existing series of the job are reused).
+    Returns the series ids in the same order as `names`.
+    """
+    rows = execute_values(
+        cur,
+        """
+        INSERT INTO public."metric_series" (job_id, name)
+        VALUES %s
+        ON CONFLICT (job_id, name) DO UPDATE SET name = EXCLUDED.name
+        RETURNING id, name
+        """,
+        [(job_id, name) for name in names],
+        fetch=True,
+    )
+    ids = {name: sid for sid, name in rows}
+    return [ids[name] for name in names]
+
+
+def insert_metric_block(cur, series_ids: Sequence[int], timestamps_ns: np.ndarray, values: np.ndarray) -> int:
+    """
+    COPY a columnar block of multi-metric readings into public.metric_reading.
+
+    series_ids: the k series ids, one per column of `values`
+    timestamps_ns: int64 array (n,) of UTC epoch nanoseconds
+    values: float64 array (n, k)
+
+    Returns number of rows written (n * k).
+    """
+    n, k = values.shape
+    if n == 0:
+        return 0
+    if k != len(series_ids) or len(timestamps_ns) != n:
+        raise ValueError("values must be shaped (len(timestamps_ns), len(series_ids)).")
+
+    stamps = np.datetime_as_string(np.asarray(timestamps_ns, dtype="datetime64[ns]").astype("datetime64[us]")) + "Z"
+    # Long layout, series-major: k runs of n rows each
+    sid_col = np.repeat(np.asarray(series_ids, dtype=np.int64), n).astype(str)
+    ts_col = np.tile(stamps, k)
+    val_col = np.where(np.isnan(values.T.ravel()), "", values.T.ravel().astype(str))
+
+    buf = io.StringIO("\n".join(",".join(r) for r in zip(sid_col, ts_col, val_col)))
+    cur.copy_expert(
+        """
+        COPY public."metric_reading" (series_id, date_time, value) FROM STDIN WITH (FORMAT csv)
+        """,
+        buf,
+    )
+    return n * k
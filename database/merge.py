@@ -0,0 +1,153 @@
+import csv
+import io
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+from psycopg2 import sql
+
+__all__ = [
+    "MergeResult",
+    "merge_rows",
+]
+
+
+@dataclass
+class MergeResult:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+
+    @property
+    def written(self) -> int:
+        """Rows actually touched (inserted + updated + deleted)."""
+        return self.inserted + self.updated + self.deleted
+
+
+def _csv_value(v):
+    if v is None:
+        return None
+    if isinstance(v, float) and v != v:
+        return None
+    return v
+
+
+def merge_rows(
+    cur,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence],
+    key: Sequence[str],
+    constants: dict | None = None,
+    delete_stale: bool = False,
+) -> MergeResult:
+    """
+    Idempotent bulk write into public.<table>.
+
+    rows are COPY'd into a temp staging table, then merged with
+    `INSERT ... ON CONFLICT (key) DO UPDATE ... WHERE <values changed>`, so
+    re-writing identical results touches nothing and a parameter tweak writes
+    only the delta. `constants` (e.g. {"method": ..., "window_size": ...}) are
+    applied to every row. With `delete_stale`, rows of the same job(s) and
+    constants that are not in `rows` are deleted (full-job rewrites).
+
+    Rows repeating a key keep the last occurrence (a fresh staging table is
+    in COPY order, so ctid gives it). Runs on the caller's cursor
+    (and transaction).
+    """
+    constants = dict(constants or {})
+    all_columns = list(columns) + list(constants)
+    values = [c for c in all_columns if c not in key]
+    stage = sql.Identifier(f"_merge_{table}")
+    target = sql.Identifier(table)
+
+    def idents(names):
+        return sql.SQL(", ").join(map(sql.Identifier, names))
+
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    staged = 0
+    for row in rows:
+        writer.writerow([_csv_value(v) for v in row])
+        staged += 1
+    if staged == 0:
+        return MergeResult()
+    buf.seek(0)
+
+    cur.execute(sql.SQL("DROP TABLE IF EXISTS pg_temp.{s}").format(s=stage))
+    cur.execute(
+        sql.SQL("CREATE TEMP TABLE {s} ON COMMIT DROP AS SELECT {cols} FROM public.{t} WITH NO DATA")
+        .format(s=stage, cols=idents(columns), t=target)
+    )
+    cur.copy_expert(
+        sql.SQL("COPY {s} ({cols}) FROM STDIN WITH (FORMAT csv)").format(s=stage, cols=idents(columns)).as_string(cur),
+        buf,
+    )
+
+    const_select = sql.SQL("").join(
+        sql.SQL(", {v} AS {c}").format(v=sql.Literal(v), c=sql.Identifier(c)) for c, v in constants.items()
+    )
+    # Constants are the same on every staged row, so only staged key columns de-duplicate
+    key_on_stage = sql.SQL(", ").join(sql.SQL("s.{c}").format(c=sql.Identifier(c)) for c in key if c in columns)
+    set_clause = sql.SQL(", ").join(
+        sql.SQL("{c} = EXCLUDED.{c}").format(c=sql.Identifier(c)) for c in values
+    )
+    changed = sql.SQL("({old}) IS DISTINCT FROM ({new})").format(
+        old=sql.SQL(", ").join(sql.SQL("t.{c}").format(c=sql.Identifier(c)) for c in values),
+        new=sql.SQL(", ").join(sql.SQL("EXCLUDED.{c}").format(c=sql.Identifier(c)) for c in values),
+    )
+
+    cur.execute(
+        sql.SQL(
+            """
+            WITH merged AS (
+                INSERT INTO public.{t} AS t ({all_cols})
+                SELECT DISTINCT ON ({key_on_stage}) {stage_cols}{consts}
+                FROM {s} s
+                ORDER BY {key_on_stage}, s.ctid DESC
+                ON CONFLICT ({key}) DO UPDATE SET {set_clause}
+                WHERE {changed}
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM merged
+            """
+        ).format(
+            t=target,
+            all_cols=idents(all_columns),
+            key_on_stage=key_on_stage,
+            stage_cols=sql.SQL(", ").join(sql.SQL("s.{c}").format(c=sql.Identifier(c)) for c in columns),
+            consts=const_select,
+            s=stage,
+            key=idents(key),
+            set_clause=set_clause,
+            changed=changed,
+        )
+    )
+    inserted, updated = cur.fetchone()
+    cur.execute(
+        sql.SQL("SELECT count(*) FROM (SELECT DISTINCT {key_on_stage} FROM {s} s) d")
+        .format(key_on_stage=key_on_stage, s=stage)
+    )
+    distinct_rows = cur.fetchone()[0]
+    result = MergeResult(inserted=inserted, updated=updated, unchanged=distinct_rows - inserted - updated)
+
+    if delete_stale and "job_id" in columns:
+        scope = sql.SQL("").join(
+            sql.SQL(" AND t.{c} = {v}").format(c=sql.Identifier(c), v=sql.Literal(v)) for c, v in constants.items()
+        )
+        match = sql.SQL(" AND ").join(
+            sql.SQL("s.{c} = t.{c}").format(c=sql.Identifier(c)) for c in key if c in columns
+        )
+        cur.execute(
+            sql.SQL(
+                """
+                DELETE FROM public.{t} t
+                WHERE t.job_id IN (SELECT DISTINCT job_id FROM {s}){scope}
+                  AND NOT EXISTS (SELECT 1 FROM {s} s WHERE {match})
+                """
+            ).format(t=target, s=stage, scope=scope, match=match)
+        )
+        result.deleted = cur.rowcount
+
+    cur.execute(sql.SQL("DROP TABLE {s}").format(s=stage))
+    return result
@@ -0,0 +1,67 @@
+import sys
+from pathlib import Path
+
+from .insertion import get_db_conn
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+__all__ = [
+    "pending_migrations",
+    "apply_migrations",
+]
+
+
+def _applied(cur) -> set[str]:
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS public."schema_migrations" (
+            "version" TEXT PRIMARY KEY,
+            "applied_at" TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """
+    )
+    cur.execute('SELECT version FROM public."schema_migrations"')
+    return {row[0] for row in cur.fetchall()}
+
+
+def pending_migrations(cur) -> list[Path]:
+    """
+    Migration files (NNN_name.sql) not yet recorded in schema_migrations, in order.
+    """
+    done = _applied(cur)
+    return [p for p in sorted(MIGRATIONS_DIR.glob("*.sql")) if p.stem not in done]
+
+
+def apply_migrations() -> list[str]:
+    """
+    Bring an existing database up to date with schema.sql.
+    Each migration file runs in its own transaction; the files are written to be
+    idempotent, so a database created from the current schema.sql is safe too.
+    Returns the applied versions.
+    """
+    applied = []
+    conn = get_db_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                todo = pending_migrations(cur)
+
+        for path in todo:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute(path.read_text())
+                    cur.execute('INSERT INTO public."schema_migrations" (version) VALUES (%s)', (path.stem,))
+            applied.append(path.stem)
+            print(f"[DB] Applied migration {path.stem}")
+    finally:
+        conn.close()
+    return applied
+
+
+if __name__ == "__main__":
+    try:
+        done = apply_migrations()
+    except Exception as e:
+        print(f"[DB] Migration failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    print("[DB] Schema is up to date." if not done else f"[DB] {len(done)} migration(s) applied.")
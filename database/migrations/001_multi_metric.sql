@@ -0,0 +1,22 @@
+-- Multi-metric recording (stress_test.py MULTI mode)
+ALTER TYPE resource_type ADD VALUE IF NOT EXISTS 'MULTI';
+
+CREATE TABLE IF NOT EXISTS "metric_series"(
+    "id" SERIAL,
+    "job_id" UUID NOT NULL,
+    "name" TEXT NOT NULL,
+    PRIMARY KEY ("id"),
+    CONSTRAINT "metric_series_job_name" UNIQUE ("job_id", "name"),
+    CONSTRAINT "job_id" FOREIGN KEY ("job_id")
+	    REFERENCES public."job" ("id")
+);
+
+CREATE TABLE IF NOT EXISTS "metric_reading"(
+    "series_id" INTEGER NOT NULL,
+    "date_time" TIMESTAMPTZ NOT NULL,
+    "value" DOUBLE PRECISION,
+    CONSTRAINT "series_id" FOREIGN KEY ("series_id")
+	    REFERENCES public."metric_series" ("id")
+);
+
+CREATE INDEX IF NOT EXISTS "metric_reading_series_time" ON "metric_reading" ("series_id", "date_time");
@@ -0,0 +1,31 @@
+-- Multi-resolution rollups of hardware_usage (database/rollup.py)
+CREATE TABLE IF NOT EXISTS "hardware_usage_rollup"(
+    -- Columns
+    "job_id" UUID NOT NULL,
+    "resolution" INTEGER NOT NULL,          -- bucket width in seconds
+    "bucket" TIMESTAMPTZ NOT NULL,          -- bucket start
+    "count" BIGINT NOT NULL,                -- non-NULL readings in the bucket
+    "min" DOUBLE PRECISION,
+    "max" DOUBLE PRECISION,
+    "sum" DOUBLE PRECISION NOT NULL,
+    "sum_sq" DOUBLE PRECISION NOT NULL,
+
+    -- Primary Key
+    PRIMARY KEY ("job_id", "resolution", "bucket"),
+
+    -- Constraints
+    CONSTRAINT "job_id" FOREIGN KEY ("job_id")
+	    REFERENCES public."job" ("id")
+);
+
+
+-- Last hardware_usage.id folded into the rollups, per job
+CREATE TABLE IF NOT EXISTS "rollup_watermark"(
+    "job_id" UUID NOT NULL,
+    "last_id" BIGINT NOT NULL DEFAULT 0,
+
+    PRIMARY KEY ("job_id"),
+
+    CONSTRAINT "job_id" FOREIGN KEY ("job_id")
+	    REFERENCES public."job" ("id")
+);
@@ -0,0 +1,41 @@
+-- Range-partition hardware_usage, outlier and rolling_window by date_time and add
+-- (job_id, date_time) + BRIN(date_time) indexes.
+--
+-- Existing rows are copied into each table's DEFAULT partition; afterwards run
+--     python -m database.partitions --from-data
+-- to split them into monthly partitions. Tables that are already partitioned
+-- (databases created from the current schema.sql) are left untouched.
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['hardware_usage', 'outlier', 'rolling_window'] LOOP
+        IF (SELECT relkind FROM pg_class WHERE oid = format('public.%I', t)::regclass) = 'p' THEN
+            CONTINUE;
+        END IF;
+
+        EXECUTE format('ALTER TABLE public.%I RENAME TO %I', t, t || '_unpartitioned');
+        EXECUTE format('ALTER INDEX public.%I RENAME TO %I', t || '_pkey', t || '_unpartitioned_pkey');
+
+        -- Same columns, defaults (incl. the id sequence) and constraints, partitioned by time
+        EXECUTE format(
+            'CREATE TABLE public.%I (LIKE public.%I INCLUDING DEFAULTS INCLUDING CONSTRAINTS, '
+            'PRIMARY KEY (id, date_time), '
+            'CONSTRAINT job_id FOREIGN KEY (job_id) REFERENCES public.job (id)) '
+            'PARTITION BY RANGE (date_time)',
+            t, t || '_unpartitioned');
+        EXECUTE format('ALTER SEQUENCE public.%I OWNED BY public.%I.id', t || '_id_seq', t);
+        EXECUTE format('CREATE TABLE public.%I PARTITION OF public.%I DEFAULT', t || '_default', t);
+
+        EXECUTE format('INSERT INTO public.%I SELECT * FROM public.%I', t, t || '_unpartitioned');
+        EXECUTE format('DROP TABLE public.%I', t || '_unpartitioned');
+    END LOOP;
+END
+$$;
+
+CREATE INDEX IF NOT EXISTS "hardware_usage_job_time" ON "hardware_usage" ("job_id", "date_time");
+CREATE INDEX IF NOT EXISTS "hardware_usage_time_brin" ON "hardware_usage" USING BRIN ("date_time");
+CREATE INDEX IF NOT EXISTS "outlier_job_time" ON "outlier" ("job_id", "date_time");
+CREATE INDEX IF NOT EXISTS "outlier_time_brin" ON "outlier" USING BRIN ("date_time");
+CREATE INDEX IF NOT EXISTS "rolling_window_job_time" ON "rolling_window" ("job_id", "date_time");
+CREATE INDEX IF NOT EXISTS "rolling_window_time_brin" ON "rolling_window" USING BRIN ("date_time");
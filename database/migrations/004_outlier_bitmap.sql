@@ -0,0 +1,17 @@
+-- Packed per-job outlier bitmaps (database/outlier_io.py, process_outliers(storage="bitmap"))
+CREATE TABLE IF NOT EXISTS "outlier_bitmap"(
+    -- Columns
+    "job_id" UUID NOT NULL,
+    "first_id" BIGINT NOT NULL,
+    "last_id" BIGINT NOT NULL,
+    "n_outliers" BIGINT NOT NULL,
+    "bits" BYTEA NOT NULL,
+    "updated_at" TIMESTAMPTZ NOT NULL DEFAULT now(),
+
+    -- Primary Key
+    PRIMARY KEY ("job_id"),
+
+    -- Constraints
+    CONSTRAINT "job_id" FOREIGN KEY ("job_id")
+	    REFERENCES public."job" ("id")
+);
@@ -0,0 +1,23 @@
+-- Unique result keys so re-running the outlier / rolling pipelines merges
+-- instead of duplicating rows (database/merge.py).
+--
+-- rolling_window gains method / window_size columns (existing rows get '' / 0).
+-- Duplicate rows from earlier re-runs are removed first, keeping the newest (highest id).
+ALTER TABLE public."rolling_window" ADD COLUMN IF NOT EXISTS "method" TEXT NOT NULL DEFAULT '';
+ALTER TABLE public."rolling_window" ADD COLUMN IF NOT EXISTS "window_size" INTEGER NOT NULL DEFAULT 0;
+
+DELETE FROM public."outlier" a
+USING public."outlier" b
+WHERE a.job_id = b.job_id AND a.date_time = b.date_time AND a.id < b.id;
+
+DELETE FROM public."rolling_window" a
+USING public."rolling_window" b
+WHERE a.job_id = b.job_id AND a.method = b.method AND a.window_size = b.window_size
+  AND a.date_time = b.date_time AND a.id < b.id;
+
+-- The unique keys replace the plain (job_id, date_time) indexes from 003
+DROP INDEX IF EXISTS public."outlier_job_time";
+DROP INDEX IF EXISTS public."rolling_window_job_time";
+CREATE UNIQUE INDEX IF NOT EXISTS "outlier_job_time_key" ON "outlier" ("job_id", "date_time");
+CREATE UNIQUE INDEX IF NOT EXISTS "rolling_window_job_method_time_key"
+    ON "rolling_window" ("job_id", "method", "window_size", "date_time");
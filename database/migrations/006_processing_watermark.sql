@@ -0,0 +1,12 @@
+-- Per-job, per-stage progress of the incremental processing worker (processing_worker.py)
+CREATE TABLE IF NOT EXISTS "processing_watermark"(
+    "job_id" UUID NOT NULL,
+    "stage" TEXT NOT NULL,
+    "last_id" BIGINT NOT NULL DEFAULT 0,
+    "updated_at" TIMESTAMPTZ NOT NULL DEFAULT now(),
+
+    PRIMARY KEY ("job_id", "stage"),
+
+    CONSTRAINT "job_id" FOREIGN KEY ("job_id")
+	    REFERENCES public."job" ("id")
+);
@@ -1,60 +1,153 @@
+from datetime import datetime
 from typing import Iterable, Tuple, Optional
+import numpy as np
 import pandas as pd
-from psycopg2.extras import execute_values
+import psycopg2
 
 from .insertion import get_db_conn
+from .usage_io import read_hardware_usage  # shared reader, re-exported for existing callers
+from .merge import MergeResult, merge_rows
 
 
-def read_hardware_usage(job_id: Optional[str] = None) -> pd.DataFrame:
+def write_outlier_flags(rows: Iterable[Tuple], delete_stale: bool = False) -> MergeResult:
+    """
+    Idempotent bulk write into the public.outlier table, keyed by (job_id, date_time).
+    rows: iterable of (date_time, reading, outlier_flag, job_id)
+
+    Existing rows are updated only when their values changed, so a re-run
+    writes just the delta. With `delete_stale`, rows of the same job(s) that
+    are not in `rows` are removed (use it when `rows` covers whole jobs).
+
+    Returns a MergeResult (inserted / updated / unchanged / deleted).
+    """
     conn = get_db_conn()
     try:
-        base_sql = """
-            SELECT id, job_id, reading, date_time
-            FROM public."hardware_usage"
-        """
-        params = None
-        if job_id:
-            base_sql += " WHERE job_id = %s"
-            params = (job_id,)
+        with conn:
+            with conn.cursor() as cur:
+                return merge_outlier_flags(cur, rows, delete_stale=delete_stale)
+    finally:
+        conn.close()
 
-        df = pd.read_sql(base_sql, conn, params=params)
 
-        # Normalize types (safeguards)
-        if not df.empty:
-            # Ensure date_time is tz-aware pandas Timestamp
-            df["date_time"] = pd.to_datetime(df["date_time"], utc=True)
-            # Keep numeric precision consistent with DB scale (7,4)
-            df["reading"] = df["reading"].astype(float).round(4)
+def merge_outlier_flags(cur, rows: Iterable[Tuple], delete_stale: bool = False) -> MergeResult:
+    """
+    write_outlier_flags on the caller's cursor (and transaction).
+    """
+    return merge_rows(
+        cur, "outlier", ("date_time", "reading", "outlier_flag", "job_id"), rows,
+        key=("job_id", "date_time"), delete_stale=delete_stale,
+    )
+
+
+def pack_outlier_bitmap(ids, flags) -> tuple[int, int, bytes]:
+    """
+    Pack per-row outlier flags into a bitmap over the hardware_usage.id range.
+    Bit i (LSB-first within each byte, like Postgres get_bit) is set when
+    id == first_id + i is an outlier; ids missing from `ids` stay 0.
+
+    Returns (first_id, last_id, bits).
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    flags = np.asarray(flags, dtype=bool)
+    if ids.size == 0:
+        raise ValueError("Cannot build an outlier bitmap from zero rows.")
+    first_id, last_id = int(ids.min()), int(ids.max())
+    dense = np.zeros(last_id - first_id + 1, dtype=bool)
+    dense[ids[flags] - first_id] = True
+    return first_id, last_id, np.packbits(dense, bitorder="little").tobytes()
 
-        return df
 
+def write_outlier_bitmap(job_id: str, ids, flags) -> int:
+    """
+    Upsert the job's row in public.outlier_bitmap (replacing any previous result).
+    Returns size of the stored bitmap in bytes.
+    """
+    conn = get_db_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                return merge_outlier_bitmap(cur, job_id, ids, flags)
     finally:
         conn.close()
 
 
-def write_outlier_flags(rows: Iterable[Tuple]) -> int:
+def merge_outlier_bitmap(cur, job_id: str, ids, flags) -> int:
     """
-    Bulk insert into the public.outlier table.
-    rows: iterable of (date_time, reading, outlier_flag, job_id)
+    write_outlier_bitmap on the caller's cursor (and transaction).
+    """
+    first_id, last_id, bits = pack_outlier_bitmap(ids, flags)
+    cur.execute(
+        """
+        INSERT INTO public."outlier_bitmap" (job_id, first_id, last_id, n_outliers, bits)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (job_id) DO UPDATE SET
+            first_id = EXCLUDED.first_id,
+            last_id = EXCLUDED.last_id,
+            n_outliers = EXCLUDED.n_outliers,
+            bits = EXCLUDED.bits,
+            updated_at = now()
+        """,
+        (job_id, first_id, last_id, int(np.count_nonzero(flags)), psycopg2.Binary(bits)),
+    )
+    return len(bits)
+
+
+def read_outlier_ids(job_id: str) -> np.ndarray:
+    """
+    hardware_usage ids flagged as outliers for a job (empty if none / no bitmap).
+    Unpacked client-side from the single bitmap row.
+    """
+    conn = get_db_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute('SELECT first_id, bits FROM public."outlier_bitmap" WHERE job_id = %s', (job_id,))
+            row = cur.fetchone()
+        conn.rollback()
+    finally:
+        conn.close()
+    if row is None:
+        return np.empty(0, dtype=np.int64)
+    first_id, bits = row
+    dense = np.unpackbits(np.frombuffer(bytes(bits), dtype=np.uint8), bitorder="little")
+    return np.flatnonzero(dense) + int(first_id)
+
 
-    Returns number of rows inserted.
+def read_hardware_usage_flagged(job_id: str, start: Optional[datetime] = None,
+                                end: Optional[datetime] = None, outliers_only: bool = False) -> pd.DataFrame:
     """
-    rows = list(rows)
-    if not rows:
-        return 0
+    hardware_usage rows joined with the job's outlier bitmap, i.e. the same
+    columns public.outlier provides: id, job_id, reading, date_time, outlier_flag.
+    The flag is looked up server-side with get_bit (rows outside the bitmap's
+    id range are False). `outliers_only` keeps only flagged rows.
+    """
+    query = """
+        SELECT h.id, h.job_id, h.reading, h.date_time,
+               CASE WHEN h.id BETWEEN b.first_id AND b.last_id
+                    THEN get_bit(b.bits, (h.id - b.first_id)::int) = 1
+                    ELSE FALSE END AS outlier_flag
+        FROM public."hardware_usage" h
+        LEFT JOIN public."outlier_bitmap" b ON b.job_id = h.job_id
+        WHERE h.job_id = %s
+    """
+    params = [job_id]
+    if start is not None:
+        query += " AND h.date_time >= %s"
+        params.append(start)
+    if end is not None:
+        query += " AND h.date_time < %s"
+        params.append(end)
+    if outliers_only:
+        query = f"SELECT * FROM ({query}) t WHERE outlier_flag"
+    query += " ORDER BY date_time, id"
 
     conn = get_db_conn()
     try:
-        with conn:
-            with conn.cursor() as cur:
-                execute_values(
-                    cur,
-                    """
-                    INSERT INTO public."outlier" (date_time, reading, outlier_flag, job_id)
-                    VALUES %s
-                    """,
-                    rows,
-                )
-        return len(rows)
+        df = pd.read_sql(query, conn, params=params)
     finally:
         conn.close()
+
+    if not df.empty:
+        df["date_time"] = pd.to_datetime(df["date_time"], utc=True)
+        df["reading"] = df["reading"].astype(float).round(4)
+        df["outlier_flag"] = df["outlier_flag"].astype(bool)
+    return df
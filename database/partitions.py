@@ -0,0 +1,130 @@
+import argparse
+import sys
+from datetime import datetime, timezone
+from typing import Sequence
+
+from psycopg2 import sql
+
+from .insertion import get_db_conn
+
+__all__ = [
+    "PARTITIONED_TABLES",
+    "month_ranges",
+    "ensure_partitions",
+    "partition_existing_data",
+]
+
+PARTITIONED_TABLES = ("hardware_usage", "outlier", "rolling_window")
+
+
+def _month_start(dt: datetime) -> datetime:
+    dt = dt.astimezone(timezone.utc) if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+    return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(dt: datetime) -> datetime:
+    return dt.replace(year=dt.year + 1, month=1) if dt.month == 12 else dt.replace(month=dt.month + 1)
+
+
+def month_ranges(start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+    """
+    [lo, hi) UTC month boundaries covering every instant in [start, end].
+    """
+    ranges = []
+    lo = _month_start(start)
+    while lo <= end:
+        hi = _next_month(lo)
+        ranges.append((lo, hi))
+        lo = hi
+    return ranges
+
+
+def _create_month_partition(cur, table: str, lo: datetime, hi: datetime) -> bool:
+    name = f"{table}_{lo:%Y_%m}"
+    cur.execute("SELECT to_regclass(%s)", (f"public.{name}",))
+    if cur.fetchone()[0] is not None:
+        return False
+
+    t, p, d = sql.Identifier(table), sql.Identifier(name), sql.Identifier(f"{table}_default")
+    # Rows already in the DEFAULT partition for this month must move before ATTACH
+    cur.execute(sql.SQL("CREATE TABLE public.{p} (LIKE public.{t} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+                .format(p=p, t=t))
+    cur.execute(
+        sql.SQL(
+            """
+            WITH moved AS (
+                DELETE FROM public.{d} WHERE date_time >= %s AND date_time < %s RETURNING *
+            )
+            INSERT INTO public.{p} SELECT * FROM moved
+            """
+        ).format(d=d, p=p),
+        (lo, hi),
+    )
+    cur.execute(sql.SQL("ALTER TABLE public.{t} ATTACH PARTITION public.{p} FOR VALUES FROM (%s) TO (%s)")
+                .format(t=t, p=p), (lo, hi))
+    return True
+
+
+def ensure_partitions(start: datetime, end: datetime, tables: Sequence[str] = PARTITIONED_TABLES) -> list[str]:
+    """
+    Create the monthly partitions covering [start, end] for each table (no-op for
+    months that already have one). Matching rows sitting in the DEFAULT partition
+    are moved into the new partition in the same transaction.
+    Returns the names of the partitions created.
+    """
+    created = []
+    conn = get_db_conn()
+    try:
+        for table in tables:
+            if table not in PARTITIONED_TABLES:
+                raise ValueError(f"'{table}' is not a partitioned table.")
+            for lo, hi in month_ranges(start, end):
+                with conn:
+                    with conn.cursor() as cur:
+                        if _create_month_partition(cur, table, lo, hi):
+                            created.append(f"{table}_{lo:%Y_%m}")
+    finally:
+        conn.close()
+    return created
+
+
+def partition_existing_data(tables: Sequence[str] = PARTITIONED_TABLES) -> list[str]:
+    """
+    Split whatever is in each DEFAULT partition (e.g. after migration 003) into
+    monthly partitions. Returns the names of the partitions created.
+    """
+    created = []
+    for table in tables:
+        conn = get_db_conn()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql.SQL("SELECT min(date_time), max(date_time) FROM public.{d}")
+                            .format(d=sql.Identifier(f"{table}_default")))
+                lo, hi = cur.fetchone()
+            conn.rollback()
+        finally:
+            conn.close()
+        if lo is not None:
+            created += ensure_partitions(lo, hi, tables=[table])
+    return created
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create monthly partitions for the time-partitioned tables.")
+    parser.add_argument("--months-ahead", type=int, default=2,
+                        help="Create partitions from this month up to N months ahead (default 2).")
+    parser.add_argument("--from-data", action="store_true",
+                        help="Also split rows already in the DEFAULT partitions into monthly partitions.")
+    args = parser.parse_args()
+
+    try:
+        created = partition_existing_data() if args.from_data else []
+        now = datetime.now(timezone.utc)
+        end = now
+        for _ in range(args.months_ahead):
+            end = _next_month(_month_start(end))
+        created += ensure_partitions(now, end)
+    except Exception as e:
+        print(f"[DB] Partition maintenance failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"[DB] Created {len(created)} partition(s): {', '.join(created) or '-'}")
@@ -1,62 +1,107 @@
+from datetime import datetime
 from typing import Iterable, Tuple, Optional
+import numpy as np
 import pandas as pd
-from psycopg2.extras import execute_values
 
 # Reuse your existing connection helper
 from database.insertion import get_db_conn
+from database.usage_io import read_hardware_usage  # shared reader, re-exported for existing callers
+from database.merge import MergeResult, merge_rows
+from timeseries_module.rolling.compression import reconstruct_series
 
 
-def read_hardware_usage(job_id: str) -> pd.DataFrame:
+def write_rolling_values(rows: Iterable[Tuple], method: str = "", window_size: int = 0,
+                         delete_stale: bool = False) -> MergeResult:
     """
-    Read hardware_usage data into a pandas DataFrame.
-    Optionally filter by job_id.
-    Returns columns: id, job_id, reading, date_time
+    Idempotent bulk write into the public.rolling_window table,
+    keyed by (job_id, method, window_size, date_time).
+
+    rows: iterable of (date_time, rolling_value, job_id)
+    Existing rows are updated only when their value changed, so a re-run (or a
+    tweak of e.g. min_periods) writes just the delta. With `delete_stale`, rows
+    of the same job(s), method and window that are not in `rows` are removed
+    (use it when `rows` covers whole jobs).
+
+    Returns a MergeResult (inserted / updated / unchanged / deleted).
     """
     conn = get_db_conn()
     try:
-        sql = """
-            SELECT id, job_id, reading, date_time
-            FROM public."hardware_usage"
-        """
-        params = None
-        if job_id:
-            sql += " WHERE job_id = %s"
-            params = (job_id,)
-
-        df = pd.read_sql(sql, conn, params=params)
-
-        if not df.empty:
-            df["date_time"] = pd.to_datetime(df["date_time"], utc=True)
-            df["reading"] = df["reading"].astype(float).round(4)
-
-        return df
+        with conn:
+            with conn.cursor() as cur:
+                return merge_rolling_values(cur, rows, method, window_size, delete_stale=delete_stale)
     finally:
         conn.close()
 
 
-def write_rolling_values(rows: Iterable[Tuple]) -> int:
+def merge_rolling_values(cur, rows: Iterable[Tuple], method: str = "", window_size: int = 0,
+                         delete_stale: bool = False) -> MergeResult:
+    """
+    write_rolling_values on the caller's cursor (and transaction).
     """
-    Bulk insert into the public.rolling_window table.
+    return merge_rows(
+        cur, "rolling_window", ("date_time", "rolling_value", "job_id"), rows,
+        key=("job_id", "method", "window_size", "date_time"),
+        constants={"method": method, "window_size": int(window_size)},
+        delete_stale=delete_stale,
+    )
 
-    rows: iterable of (date_time, rolling_value, job_id)
-    Returns number of rows inserted.
+
+def read_rolling_series(job_id: str, how: str = "step", start: Optional[datetime] = None,
+                        end: Optional[datetime] = None, method: Optional[str] = None,
+                        window_size: Optional[int] = None) -> pd.DataFrame:
+    """
+    Full-resolution rolling series of a job, rebuilt from a (possibly compressed)
+    rolling_window at every hardware_usage timestamp in [start, end).
+
+    how: "step" (deadband-compressed) or "linear" (swinging-door-compressed).
+    method / window_size select one result when the job has several (e.g. "rolling_mean", 10).
+    Returns columns: date_time, rolling_value
     """
-    rows = list(rows)
-    if not rows:
-        return 0
+    params = [job_id]
+    bounds = ""
+    if start is not None:
+        bounds += " AND date_time >= %s"
+        params.append(start)
+    if end is not None:
+        bounds += " AND date_time < %s"
+        params.append(end)
 
     conn = get_db_conn()
     try:
-        with conn:
-            with conn.cursor() as cur:
-                execute_values(
-                    cur,
-                    """
-                    INSERT INTO public."rolling_window" (date_time, rolling_value, job_id)
-                    VALUES %s
-                    """,
-                    rows,
-                )
-        return len(rows)
+        times = pd.read_sql(
+            'SELECT date_time FROM public."hardware_usage" WHERE job_id = %s' + bounds + " ORDER BY date_time, id",
+            conn, params=params,
+        )
+        series = ""
+        if method is not None:
+            series += " AND method = %(method)s"
+        if window_size is not None:
+            series += " AND window_size = %(window_size)s"
+        # Plus the last point before `start` and the first after `end`, which
+        # carry / interpolate values across the range bounds
+        kept = pd.read_sql(
+            """
+            SELECT date_time, rolling_value FROM (
+                (SELECT date_time, rolling_value, id FROM public."rolling_window"
+                 WHERE job_id = %(job)s AND date_time < %(start)s {series} ORDER BY date_time DESC, id DESC LIMIT 1)
+                UNION ALL
+                (SELECT date_time, rolling_value, id FROM public."rolling_window"
+                 WHERE job_id = %(job)s AND date_time >= %(start)s AND date_time < %(end)s {series})
+                UNION ALL
+                (SELECT date_time, rolling_value, id FROM public."rolling_window"
+                 WHERE job_id = %(job)s AND date_time >= %(end)s {series} ORDER BY date_time, id LIMIT 1)
+            ) t
+            ORDER BY date_time, id
+            """.format(series=series),
+            conn,
+            params={"job": job_id, "start": start or "-infinity", "end": end or "infinity",
+                    "method": method, "window_size": window_size},
+        )
     finally:
         conn.close()
+
+    times["date_time"] = pd.to_datetime(times["date_time"], utc=True)
+    kept["date_time"] = pd.to_datetime(kept["date_time"], utc=True)
+    values = reconstruct_series(kept["date_time"], kept["rolling_value"].astype(float),
+                                times["date_time"], how=how)
+    return times.assign(rolling_value=np.round(values, 4))
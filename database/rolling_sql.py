@@ -0,0 +1,123 @@
+from psycopg2 import sql
+
+from timeseries_module.rolling.interface import rolling_defaults
+
+from .insertion import get_db_conn
+
+__all__ = [
+    "SQL_ROLLING_FUNCTIONS",
+    "rolling_options",
+    "rolling_window_expression",
+    "compute_rolling_sql",
+]
+
+# Rolling method name -> Postgres aggregate (per ddof for std/var)
+SQL_ROLLING_FUNCTIONS = {
+    "rolling_mean": "avg",
+    "rolling_sum": "sum",
+    "rolling_min": "min",
+    "rolling_max": "max",
+    "rolling_std": {0: "stddev_pop", 1: "stddev_samp"},
+    "rolling_var": {0: "var_pop", 1: "var_samp"},
+}
+
+
+def rolling_options(name: str, **kwargs) -> dict:
+    """
+    compute_rolling's options for `name` (timeseries_module.rolling.interface.rolling_defaults),
+    with `window` set for EW methods too: the window_size of an EW series is its span,
+    and halflife/alpha runs have no window (0).
+    """
+    options = rolling_defaults(name, **kwargs)
+    if "ewm" in name:
+        if "span" in options:
+            options["window"] = options["span"]
+        elif "halflife" in options or "alpha" in options:
+            options["window"] = 0
+    return options
+
+
+def rolling_window_expression(rolling_fn, window: int, min_periods: int = 1, center: bool = False,
+                              ddof: int = 0, value_column: str = "reading") -> sql.Composed:
+    """
+    Build `CASE WHEN count(v) OVER w >= min_periods THEN agg(v) OVER w END`
+    for one of the rolling methods, matching the pandas semantics:
+    a trailing frame of `window` rows (or a centered one, like pandas' center=True)
+    and NULL until `min_periods` non-NULL readings are in the frame.
+    The expression refers to a window named `w`.
+    """
+    name = getattr(rolling_fn, "__name__", str(rolling_fn)).lower()
+    if name not in SQL_ROLLING_FUNCTIONS:
+        raise ValueError(f"'{name}' cannot be pushed down to SQL; supported: {', '.join(SQL_ROLLING_FUNCTIONS)}.")
+    if int(window) <= 0:
+        raise ValueError("Please provide a positive 'window' (e.g., window=7).")
+
+    agg = SQL_ROLLING_FUNCTIONS[name]
+    if isinstance(agg, dict):
+        if ddof not in agg:
+            raise ValueError("SQL pushdown supports ddof=0 or ddof=1 only.")
+        agg = agg[ddof]
+
+    return sql.SQL("CASE WHEN count({v}) OVER w >= {mp} THEN {agg}({v}) OVER w END").format(
+        v=sql.Identifier(value_column),
+        mp=sql.Literal(int(min_periods)),
+        agg=sql.SQL(agg),
+    )
+
+
+def _frame(window: int, center: bool) -> sql.Composed:
+    if center:
+        # pandas centers with window // 2 rows before and (window - 1) // 2 after
+        before, after = window // 2, (window - 1) // 2
+    else:
+        before, after = window - 1, 0
+    return sql.SQL("ROWS BETWEEN {b} PRECEDING AND {a} FOLLOWING").format(
+        b=sql.Literal(before), a=sql.Literal(after)
+    )
+
+
+def compute_rolling_sql(job_id: str, rolling_fn, value_column: str = "reading", **kwargs) -> int:
+    """
+    Server-side equivalent of compute_rolling + write_rolling_values for one job.
+
+    Runs a single `INSERT INTO rolling_window ... SELECT ... OVER (PARTITION BY
+    job_id ORDER BY date_time ...)` so no row leaves the database. Supported:
+    rolling_mean / rolling_sum / rolling_min / rolling_max / rolling_std / rolling_var,
+    with the same window / min_periods / center / ddof defaults as compute_rolling.
+    Rows are keyed like write_rolling_values (method = function name, window_size),
+    and existing rows are only updated when their value changed.
+
+    Returns number of rows inserted or updated.
+    """
+    name = getattr(rolling_fn, "__name__", str(rolling_fn)).lower()
+    opts = rolling_options(name, **kwargs)
+    window = int(opts["window"])
+    expr = rolling_window_expression(rolling_fn, window, opts["min_periods"], opts.get("center", False),
+                                     opts.get("ddof", 0), value_column)
+
+    # DISTINCT ON: one value per reading time (the last reading wins, as in merge_rows)
+    query = sql.SQL(
+        """
+        INSERT INTO public."rolling_window" AS t (date_time, rolling_value, job_id, method, window_size)
+        SELECT DISTINCT ON (date_time) date_time, rolling_value, job_id, %s, %s
+        FROM (
+            SELECT id, date_time, {expr} AS rolling_value, job_id
+            FROM public."hardware_usage"
+            WHERE job_id = %s
+            WINDOW w AS (PARTITION BY job_id ORDER BY date_time, id {frame})
+        ) r
+        ORDER BY date_time, id DESC
+        ON CONFLICT (job_id, method, window_size, date_time) DO UPDATE
+            SET rolling_value = EXCLUDED.rolling_value
+            WHERE t.rolling_value IS DISTINCT FROM EXCLUDED.rolling_value
+        """
+    ).format(expr=expr, frame=_frame(window, opts["center"]))
+
+    conn = get_db_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(query, (name, window, job_id))
+                return cur.rowcount
+    finally:
+        conn.close()
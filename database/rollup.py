@@ -0,0 +1,231 @@
+import argparse
+import math
+import sys
+import time
+from datetime import datetime
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .insertion import get_db_conn
+
+__all__ = [
+    "RESOLUTIONS",
+    "refresh_rollups",
+    "choose_resolution",
+    "read_usage_series",
+]
+
+# Bucket widths in seconds, finest first; each must be a multiple of the first.
+RESOLUTIONS = (1, 60, 3600)
+
+_REFRESH_SQL = """
+    WITH base AS (
+        -- New raw rows folded into the finest buckets first ...
+        SELECT
+            job_id,
+            to_timestamp(floor(extract(epoch FROM date_time) / %(finest)s) * %(finest)s) AS bucket,
+            count(reading) AS n,
+            min(reading::float8) AS mn,
+            max(reading::float8) AS mx,
+            coalesce(sum(reading::float8), 0) AS s,
+            coalesce(sum(reading::float8 * reading::float8), 0) AS ss
+        FROM public."hardware_usage"
+        WHERE job_id = %(job_id)s AND id > %(last_id)s AND id <= %(upto)s
+        GROUP BY 1, 2
+    )
+    -- ... then every resolution is built from those partial buckets
+    INSERT INTO public."hardware_usage_rollup" AS r
+        (job_id, resolution, bucket, count, min, max, sum, sum_sq)
+    SELECT
+        job_id,
+        res,
+        to_timestamp(floor(extract(epoch FROM bucket) / res) * res),
+        sum(n), min(mn), max(mx), sum(s), sum(ss)
+    FROM base CROSS JOIN unnest(%(resolutions)s::int[]) AS res
+    GROUP BY job_id, res, 3
+    ON CONFLICT (job_id, resolution, bucket) DO UPDATE SET
+        count = r.count + EXCLUDED.count,
+        min = LEAST(r.min, EXCLUDED.min),
+        max = GREATEST(r.max, EXCLUDED.max),
+        sum = r.sum + EXCLUDED.sum,
+        sum_sq = r.sum_sq + EXCLUDED.sum_sq
+"""
+
+
+def _check_resolutions(resolutions: Sequence[int]) -> list[int]:
+    res = sorted(int(r) for r in resolutions)
+    if not res or res[0] <= 0 or any(r % res[0] for r in res):
+        raise ValueError("resolutions must be positive multiples of the finest one.")
+    return res
+
+
+def _refresh_job(cur, job_id: str, resolutions: list[int]) -> int:
+    cur.execute(
+        """
+        INSERT INTO public."rollup_watermark" (job_id) VALUES (%s)
+        ON CONFLICT (job_id) DO NOTHING
+        """,
+        (job_id,),
+    )
+    # Row lock: concurrent refreshes of the same job serialize here
+    cur.execute('SELECT last_id FROM public."rollup_watermark" WHERE job_id = %s FOR UPDATE', (job_id,))
+    last_id = cur.fetchone()[0]
+    cur.execute(
+        'SELECT max(id), count(*) FROM public."hardware_usage" WHERE job_id = %s AND id > %s',
+        (job_id, last_id),
+    )
+    upto, n_new = cur.fetchone()
+    if not n_new:
+        return 0
+
+    cur.execute(_REFRESH_SQL, {
+        "job_id": job_id, "last_id": last_id, "upto": upto,
+        "finest": resolutions[0], "resolutions": resolutions,
+    })
+    cur.execute('UPDATE public."rollup_watermark" SET last_id = %s WHERE job_id = %s', (upto, job_id))
+    return n_new
+
+
+def refresh_rollups(job_id: Optional[str] = None, resolutions: Sequence[int] = RESOLUTIONS) -> int:
+    """
+    Incrementally fold new hardware_usage rows into public.hardware_usage_rollup.
+
+    Only rows above the job's watermark (last processed hardware_usage.id) are
+    read; their count/min/max/sum/sum of squares are merged into the existing
+    buckets of every resolution. Each job is refreshed in its own transaction.
+    With job_id=None every job with new rows is refreshed.
+
+    The watermark assumes ids are committed in order, which holds for the
+    single-writer-per-job ingestion in stress_test.py.
+
+    Returns number of raw rows folded in.
+    """
+    resolutions = _check_resolutions(resolutions)
+    conn = get_db_conn()
+    try:
+        if job_id is None:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        """
+                        SELECT DISTINCT h.job_id
+                        FROM public."hardware_usage" h
+                        LEFT JOIN public."rollup_watermark" w ON w.job_id = h.job_id
+                        WHERE h.id > coalesce(w.last_id, 0)
+                        """
+                    )
+                    job_ids = [str(r[0]) for r in cur.fetchall()]
+        else:
+            job_ids = [job_id]
+
+        total = 0
+        for jid in job_ids:
+            with conn:
+                with conn.cursor() as cur:
+                    total += _refresh_job(cur, jid, resolutions)
+        return total
+    finally:
+        conn.close()
+
+
+def choose_resolution(start: datetime, end: datetime, max_points: int,
+                      resolutions: Sequence[int] = RESOLUTIONS) -> int:
+    """
+    Pick the finest resolution whose bucket count over [start, end] fits in
+    `max_points` (i.e. the least coarse level that satisfies the point budget).
+    Falls back to the coarsest level when none fits.
+    """
+    if max_points <= 0:
+        raise ValueError("max_points must be > 0.")
+    span = max((pd.Timestamp(end) - pd.Timestamp(start)).total_seconds(), 0.0)
+    res = _check_resolutions(resolutions)
+    for r in res:
+        if math.floor(span / r) + 1 <= max_points:
+            return r
+    return res[-1]
+
+
+def read_usage_series(
+    job_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    max_points: int = 2_000,
+    resolutions: Sequence[int] = RESOLUTIONS,
+) -> pd.DataFrame:
+    """
+    Read a job's usage over [start, end] from the rollups at the finest resolution
+    that stays within `max_points` buckets.
+
+    Returns columns: bucket, count, min, max, mean, std (population), with the
+    chosen bucket width in seconds in `df.attrs["resolution"]`.
+    Missing bounds default to the job's first/last bucket.
+    """
+    res = _check_resolutions(resolutions)
+    conn = get_db_conn()
+    try:
+        if start is None or end is None:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT min(bucket), max(bucket) + make_interval(secs => %s)
+                    FROM public."hardware_usage_rollup"
+                    WHERE job_id = %s AND resolution = %s
+                    """,
+                    (res[-1], job_id, res[-1]),
+                )
+                first, last = cur.fetchone()
+            start = start if start is not None else first
+            end = end if end is not None else last
+
+        if start is None or end is None:
+            df = pd.DataFrame(columns=["bucket", "count", "min", "max", "mean", "std"])
+            df.attrs["resolution"] = None
+            return df
+
+        resolution = choose_resolution(start, end, max_points, res)
+        df = pd.read_sql(
+            """
+            SELECT bucket, count, min, max, sum, sum_sq
+            FROM public."hardware_usage_rollup"
+            WHERE job_id = %s AND resolution = %s
+              AND bucket >= to_timestamp(floor(extract(epoch FROM %s::timestamptz) / %s) * %s)
+              AND bucket <= %s
+            ORDER BY bucket
+            """,
+            conn,
+            params=(job_id, resolution, start, resolution, resolution, end),
+        )
+    finally:
+        conn.close()
+
+    df["bucket"] = pd.to_datetime(df["bucket"], utc=True)
+    n = df["count"].astype(float).replace(0, np.nan)
+    df["mean"] = df["sum"] / n
+    df["std"] = np.sqrt((df["sum_sq"] / n - df["mean"] ** 2).clip(lower=0))
+    df = df.drop(columns=["sum", "sum_sq"])
+    df.attrs["resolution"] = resolution
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh hardware_usage rollup tables.")
+    parser.add_argument("--job", help="Only this job id (default: every job with new rows).")
+    parser.add_argument("--every", type=float, default=None,
+                        help="Keep running, refreshing every N seconds.")
+    args = parser.parse_args()
+
+    while True:
+        start = time.monotonic()
+        try:
+            n = refresh_rollups(job_id=args.job)
+        except Exception as e:
+            print(f"[DB] Rollup refresh failed: {e}", file=sys.stderr)
+            if args.every is None:
+                sys.exit(1)
+        else:
+            print(f"[INFO] Folded {n} new rows into rollups in {time.monotonic() - start:.2f}s.")
+        if args.every is None:
+            break
+        time.sleep(args.every)
@@ -1,5 +1,5 @@
--- ENUM type to choose only between RAM and CPU 
-CREATE TYPE resource_type AS ENUM ('CPU', 'RAM');
+-- ENUM type to choose between RAM, CPU and MULTI (several metrics in one job)
+CREATE TYPE resource_type AS ENUM ('CPU', 'RAM', 'MULTI');
 
 -- Create Tables
 CREATE TABLE "job" (
@@ -21,13 +21,20 @@ CREATE TABLE "hardware_usage"(
     "reading" NUMERIC(7,4),
     "job_id" UUID NOT NULL, 
 
-    -- Primary Key
-    PRIMARY KEY ("id"),
+    -- Primary Key (must include the partition key)
+    PRIMARY KEY ("id", "date_time"),
 
     -- Constraints
     CONSTRAINT "job_id" FOREIGN KEY ("job_id") 
 	    REFERENCES public."job" ("id")
-);
+) PARTITION BY RANGE ("date_time");
+
+-- Catch-all partition; monthly partitions are added by database/partitions.py
+CREATE TABLE "hardware_usage_default" PARTITION OF "hardware_usage" DEFAULT;
+
+-- Per-job time-ordered access (reads, rolling windows) and cheap time-range pruning
+CREATE INDEX "hardware_usage_job_time" ON "hardware_usage" ("job_id", "date_time");
+CREATE INDEX "hardware_usage_time_brin" ON "hardware_usage" USING BRIN ("date_time");
 
 
 CREATE TABLE "outlier"(
@@ -39,12 +46,20 @@ CREATE TABLE "outlier"(
     "job_id" UUID NOT NULL,
 
     -- Primary Key 
-    PRIMARY KEY ("id"),
+    PRIMARY KEY ("id", "date_time"),
 
     -- Constraints 
     CONSTRAINT "job_id" FOREIGN KEY ("job_id") 
 	    REFERENCES public."job" ("id")
-);
+) PARTITION BY RANGE ("date_time");
+
+-- Catch-all partition; monthly partitions are added by database/partitions.py
+CREATE TABLE "outlier_default" PARTITION OF "outlier" DEFAULT;
+
+-- Per-job time-ordered access and cheap time-range pruning. The key is unique:
+-- one result per reading, so re-runs merge (database/merge.py) instead of duplicating rows
+CREATE UNIQUE INDEX "outlier_job_time_key" ON "outlier" ("job_id", "date_time");
+CREATE INDEX "outlier_time_brin" ON "outlier" USING BRIN ("date_time");
 
 
 CREATE TABLE "rolling_window"(
@@ -53,11 +68,120 @@ CREATE TABLE "rolling_window"(
     "date_time" TIMESTAMPTZ NOT NULL, 
     "rolling_value" NUMERIC(7,4),  
     "job_id" UUID NOT NULL,
+    "method" TEXT NOT NULL DEFAULT '',          -- rolling function, e.g. rolling_mean
+    "window_size" INTEGER NOT NULL DEFAULT 0,
 
     -- Primary Key 
-    PRIMARY KEY ("id"),
+    PRIMARY KEY ("id", "date_time"),
 
     -- Constraints 
     CONSTRAINT "job_id" FOREIGN KEY ("job_id") 
 	    REFERENCES public."job" ("id")
-);
\ No newline at end of file
+) PARTITION BY RANGE ("date_time");
+
+-- Catch-all partition; monthly partitions are added by database/partitions.py
+CREATE TABLE "rolling_window_default" PARTITION OF "rolling_window" DEFAULT;
+
+-- Per-job time-ordered access and cheap time-range pruning. The key is unique:
+-- one value per (job, method, window, reading), so re-runs merge instead of duplicating rows
+CREATE UNIQUE INDEX "rolling_window_job_method_time_key" ON "rolling_window" ("job_id", "method", "window_size", "date_time");
+CREATE INDEX "rolling_window_time_brin" ON "rolling_window" USING BRIN ("date_time");
+
+
+-- Multi-metric jobs: one series per metric (e.g. cpu0, ram_percent, net_recv_bytes)
+CREATE TABLE "metric_series"(
+    -- Columns
+    "id" SERIAL,
+    "job_id" UUID NOT NULL,
+    "name" TEXT NOT NULL,
+
+    -- Primary Key
+    PRIMARY KEY ("id"),
+
+    -- Constraints
+    CONSTRAINT "metric_series_job_name" UNIQUE ("job_id", "name"),
+    CONSTRAINT "job_id" FOREIGN KEY ("job_id")
+	    REFERENCES public."job" ("id")
+);
+
+
+CREATE TABLE "metric_reading"(
+    -- Columns (no surrogate key: rows are written in columnar blocks via COPY)
+    "series_id" INTEGER NOT NULL,
+    "date_time" TIMESTAMPTZ NOT NULL,
+    "value" DOUBLE PRECISION,
+
+    -- Constraints
+    CONSTRAINT "series_id" FOREIGN KEY ("series_id")
+	    REFERENCES public."metric_series" ("id")
+);
+
+CREATE INDEX "metric_reading_series_time" ON "metric_reading" ("series_id", "date_time");
+
+
+-- Pre-aggregated hardware_usage per job at several resolutions (see database/rollup.py)
+CREATE TABLE "hardware_usage_rollup"(
+    -- Columns
+    "job_id" UUID NOT NULL,
+    "resolution" INTEGER NOT NULL,          -- bucket width in seconds
+    "bucket" TIMESTAMPTZ NOT NULL,          -- bucket start
+    "count" BIGINT NOT NULL,                -- non-NULL readings in the bucket
+    "min" DOUBLE PRECISION,
+    "max" DOUBLE PRECISION,
+    "sum" DOUBLE PRECISION NOT NULL,
+    "sum_sq" DOUBLE PRECISION NOT NULL,
+
+    -- Primary Key
+    PRIMARY KEY ("job_id", "resolution", "bucket"),
+
+    -- Constraints
+    CONSTRAINT "job_id" FOREIGN KEY ("job_id")
+	    REFERENCES public."job" ("id")
+);
+
+
+-- Last hardware_usage.id folded into the rollups, per job
+CREATE TABLE "rollup_watermark"(
+    "job_id" UUID NOT NULL,
+    "last_id" BIGINT NOT NULL DEFAULT 0,
+
+    PRIMARY KEY ("job_id"),
+
+    CONSTRAINT "job_id" FOREIGN KEY ("job_id")
+	    REFERENCES public."job" ("id")
+);
+
+
+-- Compact outlier results: one row per job, bit i flags hardware_usage.id = first_id + i
+-- (bits are LSB-first within each byte, as read by get_bit)
+CREATE TABLE "outlier_bitmap"(
+    -- Columns
+    "job_id" UUID NOT NULL,
+    "first_id" BIGINT NOT NULL,
+    "last_id" BIGINT NOT NULL,
+    "n_outliers" BIGINT NOT NULL,
+    "bits" BYTEA NOT NULL,
+    "updated_at" TIMESTAMPTZ NOT NULL DEFAULT now(),
+
+    -- Primary Key
+    PRIMARY KEY ("job_id"),
+
+    -- Constraints
+    CONSTRAINT "job_id" FOREIGN KEY ("job_id")
+	    REFERENCES public."job" ("id")
+);
+
+
+-- Last hardware_usage.id processed incrementally, per job and derived stage
+-- (stage is e.g. 'outlier' or 'rolling:rolling_mean:10', see processing_worker.py)
+CREATE TABLE "processing_watermark"(
+    "job_id" UUID NOT NULL,
+    "stage" TEXT NOT NULL,
+    "last_id" BIGINT NOT NULL DEFAULT 0,
+    "updated_at" TIMESTAMPTZ NOT NULL DEFAULT now(),
+
+    PRIMARY KEY ("job_id", "stage"),
+
+    CONSTRAINT "job_id" FOREIGN KEY ("job_id")
+	    REFERENCES public."job" ("id")
+);
@@ -0,0 +1,207 @@
+import io
+import json
+import os
+import struct
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from .insertion import get_db_conn, insert_job, insert_metric_series, insert_metric_block, notify_readings
+
+__all__ = [
+    "SpillFile",
+    "read_spill",
+    "copy_spilled",
+    "replay_spill",
+    "replay_directory",
+]
+
+MAGIC = b"TSSPILL1"
+SPILL_SUFFIX = ".spill"
+
+# File layout (little endian):
+#   MAGIC | uint32 header length | JSON header | records...
+# Each record is an int64 UTC epoch-ns timestamp followed by n_values float64
+# (n_values = 1 for hardware_usage, one per series for metric_reading).
+# A torn trailing record (crash mid-write) is ignored on read.
+
+
+def _record_dtype(n_values: int) -> np.dtype:
+    return np.dtype([("ts", "<i8"), ("values", "<f8", (n_values,))])
+
+
+class SpillFile:
+    """
+    Local append-only spill file for readings that could not (yet) be written to Postgres.
+
+    The header carries everything replay needs to recreate the job on its own:
+    the job row (id, start_time, resource, description) and, for MULTI jobs,
+    the series names (ids are resolved again at replay time).
+
+    table: "hardware_usage" or "metric_reading"
+    """
+
+    def __init__(self, path: str | Path, job: dict, table: str = "hardware_usage",
+                 series_names: list[str] | None = None, fsync: bool = True):
+        if table not in ("hardware_usage", "metric_reading"):
+            raise ValueError(f"Unsupported spill table '{table}'.")
+        if table == "metric_reading" and not series_names:
+            raise ValueError("series_names are required for metric_reading spills.")
+
+        self.path = Path(path)
+        self.header = {
+            "version": 1,
+            "table": table,
+            "job": {k: str(v) for k, v in job.items()},
+            "series_names": list(series_names or []),
+        }
+        self.n_values = len(series_names) if table == "metric_reading" else 1
+        self.dtype = _record_dtype(self.n_values)
+        self.fsync = fsync
+        self.rows = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists() and self.path.stat().st_size > 0:
+            existing, offset = _read_header(self.path)
+            if existing["job"]["id"] != self.header["job"]["id"] or existing["table"] != table:
+                raise ValueError(f"{self.path} belongs to another job/table; replay it first.")
+            # Cut a torn trailing record so new appends stay aligned
+            self.rows = (self.path.stat().st_size - offset) // self.dtype.itemsize
+            os.truncate(self.path, offset + self.rows * self.dtype.itemsize)
+            self._f = open(self.path, "ab")
+        else:
+            self._f = open(self.path, "wb")
+            self._write_header()
+
+    def _write_header(self) -> None:
+        raw = json.dumps(self.header).encode()
+        self._f.write(MAGIC + struct.pack("<I", len(raw)) + raw)
+        self._sync()
+
+    def _sync(self) -> None:
+        self._f.flush()
+        if self.fsync:
+            os.fsync(self._f.fileno())
+
+    def append(self, timestamps_ns: np.ndarray, values: np.ndarray) -> int:
+        """
+        Append n records; `values` is (n,) or (n, n_values). Returns n.
+        """
+        n = len(timestamps_ns)
+        if n == 0:
+            return 0
+        rec = np.empty(n, dtype=self.dtype)
+        rec["ts"] = timestamps_ns
+        rec["values"] = np.asarray(values, dtype=np.float64).reshape(n, self.n_values)
+        self._f.write(rec.tobytes())
+        self._sync()
+        self.rows += n
+        return n
+
+    def truncate(self) -> None:
+        """
+        Drop every record (after a successful replay) but keep the file usable.
+        """
+        self._f.close()
+        self._f = open(self.path, "wb")
+        self._write_header()
+        self.rows = 0
+
+    def close(self, remove_if_empty: bool = True) -> None:
+        self._f.close()
+        if remove_if_empty and self.rows == 0:
+            self.path.unlink(missing_ok=True)
+
+
+def _read_header(path: str | Path) -> tuple[dict, int]:
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a spill file.")
+        (hlen,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(hlen))
+    return header, len(MAGIC) + 4 + hlen
+
+
+def read_spill(path: str | Path) -> tuple[dict, np.ndarray, np.ndarray]:
+    """
+    Read a spill file. Returns (header, timestamps_ns (n,), values (n, n_values)).
+    """
+    header, offset = _read_header(path)
+    n_values = len(header["series_names"]) if header["table"] == "metric_reading" else 1
+    dtype = _record_dtype(n_values)
+    n = (Path(path).stat().st_size - offset) // dtype.itemsize
+    if n == 0:
+        return header, np.empty(0, dtype=np.int64), np.empty((0, n_values))
+    rec = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(n,))
+    return header, np.array(rec["ts"]), np.array(rec["values"])
+
+
+def copy_spilled(cur, header: dict, timestamps_ns: np.ndarray, values: np.ndarray) -> int:
+    """
+    Bulk-load spilled records with one COPY, creating the job (and series) first if needed.
+    Returns number of readings loaded.
+    """
+    if len(timestamps_ns) == 0:
+        return 0
+    job = header["job"]
+    insert_job(cur, datetime.fromisoformat(job["start_time"]), job["resource"], job["description"], job_id=job["id"])
+
+    if header["table"] == "metric_reading":
+        series_ids = insert_metric_series(cur, job["id"], header["series_names"])
+        insert_metric_block(cur, series_ids, timestamps_ns, values)
+        return len(timestamps_ns)
+
+    stamps = np.datetime_as_string(timestamps_ns.astype("datetime64[ns]").astype("datetime64[us]")) + "Z"
+    readings = values[:, 0]
+    text = np.where(np.isnan(readings), "", np.char.mod("%.4f", readings))
+    buf = io.StringIO("\n".join(f"{t},{r},{job['id']}" for t, r in zip(stamps, text)))
+    cur.copy_expert(
+        """
+        COPY public."hardware_usage" (date_time, reading, job_id) FROM STDIN WITH (FORMAT csv)
+        """,
+        buf,
+    )
+    notify_readings(cur, [job["id"]])
+    return len(timestamps_ns)
+
+
+def replay_spill(conn, path: str | Path, remove: bool = True) -> int:
+    """
+    Load one spill file in a single transaction, then delete it.
+    Returns number of readings loaded.
+    """
+    header, ts, values = read_spill(path)
+    with conn:
+        with conn.cursor() as cur:
+            loaded = copy_spilled(cur, header, ts, values)
+    if remove:
+        Path(path).unlink(missing_ok=True)
+    return loaded
+
+
+def replay_directory(directory: str | Path) -> int:
+    """
+    Replay every *.spill file in `directory`. Returns total readings loaded.
+    """
+    total = 0
+    conn = get_db_conn()
+    try:
+        for path in sorted(Path(directory).glob(f"*{SPILL_SUFFIX}")):
+            loaded = replay_spill(conn, path)
+            total += loaded
+            print(f"[DB] Replayed {loaded} readings from {path.name}")
+    finally:
+        conn.close()
+    return total
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else "spill"
+    try:
+        total = replay_directory(target)
+    except Exception as e:
+        print(f"[DB] Replay failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"[DONE] Replayed {total} readings from {target}.")
@@ -0,0 +1,73 @@
+import io
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+from psycopg2 import sql
+
+from .insertion import get_db_conn
+
+__all__ = [
+    "read_hardware_usage",
+    "normalize_usage",
+]
+
+
+def normalize_usage(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    tz-aware UTC date_time and float readings at the DB scale (NUMERIC(7,4)).
+    """
+    if not df.empty:
+        df["date_time"] = pd.to_datetime(df["date_time"], utc=True, format="ISO8601")
+        df["reading"] = df["reading"].astype(float).round(4)
+    return df
+
+
+def read_hardware_usage(job_id: Optional[str] = None, start: Optional[datetime] = None,
+                        end: Optional[datetime] = None, conn=None) -> pd.DataFrame:
+    """
+    Read hardware_usage rows into a pandas DataFrame, optionally for one job
+    and within [start, end) (time bounds let Postgres prune the monthly partitions).
+
+    Rows are streamed with one `COPY (SELECT ...) TO STDOUT` and parsed by
+    pd.read_csv, which is much cheaper than building Python row tuples.
+    Pass `conn` to read inside the caller's transaction; otherwise a
+    connection is opened and closed here.
+
+    Returns columns: id, job_id, reading, date_time, ordered by (job_id, date_time, id)
+    (the row order of the SQL rolling backend's window functions).
+    """
+    where = []
+    if job_id:
+        where.append(sql.SQL("job_id = {}").format(sql.Literal(str(job_id))))
+    if start is not None:
+        where.append(sql.SQL("date_time >= {}").format(sql.Literal(start)))
+    if end is not None:
+        where.append(sql.SQL("date_time < {}").format(sql.Literal(end)))
+    query = sql.SQL(
+        """
+        COPY (
+            SELECT id, job_id, reading, date_time
+            FROM public."hardware_usage"
+            {where}
+            ORDER BY job_id, date_time, id
+        ) TO STDOUT WITH (FORMAT csv, HEADER)
+        """
+    ).format(where=sql.SQL("WHERE ") + sql.SQL(" AND ").join(where) if where else sql.SQL(""))
+
+    own = conn is None
+    conn = get_db_conn() if own else conn
+    try:
+        buf = io.StringIO()
+        with conn.cursor() as cur:
+            # COPY does not take bind parameters, so values are inlined as literals
+            cur.copy_expert(query.as_string(cur), buf)
+        if own:
+            conn.rollback()
+    finally:
+        if own:
+            conn.close()
+
+    buf.seek(0)
+    df = pd.read_csv(buf, dtype={"id": "int64", "job_id": str, "reading": "float64", "date_time": str})
+    return normalize_usage(df)
@@ -0,0 +1,412 @@
+import queue
+import sys
+import threading
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Callable, Sequence, Tuple
+
+import numpy as np
+
+from .insertion import get_db_conn, insert_readings_batch, insert_metric_block
+from .spill import SpillFile, copy_spilled, read_spill
+
+__all__ = [
+    "WriterStats",
+    "BatchWriter",
+    "MetricRingBuffer",
+    "BlockWriter",
+]
+
+_STOP = object()
+
+
+@dataclass
+class WriterStats:
+    """
+    Backpressure / throughput counters of a writer.
+    """
+    submitted: int = 0
+    dropped: int = 0              # rows rejected because the queue was full
+    written: int = 0
+    batches: int = 0
+    queue_high_water: int = 0     # largest queue depth seen by the sampler
+    last_flush_seconds: float = 0.0
+    max_flush_seconds: float = 0.0
+    total_flush_seconds: float = 0.0
+    spilled: int = 0              # rows sent to the local spill file
+    replayed: int = 0             # spilled rows bulk-loaded back into the DB
+    db_failures: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class _DurableWriter(threading.Thread):
+    """
+    Connection handling shared by the writers.
+
+    Without a spill file a failed write stops the writer (`error` is set).
+    With one, a failed or lagging write is appended to the spill file instead,
+    the connection is retried every `retry_interval` seconds and, once the DB is
+    reachable and the writer has caught up, the whole spill is loaded back with
+    a single COPY before new rows are written.
+
+    conn:
+        An open psycopg2 connection, or None if the DB was unreachable at start.
+    prepare:
+        Optional callback(cur) run on every reconnect, e.g. to create the job row
+        when the job was started while the DB was down.
+    """
+
+    def __init__(self, name: str, conn, spill: SpillFile | None = None,
+                 retry_interval: float = 10.0, prepare: Callable | None = None):
+        super().__init__(name=name, daemon=True)
+        self.conn = conn
+        self.spill = spill
+        self.retry_interval = retry_interval
+        self.prepare = prepare
+        self.stats = WriterStats()
+        self.error: BaseException | None = None
+        self._last_attempt = float("-inf")
+        self._lock = threading.Lock()
+
+    def _reconnect(self) -> bool:
+        if time.monotonic() - self._last_attempt < self.retry_interval:
+            return False
+        self._last_attempt = time.monotonic()
+        try:
+            conn = get_db_conn(exit_on_failure=False)
+        except Exception:
+            return False
+        try:
+            if self.prepare is not None:
+                with conn:
+                    with conn.cursor() as cur:
+                        self.prepare(cur)
+        except Exception as e:
+            print(f"[DB] Reconnected but setup failed: {e}", file=sys.stderr)
+            conn.close()
+            return False
+        self.conn = conn
+        print("[DB] Connection restored.")
+        return True
+
+    def _drop_connection(self, e: Exception) -> None:
+        self.stats.db_failures += 1
+        print(f"[DB] Write failed ({e}); spilling to {self.spill.path} until the DB is back.", file=sys.stderr)
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+        self.conn = None
+        self._last_attempt = time.monotonic()
+
+    def _replay_spill(self) -> bool:
+        """
+        Bulk-load the spill file (if it has rows) in one transaction. Returns False on failure.
+        """
+        if self.spill is None or self.spill.rows == 0:
+            return True
+        header, ts, values = read_spill(self.spill.path)
+        try:
+            with self.conn:
+                with self.conn.cursor() as cur:
+                    loaded = copy_spilled(cur, header, ts, values)
+        except Exception as e:
+            self._drop_connection(e)
+            return False
+        self.spill.truncate()
+        self.stats.replayed += loaded
+        print(f"[DB] Replayed {loaded} spilled readings.")
+        return True
+
+    def _persist(self, insert: Callable, timestamps_ns: np.ndarray, values: np.ndarray, defer: bool = False) -> None:
+        """
+        Write one batch with `insert(cur)`, falling back to the spill file.
+        `defer=True` (writer lagging) sends the batch straight to the spill.
+        """
+        if self.conn is None and self.spill is not None:
+            self._reconnect()
+
+        if self.conn is not None and not defer and self._replay_spill():
+            start = time.monotonic()
+            try:
+                with self.conn:
+                    with self.conn.cursor() as cur:
+                        insert(cur)
+            except Exception as e:
+                if self.spill is None:
+                    raise
+                self._drop_connection(e)
+            else:
+                self._record_flush(len(timestamps_ns), time.monotonic() - start)
+                return
+
+        if self.spill is None:
+            raise RuntimeError("No database connection.")
+        self.stats.spilled += self.spill.append(timestamps_ns, values)
+
+    def _record_flush(self, n: int, elapsed: float) -> None:
+        with self._lock:
+            s = self.stats
+            s.written += n
+            s.batches += 1
+            s.last_flush_seconds = elapsed
+            s.max_flush_seconds = max(s.max_flush_seconds, elapsed)
+            s.total_flush_seconds += elapsed
+
+    def _retry_spill(self) -> None:
+        """
+        While idle, try to bring the DB back and load what was spilled.
+        """
+        if self.spill is not None and self.spill.rows and (self.conn is not None or self._reconnect()):
+            self._replay_spill()
+
+    def _finish(self) -> None:
+        """
+        Last chance to load the spill on shutdown; otherwise it stays on disk
+        for `python -m database.spill`.
+        """
+        if self.spill is None:
+            return
+        self._last_attempt = float("-inf")
+        self._retry_spill()
+        if self.spill.rows:
+            print(f"[DB] {self.spill.rows} readings left in {self.spill.path}; "
+                  f"replay with: python -m database.spill {self.spill.path.parent}", file=sys.stderr)
+        self.spill.close()
+
+
+class BatchWriter(_DurableWriter):
+    """
+    Background writer that persists hardware readings off the sampling thread.
+
+    The sampler calls `submit(row)`, which never blocks: rows go into a bounded
+    queue and a full queue is counted in `stats.dropped` instead of stalling
+    the sampling clock. The writer thread drains the queue and flushes a batch
+    with `insert_readings_batch` when `batch_size` rows are buffered or the
+    oldest buffered row is `flush_interval` seconds old, whichever comes first.
+    With a spill file, a backlog above `spill_threshold` queued rows is moved to
+    the spill in one go and bulk-loaded once the writer has caught up.
+    `close()` flushes everything still queued and joins the thread.
+    """
+
+    def __init__(self, conn, batch_size: int = 60, flush_interval: float = 5.0, max_queue: int = 100_000,
+                 spill: SpillFile | None = None, spill_threshold: int | None = None, **kwargs):
+        super().__init__("db-writer", conn, spill=spill, **kwargs)
+        if batch_size <= 0 or flush_interval <= 0:
+            raise ValueError("batch_size and flush_interval must be > 0.")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.spill_threshold = spill_threshold or max(batch_size * 10, max_queue // 4)
+
+    # ------------------------------------------------------------------ sampler side
+    def submit(self, row: Tuple[datetime, float, str]) -> bool:
+        """
+        Enqueue one (date_time, reading, job_id) row without blocking.
+        Returns False if the row was dropped (queue full or writer failed).
+        """
+        with self._lock:
+            self.stats.submitted += 1
+        if self.error is not None:
+            with self._lock:
+                self.stats.dropped += 1
+            return False
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self.stats.dropped += 1
+            return False
+
+        depth = self.queue.qsize()
+        with self._lock:
+            self.stats.queue_high_water = max(self.stats.queue_high_water, depth)
+        return True
+
+    def close(self, timeout: float | None = None) -> None:
+        """
+        Ask the writer to flush everything queued so far and wait for it to finish.
+        """
+        if self.is_alive():
+            self.queue.put(_STOP)
+            self.join(timeout)
+
+    # ------------------------------------------------------------------ writer side
+    def run(self):
+        batch = []
+        batch_started = 0.0
+        stopping = False
+
+        try:
+            while not stopping:
+                # Block until a row arrives, or until the oldest buffered row is due
+                timeout = None if not batch else max(0.0, self.flush_interval - (time.monotonic() - batch_started))
+                if self.spill is not None and self.spill.rows:
+                    timeout = self.retry_interval if timeout is None else min(timeout, self.retry_interval)
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                if item is _STOP:
+                    stopping = True
+                elif item is not None:
+                    if not batch:
+                        batch_started = time.monotonic()
+                    batch.append(item)
+
+                lagging = self.spill is not None and self.queue.qsize() > self.spill_threshold
+                if lagging:
+                    # Move the whole backlog to disk at once; it is replayed as one COPY later
+                    while not stopping:
+                        try:
+                            item = self.queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        if item is _STOP:
+                            stopping = True
+                        else:
+                            batch.append(item)
+
+                due = batch and time.monotonic() - batch_started >= self.flush_interval
+                if batch and (len(batch) >= self.batch_size or due or stopping or lagging):
+                    self._flush(batch, defer=lagging)
+                    batch = []
+                elif not batch:
+                    self._retry_spill()
+            self._finish()
+        except Exception as e:
+            self.error = e
+            print(f"[DB] Writer failed, {len(batch)} readings not stored: {e}", file=sys.stderr)
+
+    def _flush(self, batch: list, defer: bool = False) -> None:
+        timestamps_ns = np.array([int(row[0].timestamp() * 1e6) * 1000 for row in batch], dtype=np.int64)
+        values = np.array([np.nan if row[1] is None else row[1] for row in batch], dtype=np.float64)
+        self._persist(lambda cur: insert_readings_batch(cur, batch), timestamps_ns, values, defer=defer)
+
+
+class MetricRingBuffer:
+    """
+    Preallocated ring buffer for k metrics sampled together.
+
+    Timestamps are int64 epoch nanoseconds and values a float64 (capacity, k)
+    array, so a sample is written in place with no per-sample objects. One
+    producer (the sampler) and one consumer (the writer) may use it concurrently.
+    When the writer falls a full buffer behind, the oldest rows are overwritten
+    and counted in `overwritten`.
+    """
+
+    def __init__(self, capacity: int, n_metrics: int):
+        if capacity <= 0 or n_metrics <= 0:
+            raise ValueError("capacity and n_metrics must be > 0.")
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self.values = np.full((capacity, n_metrics), np.nan, dtype=np.float64)
+        self.overwritten = 0
+        self._head = 0      # next slot to write (monotonic counter, not wrapped)
+        self._tail = 0      # next slot to read
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._head - self._tail
+
+    def next_slot(self) -> int:
+        """
+        Reserve the row the producer should fill next; call `commit()` once filled.
+        When the buffer is full the oldest row is dropped first, so `take()` never
+        copies the row being written.
+        """
+        with self._lock:
+            if self._head - self._tail >= self.capacity:
+                self.overwritten += self._head - self._tail - self.capacity + 1
+                self._tail = self._head - self.capacity + 1
+            return self._head % self.capacity
+
+    def commit(self, timestamp_ns: int) -> None:
+        """
+        Publish the row reserved by `next_slot()`.
+        """
+        self.timestamps[self._head % self.capacity] = timestamp_ns
+        with self._lock:
+            self._head += 1
+
+    def take(self, max_rows: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Remove and return up to `max_rows` of the oldest rows as contiguous copies
+        (timestamps (n,), values (n, k)).
+        """
+        with self._lock:
+            n = self._head - self._tail
+            if max_rows is not None:
+                n = min(n, max_rows)
+            start = self._tail % self.capacity
+            idx = (start + np.arange(n)) % self.capacity
+            ts, vals = self.timestamps[idx], self.values[idx]
+            self._tail += n
+        return ts, vals
+
+
+class BlockWriter(_DurableWriter):
+    """
+    Background writer that drains a MetricRingBuffer into public.metric_reading
+    in columnar blocks (one COPY per block), every `flush_interval` seconds or
+    as soon as `block_size` rows are waiting. With a spill file, a buffer more
+    than half full is moved to the spill in one go instead of being overwritten.
+
+    series_ids may be None when the DB was unreachable at start; blocks are then
+    spilled until `prepare` (run on reconnect) sets them.
+    """
+
+    def __init__(self, conn, buffer: MetricRingBuffer, series_ids: Sequence[int] | None,
+                 block_size: int = 1_000, flush_interval: float = 5.0,
+                 spill: SpillFile | None = None, **kwargs):
+        super().__init__("db-block-writer", conn, spill=spill, **kwargs)
+        self.buffer = buffer
+        self.series_ids = list(series_ids) if series_ids is not None else None
+        self.block_size = block_size
+        self.flush_interval = flush_interval
+        self._wake = threading.Event()
+        self._stopping = False
+
+    def notify(self) -> None:
+        """
+        Called by the sampler after a commit; wakes the writer once a block is ready.
+        """
+        if len(self.buffer) >= self.block_size:
+            self._wake.set()
+
+    def close(self, timeout: float | None = None) -> None:
+        self._stopping = True
+        self._wake.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        try:
+            while True:
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                stopping = self._stopping
+                if self.spill is not None and len(self.buffer) > self.buffer.capacity // 2:
+                    self._flush(*self.buffer.take(), defer=True)
+                while len(self.buffer):
+                    self._flush(*self.buffer.take(self.block_size))
+                    if len(self.buffer) < self.block_size and not stopping:
+                        break
+                if stopping:
+                    break
+            self._finish()
+        except Exception as e:
+            self.error = e
+            print(f"[DB] Block writer failed: {e}", file=sys.stderr)
+
+    def _flush(self, timestamps: np.ndarray, values: np.ndarray, defer: bool = False) -> None:
+        self._persist(lambda cur: insert_metric_block(cur, self.series_ids, timestamps, values),
+                      timestamps, values, defer=defer or self.series_ids is None)
+        with self._lock:
+            s = self.stats
+            s.dropped = self.buffer.overwritten
+            s.queue_high_water = max(s.queue_high_water, len(self.buffer) + len(timestamps))
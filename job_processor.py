@@ -0,0 +1,149 @@
+import argparse
+import sys
+import time
+from datetime import datetime
+
+from database.insertion import get_db_conn
+from database.outlier_io import merge_outlier_bitmap, merge_outlier_flags
+from database.rolling_io import merge_rolling_values
+from database.rolling_sql import rolling_options
+from database.usage_io import read_hardware_usage
+from outlier_pipeline import build_outlier_flags, to_outlier_rows
+from rolling_pipeline import to_rolling_rows
+from timeseries_module.outliers import methods as outlier_methods
+from timeseries_module.outliers.interface import handle_outliers
+from timeseries_module.cli import parse_rolling
+from timeseries_module.rolling.interface import compute_rolling
+
+OUTLIER_FUNCTIONS = {
+    "zscore": outlier_methods.remove_outliers_zscore,
+    "iqr": outlier_methods.remove_outliers_iqr,
+    "lof": outlier_methods.remove_outliers_lof,
+    "linear_regression": outlier_methods.remove_outliers_linear_regression,
+    "seasonal": outlier_methods.remove_outliers_seasonal_residual,
+}
+
+DEFAULT_ROLLING = "mean:10"
+
+
+def parse_rolling_specs(text: str) -> list[tuple]:
+    """
+    "mean:10,std:30,max" -> [(rolling_mean, {"window": 10}), (rolling_std, {"window": 30}), (rolling_max, {})]
+    A spec without a window uses the compute_rolling default. Each spec is parsed like
+    timeseries-batch --rolling (two-series methods such as cov/corr are rejected).
+    """
+    specs = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        specs.append(parse_rolling(part))
+    return specs
+
+
+def process_job(
+    job_id: str,
+    outlier_fn=outlier_methods.remove_outliers_zscore,
+    sensitivity_degree: str = "HIGH",
+    rolling_specs: list[tuple] | None = None,
+    outlier_storage: str = "rows",
+    value_column: str = "reading",
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> dict:
+    """
+    Outlier detection and any number of rolling statistics for one job,
+    on a single read and a single write transaction.
+
+      1) Read the job's hardware_usage once (optionally within [start, end))
+      2) Run `outlier_fn` (None to skip) and every (rolling_fn, kwargs) in
+         `rolling_specs` on that same frame
+      3) Merge the outlier flags (outlier_storage="rows" or "bitmap") and every
+         rolling series into their tables in one transaction: either all
+         derived tables reflect this run or none does
+
+    Like the standalone pipelines, the writes only touch rows that changed.
+    With start/end, stale rows outside the range are kept.
+
+    Returns {stage: rows written}, e.g. {"outlier": 12, "rolling:rolling_mean:10": 3600}.
+    """
+    if outlier_storage not in ("rows", "bitmap"):
+        raise ValueError("outlier_storage must be 'rows' or 'bitmap'.")
+    if outlier_storage == "bitmap" and (start is not None or end is not None):
+        raise ValueError("The outlier bitmap covers whole jobs; start/end need outlier_storage='rows'.")
+    rolling_specs = parse_rolling_specs(DEFAULT_ROLLING) if rolling_specs is None else rolling_specs
+    whole_job = start is None and end is None
+
+    conn = get_db_conn()
+    try:
+        # 1) Read once
+        df = read_hardware_usage(job_id=job_id, start=start, end=end, conn=conn)
+        if df.empty:
+            conn.rollback()
+            return {}
+
+        # 2) Compute everything from the same frame
+        flagged = None
+        if outlier_fn is not None:
+            kept = handle_outliers(df=df, outlier_fn=outlier_fn, sensitivity_degree=sensitivity_degree,
+                                   value_column=value_column, time_column="date_time")
+            flagged = build_outlier_flags(df, kept)
+
+        # Rolling methods copy their input, so give them only the value column
+        values = df[[value_column]]
+        rolling = []
+        for fn, kwargs in rolling_specs:
+            method = getattr(fn, "__name__", str(fn)).lower()
+            window_size = int(rolling_options(method, **kwargs)["window"])
+            out = compute_rolling(values, rolling_fn=fn, value_column=value_column,
+                                  **{**kwargs, "output_column": "rolling_value"})
+            rolling.append((method, window_size, out["rolling_value"].astype(float).round(4)))
+
+        # 3) One transaction for every derived table
+        written = {}
+        with conn:
+            with conn.cursor() as cur:
+                if flagged is not None:
+                    if outlier_storage == "bitmap":
+                        merge_outlier_bitmap(cur, job_id, flagged["id"].to_numpy(), flagged["outlier_flag"].to_numpy())
+                        written["outlier"] = len(flagged)
+                    else:
+                        written["outlier"] = merge_outlier_flags(
+                            cur, to_outlier_rows(flagged), delete_stale=whole_job).written
+                for method, window_size, col in rolling:
+                    written[f"rolling:{method}:{window_size}"] = merge_rolling_values(
+                        cur, to_rolling_rows(df, col), method=method, window_size=window_size,
+                        delete_stale=whole_job).written
+        return written
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compute outliers and rolling statistics for a job from one read, written in one transaction."
+    )
+    parser.add_argument("job_id", help="Job to process.")
+    parser.add_argument("--rolling", default=DEFAULT_ROLLING,
+                        help=f'Rolling specs as method[:window], comma separated (default "{DEFAULT_ROLLING}").')
+    parser.add_argument("--outlier-fn", choices=[*OUTLIER_FUNCTIONS, "none"], default="zscore",
+                        help="Outlier method (default zscore).")
+    parser.add_argument("--sensitivity", default="HIGH", help="Outlier sensitivity: low, medium or high.")
+    parser.add_argument("--storage", choices=["rows", "bitmap"], default="rows",
+                        help="Outlier result storage (default rows).")
+    args = parser.parse_args()
+
+    try:
+        specs = parse_rolling_specs(args.rolling)
+    except ValueError as e:
+        print(f"[Args] {e}", file=sys.stderr)
+        sys.exit(1)
+
+    t0 = time.monotonic()
+    result = process_job(args.job_id, outlier_fn=None if args.outlier_fn == "none" else OUTLIER_FUNCTIONS[args.outlier_fn],
+                         sensitivity_degree=args.sensitivity, rolling_specs=specs, outlier_storage=args.storage)
+    if not result:
+        print("[INFO] No hardware_usage data found for the given scope.")
+    else:
+        summary = ", ".join(f"{stage}={n}" for stage, n in result.items())
+        print(f"[INFO] Job {args.job_id}: {summary} in {time.monotonic() - t0:.2f}s")
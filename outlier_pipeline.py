@@ -1,7 +1,9 @@
 from typing import Iterable, Tuple
 import pandas as pd
 
-from database.outlier_io import read_hardware_usage, write_outlier_flags
+from database.incremental import advance_watermark, lock_watermark, read_increment
+from database.insertion import get_db_conn
+from database.outlier_io import merge_outlier_flags, read_hardware_usage, write_outlier_bitmap, write_outlier_flags
 from timeseries_module.outliers.interface import handle_outliers
 from timeseries_module.outliers.methods.zscore import remove_outliers_zscore
 
@@ -39,16 +41,23 @@ def to_outlier_rows(df_flagged: pd.DataFrame) -> Iterable[Tuple]:
         )
 
 
-def process_outliers(job_id:str) -> int:
+def process_outliers(job_id:str, storage: str = "rows") -> int:
     """
     Full pipeline:
       1) Read hardware_usage (filtered by job_id)
       2) Apply outlier removal -> df_kept (non-outliers)
       3) Merge to create outlier_flag for all original rows
-      4) Write results into public.outlier
+      4) Merge results into public.outlier keyed by (job_id, date_time) (storage="rows";
+         a re-run writes only the flags that changed), or only a packed
+         per-job bitmap into public.outlier_bitmap (storage="bitmap", one bit per
+         hardware_usage row; read back with database.outlier_io.read_hardware_usage_flagged)
 
-    Returns number of rows written.
+    Returns number of rows written (inserted, updated or deleted; rows covered by the
+    bitmap for storage="bitmap").
     """
+    if storage not in ("rows", "bitmap"):
+        raise ValueError("storage must be 'rows' or 'bitmap'.")
+
     # 1) Read
     df_raw = read_hardware_usage(job_id=job_id)
     if df_raw.empty:
@@ -62,12 +71,51 @@ def process_outliers(job_id:str) -> int:
     df_flagged = build_outlier_flags(df_raw, df_kept)
 
     # 4) Persist
-    rows = list(to_outlier_rows(df_flagged))
-    inserted = write_outlier_flags(rows)
+    if storage == "bitmap":
+        n_bytes = write_outlier_bitmap(job_id, df_flagged["id"].to_numpy(), df_flagged["outlier_flag"].to_numpy())
+        print(f"[INFO] Wrote a {n_bytes}-byte outlier bitmap for {len(df_flagged)} rows "
+              f"(kept={len(df_kept)}, outliers={len(df_raw) - len(df_kept)}).")
+        return len(df_flagged)
+
+    result = write_outlier_flags(to_outlier_rows(df_flagged), delete_stale=True)
+
+    print(f"[INFO] Merged {len(df_flagged)} rows into public.outlier "
+          f"(kept={len(df_kept)}, outliers={len(df_raw) - len(df_kept)}; inserted={result.inserted}, "
+          f"updated={result.updated}, unchanged={result.unchanged}, deleted={result.deleted}).")
+    return result.written
+
 
-    print(f"[INFO] Wrote {inserted} rows into public.outlier "
-          f"(kept={len(df_kept)}, outliers={len(df_raw) - len(df_kept)}).")
-    return inserted
+def process_outliers_increment(job_id: str, outlier_fn=remove_outliers_zscore, sensitivity_degree: str = "HIGH",
+                               context_rows: int = 3_600) -> int:
+    """
+    Incremental variant of process_outliers for a live job: flags only the
+    hardware_usage rows added since the last run (tracked in
+    public.processing_watermark, stage "outlier").
+
+    The detector sees the new rows plus the `context_rows` rows before them,
+    so each increment is judged against the recent history of the series
+    (a trailing context rather than the whole job).
+
+    Returns number of outlier rows written.
+    """
+    conn = get_db_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                last_id = lock_watermark(cur, job_id, "outlier")
+                df = read_increment(conn, job_id, last_id, context_rows)
+                new = df["id"] > last_id
+                if not new.any():
+                    return 0
+
+                df_kept = handle_outliers(df=df, outlier_fn=outlier_fn, sensitivity_degree=sensitivity_degree,
+                                          value_column="reading", time_column="date_time")
+                df_flagged = build_outlier_flags(df, df_kept)[new]
+                result = merge_outlier_flags(cur, to_outlier_rows(df_flagged))
+                advance_watermark(cur, job_id, "outlier", df_flagged["id"].max())
+        return result.written
+    finally:
+        conn.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,237 @@
+import argparse
+import os
+import select
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+import psycopg2.extensions
+
+from database.incremental import pending_jobs
+from database.insertion import READINGS_CHANNEL, get_db_conn
+from job_processor import OUTLIER_FUNCTIONS, parse_rolling_specs
+from outlier_pipeline import process_outliers_increment
+from rolling_pipeline import process_rolling_increment, rolling_stage
+
+WORKERS = 4            # Jobs processed concurrently
+DEBOUNCE = 1.0         # Seconds to let notifications for a job accumulate before processing it
+CONTEXT_ROWS = 3_600   # Trailing rows the outlier detector sees before each increment
+RETRY_INTERVAL = 10.0  # Seconds between reconnect attempts of the listener
+
+
+class JobScheduler:
+    """
+    Coalesces notifications per job and runs `process_job(job_id)` on a thread pool.
+
+    A job runs at most once at a time. Notifications for a queued job are folded
+    into the queued run; notifications for a running job schedule exactly one
+    follow-up run. A job is started `debounce` seconds after its first pending
+    notification, so a burst of batches is processed in one go.
+    """
+
+    def __init__(self, process_job, workers: int = WORKERS, debounce: float = DEBOUNCE):
+        self.process_job = process_job
+        self.debounce = debounce
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self.lock = threading.Lock()
+        self.pending = {}      # job_id -> monotonic time it became due
+        self.running = set()
+        self.rerun = set()
+        # Self-pipe: finished jobs wake the listener loop out of select()
+        self.wake_r, self.wake_w = os.pipe()
+        os.set_blocking(self.wake_r, False)
+
+    def notify(self, job_id: str) -> None:
+        with self.lock:
+            if job_id in self.running:
+                self.rerun.add(job_id)
+            else:
+                self.pending.setdefault(job_id, time.monotonic() + self.debounce)
+
+    def dispatch(self) -> float | None:
+        """
+        Start every due job. Returns seconds until the next one is due (None if idle).
+        """
+        now = time.monotonic()
+        with self.lock:
+            due = [j for j, t in self.pending.items() if t <= now]
+            for job_id in due:
+                del self.pending[job_id]
+                self.running.add(job_id)
+            next_due = min(self.pending.values(), default=None)
+        for job_id in due:
+            self.pool.submit(self._run, job_id)
+        return None if next_due is None else max(next_due - now, 0.0)
+
+    def _run(self, job_id: str) -> None:
+        try:
+            self.process_job(job_id)
+        finally:
+            with self.lock:
+                self.running.discard(job_id)
+                if job_id in self.rerun:
+                    self.rerun.discard(job_id)
+                    self.pending.setdefault(job_id, time.monotonic() + self.debounce)
+            os.write(self.wake_w, b"x")
+
+    def drain_wakeups(self) -> None:
+        try:
+            while os.read(self.wake_r, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def busy(self) -> bool:
+        with self.lock:
+            return bool(self.pending or self.running)
+
+    def shutdown(self) -> None:
+        self.pool.shutdown(wait=True)
+
+
+def make_processor(rolling_specs, outlier_fn, sensitivity: str, context_rows: int):
+    """
+    process_job(job_id): run the outlier stage and every rolling spec on the job's new rows.
+    """
+    def process_job(job_id: str) -> None:
+        start = time.monotonic()
+        written = {}
+        try:
+            if outlier_fn is not None:
+                written["outlier"] = process_outliers_increment(
+                    job_id, outlier_fn=outlier_fn, sensitivity_degree=sensitivity, context_rows=context_rows)
+            for fn, kwargs in rolling_specs:
+                written[rolling_stage(fn, kwargs)] = process_rolling_increment(job_id, fn, kwargs)
+        except Exception as e:
+            print(f"[ERROR] Job {job_id}: {e}", file=sys.stderr)
+            return
+        if any(written.values()):
+            summary = ", ".join(f"{stage}={n}" for stage, n in written.items())
+            print(f"[INFO] Job {job_id}: {summary} in {(time.monotonic() - start) * 1e3:.0f} ms")
+
+    return process_job
+
+
+def stages_of(rolling_specs, outlier_fn) -> list[str]:
+    stages = ["outlier"] if outlier_fn is not None else []
+    return stages + [rolling_stage(fn, kwargs) for fn, kwargs in rolling_specs]
+
+
+def listen():
+    conn = get_db_conn(exit_on_failure=False)
+    conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    with conn.cursor() as cur:
+        cur.execute(f"LISTEN {READINGS_CHANNEL}")
+    return conn
+
+
+def catch_up(scheduler: JobScheduler, stages: list[str]) -> int:
+    """
+    Queue every job with unprocessed rows (work that was committed while not listening).
+    """
+    conn = get_db_conn(exit_on_failure=False)
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                jobs = pending_jobs(cur, stages)
+    finally:
+        conn.close()
+    for job_id in jobs:
+        scheduler.notify(job_id)
+    return len(jobs)
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Keep outlier and rolling tables current by processing new hardware_usage rows as they are committed."
+    )
+    parser.add_argument("--rolling", default="mean:10",
+                        help='Rolling specs as method[:window], comma separated (default "mean:10"; "" for none).')
+    parser.add_argument("--outlier-fn", choices=[*OUTLIER_FUNCTIONS, "none"], default="zscore",
+                        help="Outlier method for the incremental outlier stage (default zscore).")
+    parser.add_argument("--sensitivity", default="HIGH", help="Outlier sensitivity: low, medium or high.")
+    parser.add_argument("--context-rows", type=int, default=CONTEXT_ROWS,
+                        help=f"Trailing rows the outlier detector sees (default {CONTEXT_ROWS}).")
+    parser.add_argument("--workers", type=int, default=WORKERS, help=f"Concurrent jobs (default {WORKERS}).")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE,
+                        help=f"Seconds to coalesce notifications per job (default {DEBOUNCE}).")
+    parser.add_argument("--once", action="store_true", help="Process the current backlog and exit.")
+    args = parser.parse_args()
+
+    try:
+        rolling_specs = parse_rolling_specs(args.rolling)
+    except ValueError as e:
+        print(f"[Args] {e}", file=sys.stderr)
+        sys.exit(1)
+    if any("ewm" in fn.__name__ for fn, _ in rolling_specs):
+        print("[Args] EW statistics need the whole history and cannot run incrementally; "
+              "use job_processor.py for them.", file=sys.stderr)
+        sys.exit(1)
+    if args.workers <= 0 or args.debounce < 0 or args.context_rows < 0:
+        print("[Args] --workers must be > 0, --debounce and --context-rows >= 0.", file=sys.stderr)
+        sys.exit(1)
+    outlier_fn = None if args.outlier_fn == "none" else OUTLIER_FUNCTIONS[args.outlier_fn]
+    stages = stages_of(rolling_specs, outlier_fn)
+    if not stages:
+        print("[Args] Nothing to do: no rolling specs and --outlier-fn none.", file=sys.stderr)
+        sys.exit(1)
+
+    scheduler = JobScheduler(make_processor(rolling_specs, outlier_fn, args.sensitivity, args.context_rows),
+                             workers=args.workers, debounce=0.0 if args.once else args.debounce)
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+    print(f"[INFO] Stages: {', '.join(stages)}")
+
+    conn = None
+    try:
+        if args.once:
+            print(f"[INFO] {catch_up(scheduler, stages)} job(s) with new rows.")
+            while scheduler.busy():
+                scheduler.dispatch()
+                time.sleep(0.05)
+            return
+
+        while True:
+            if conn is None:
+                try:
+                    # LISTEN first, then catch up: nothing committed in between is missed
+                    conn = listen()
+                    n = catch_up(scheduler, stages)
+                    print(f"[INFO] Listening on '{READINGS_CHANNEL}' ({n} job(s) with a backlog).")
+                except psycopg2.Error as e:
+                    if conn is not None:
+                        conn.close()
+                    conn = None
+                    print(f"[DB] Listener unavailable ({e}); retrying in {RETRY_INTERVAL:.0f}s.", file=sys.stderr)
+                    time.sleep(RETRY_INTERVAL)
+                    continue
+
+            timeout = scheduler.dispatch()
+            ready, _, _ = select.select([conn, scheduler.wake_r], [], [], timeout)
+            scheduler.drain_wakeups()
+            if conn in ready:
+                try:
+                    conn.poll()
+                except psycopg2.Error as e:
+                    print(f"[DB] Listener connection lost ({e}); reconnecting.", file=sys.stderr)
+                    conn.close()
+                    conn = None
+                    continue
+                while conn.notifies:
+                    scheduler.notify(conn.notifies.pop(0).payload)
+    except KeyboardInterrupt:
+        print("\n[INFO] Stopping; waiting for running jobs.")
+    finally:
+        if conn is not None:
+            conn.close()
+        scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,12 @@ from typing import Iterable, Tuple
 import pandas as pd
 
 # DB helpers
-from database.rolling_io import read_hardware_usage, write_rolling_values
+from database.incremental import advance_watermark, lock_watermark, read_increment
+from database.insertion import get_db_conn
+from database.rolling_io import merge_rolling_values, read_hardware_usage, write_rolling_values
+from database.rolling_sql import compute_rolling_sql, rolling_options
 
+from timeseries_module.rolling.compression import compress_series
 from timeseries_module.rolling.interface import compute_rolling
 from timeseries_module.rolling.methods import rolling_mean
 
@@ -36,16 +40,56 @@ def to_rolling_rows(df: pd.DataFrame, rolling_col: pd.Series) -> Iterable[Tuple]
         )
 
 
-def process_rolling_windows(window_name: str, value_column:str, job_id:str) -> int:
+def process_rolling_windows(
+    window_name: str,
+    value_column: str,
+    job_id: str,
+    backend: str = "pandas",
+    rolling_fn=rolling_mean,
+    rolling_kwargs: dict | None = None,
+    compression: str | None = None,
+    tolerance: float = 0.0,
+) -> int:
     """
     Full pipeline:
       1) Read hardware_usage (optionally filtered by job_id)
       2) Apply rolling module -> adds 'roll_window_{window_name}'
       3) Extract that column as rolling_value
-      4) Write (date_time, rolling_value, job_id) to public.rolling_window
-
-    Returns number of rows written.
+      4) Merge (date_time, rolling_value, job_id) into public.rolling_window, keyed by
+         (job_id, method=rolling_fn name, window_size, date_time): a re-run writes only
+         the rows whose value changed and removes rows that are no longer produced
+
+    backend:
+      - "pandas" (default): steps 1-4 above.
+      - "sql": the whole computation runs inside Postgres as a window function
+        (INSERT ... SELECT ... OVER ...), so no rows are transferred. Supports
+        rolling_mean/sum/min/max/std/var; results match the pandas backend.
+
+    compression (pandas backend only):
+      - None (default): one rolling_window row per hardware_usage row.
+      - "deadband": write a point only when it moves more than `tolerance` from the
+        last written one (tolerance=0 drops only repeats of the 4-decimal value, lossless).
+      - "swinging_door": drop points that linear interpolation between written
+        points reproduces within `tolerance`.
+      Read the full-resolution series back with database.rolling_io.read_rolling_series
+      (how="step" for deadband, how="linear" for swinging_door).
+
+    Returns number of rows written (inserted, updated or deleted).
     """
+    rolling_kwargs = {"window": 10} if rolling_kwargs is None else rolling_kwargs
+    method = getattr(rolling_fn, "__name__", str(rolling_fn)).lower()
+    window_size = int(rolling_options(method, **rolling_kwargs)["window"])
+
+    if compression is not None and backend != "pandas":
+        raise ValueError("compression is only supported with backend='pandas'.")
+    if backend == "sql":
+        inserted = compute_rolling_sql(job_id, rolling_fn, value_column=value_column, **rolling_kwargs)
+        print(f"[INFO] Inserted or updated {inserted} rows in public.rolling_window for window "
+              f"'{window_name}' (sql backend).")
+        return inserted
+    if backend != "pandas":
+        raise ValueError("backend must be 'pandas' or 'sql'.")
+
     # 1) Read
     df_raw = read_hardware_usage(job_id=job_id)
     if df_raw.empty:
@@ -53,7 +97,7 @@ def process_rolling_windows(window_name: str, value_column:str, job_id:str) -> i
         return 0
 
     # 2) Apply rolling
-    df_roll = compute_rolling(df_raw, rolling_fn=rolling_mean, value_column="reading", window=10)
+    df_roll = compute_rolling(df_raw, rolling_fn=rolling_fn, value_column=value_column, **rolling_kwargs)
 
     # 3) Extract rolling values and shape rows
     rolling_col = extract_rolling_column(df_roll, window_name=window_name, value_column=value_column)
@@ -62,12 +106,79 @@ def process_rolling_windows(window_name: str, value_column:str, job_id:str) -> i
     if len(df_roll) != len(df_raw):
         raise AssertionError("Rolling module changed the row count; it should keep the same rows.")
 
+    if compression is not None:
+        df_roll = df_roll.assign(rolling_value=rolling_col)
+        df_roll = compress_series(df_roll, "rolling_value", time_column="date_time",
+                                  method=compression, tolerance=tolerance)
+        rolling_col = df_roll["rolling_value"]
+
     rows = list(to_rolling_rows(df_roll, rolling_col))
 
     # 4) Persist
-    inserted = write_rolling_values(rows)
-    print(f"[INFO] Wrote {inserted} rows into public.rolling_window for window '{window_name}'.")
-    return inserted
+    result = write_rolling_values(rows, method=method, window_size=window_size, delete_stale=True)
+    print(f"[INFO] Merged {len(rows)} rows into public.rolling_window for window '{window_name}' "
+          f"(inserted={result.inserted}, updated={result.updated}, unchanged={result.unchanged}, "
+          f"deleted={result.deleted}).")
+    if compression is not None:
+        ratio = len(df_raw) / len(rows) if rows else float("inf")
+        print(f"[INFO] {compression} (tolerance={tolerance}) kept {len(rows)} of {len(df_raw)} points "
+              f"(compression ratio {ratio:.1f}x).")
+    return result.written
+
+
+def rolling_stage(rolling_fn, rolling_kwargs: dict | None = None) -> str:
+    """
+    processing_watermark stage name of a rolling spec, e.g. "rolling:rolling_mean:10".
+    """
+    method = getattr(rolling_fn, "__name__", str(rolling_fn)).lower()
+    window_size = int(rolling_options(method, **(rolling_kwargs or {}))["window"])
+    return f"rolling:{method}:{window_size}"
+
+
+def process_rolling_increment(
+    job_id: str,
+    rolling_fn=rolling_mean,
+    rolling_kwargs: dict | None = None,
+    value_column: str = "reading",
+) -> int:
+    """
+    Incremental variant of process_rolling_windows for a live job: computes the
+    rolling values of the hardware_usage rows added since the last run (tracked
+    in public.processing_watermark) from those rows plus the window - 1 rows
+    before them, which gives exactly the values a full re-run would.
+    Trailing windows only (center=False).
+
+    Returns number of rows written.
+    """
+    rolling_kwargs = {"window": 10} if rolling_kwargs is None else rolling_kwargs
+    method = getattr(rolling_fn, "__name__", str(rolling_fn)).lower()
+    options = rolling_options(method, **rolling_kwargs)
+    if options.get("center"):
+        raise ValueError("Incremental rolling needs a trailing window (center=False).")
+    if "ewm" in method:
+        raise ValueError("Exponentially weighted statistics depend on the whole history; "
+                         "use process_rolling_windows or EWMState for live streams.")
+    window_size = int(options["window"])
+    stage = rolling_stage(rolling_fn, rolling_kwargs)
+
+    conn = get_db_conn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                last_id = lock_watermark(cur, job_id, stage)
+                df = read_increment(conn, job_id, last_id, window_size - 1)
+                new = df["id"] > last_id
+                if not new.any():
+                    return 0
+
+                df_roll = compute_rolling(df, rolling_fn=rolling_fn, value_column=value_column,
+                                          **{**rolling_kwargs, "output_column": "rolling_value"})[new]
+                rows = to_rolling_rows(df_roll, df_roll["rolling_value"].astype(float).round(4))
+                result = merge_rolling_values(cur, rows, method=method, window_size=window_size)
+                advance_watermark(cur, job_id, stage, df_roll["id"].max())
+        return result.written
+    finally:
+        conn.close()
 
 
 if __name__ == "__main__":
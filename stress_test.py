@@ -1,13 +1,27 @@
 import argparse
+import signal
 import sys
 import time
-from datetime import datetime, timezone
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 
 import psutil
 
-from database.insertion import get_db_conn, insert_job, insert_readings_batch
+from database.insertion import get_db_conn, insert_job, insert_metric_series
+from database.partitions import ensure_partitions
+from database.spill import SPILL_SUFFIX, SpillFile
+from database.writer import BatchWriter, BlockWriter, MetricRingBuffer
 
-BATCH_SIZE = 60  # Insert each 60 seconds
+BATCH_SIZE = 60        # Insert each 60 readings ...
+FLUSH_INTERVAL = 60.0  # ... or once the oldest buffered reading is 60 s old
+MAX_QUEUE = 86_400     # One day of 1 Hz readings buffered before dropping
+STATUS_EVERY = 60      # Print writer/backpressure status every N samples
+SPILL_DIR = "spill"    # Local spill files while the DB is down or lagging
+RETRY_INTERVAL = 10.0  # Seconds between reconnect attempts while spilling
+
+MULTI_METRIC_GROUPS = ("cpu", "ram", "swap", "disk", "net")
+SLOW_INTERVAL = 0.5    # MULTI mode: ram/swap/disk/net are read at most this often
 
 
 def parse_duration(text: str) -> int:
@@ -48,77 +62,322 @@ def parse_duration(text: str) -> int:
     return total
 
 
-def read_cpu_percent_one_sec() -> float:
-    return float(psutil.cpu_percent(interval=1))
+def read_cpu_percent() -> float:
+    # Non-blocking: utilization since the previous call, so the sampling
+    # schedule (not psutil) decides the 1-second clock.
+    return float(psutil.cpu_percent(interval=None))
+
+
+def read_ram_percent() -> float:
+    return float(psutil.virtual_memory().percent)
+
+
+class MultiMetricReader:
+    """
+    Reads several psutil metrics in one tick straight into a row of a
+    MetricRingBuffer (no per-sample tuples or lists are kept).
+
+    groups: subset of MULTI_METRIC_GROUPS
+      - cpu:  per-core utilization (cpu0, cpu1, ...)
+      - ram:  ram_percent
+      - swap: swap_percent
+      - disk: disk_read_bytes, disk_write_bytes (raw cumulative counters)
+      - net:  net_sent_bytes, net_recv_bytes (raw cumulative counters)
+
+    CPU is read every tick; the slower-moving groups (ram, swap, disk, net cost
+    ~0.3 ms together) only every `slow_every` ticks, repeating the last reading
+    in between.
+    """
+
+    def __init__(self, groups, slow_every: int = 1):
+        self.groups = [g for g in MULTI_METRIC_GROUPS if g in set(groups)]
+        self.n_cpus = psutil.cpu_count() or 1
+        self.slow_every = max(1, int(slow_every))
+        names = []
+        for g in self.groups:
+            if g == "cpu":
+                names += [f"cpu{i}" for i in range(self.n_cpus)]
+            elif g == "ram":
+                names.append("ram_percent")
+            elif g == "swap":
+                names.append("swap_percent")
+            elif g == "disk":
+                names += ["disk_read_bytes", "disk_write_bytes"]
+            elif g == "net":
+                names += ["net_sent_bytes", "net_recv_bytes"]
+        self.names = names
+        # "cpu" is always first (MULTI_METRIC_GROUPS order), the slow groups fill the rest of the row
+        self._first_slow = self.n_cpus if "cpu" in self.groups else 0
+        self._held = [float("nan")] * (len(names) - self._first_slow)
+        self._ticks = 0
+        if "cpu" in self.groups:
+            psutil.cpu_percent(percpu=True)  # prime per-core counters
+
+    def _read_slow(self) -> None:
+        held = []
+        for g in self.groups:
+            if g == "ram":
+                held.append(psutil.virtual_memory().percent)
+            elif g == "swap":
+                held.append(psutil.swap_memory().percent)
+            elif g == "disk":
+                d = psutil.disk_io_counters(nowrap=False)
+                held += (d.read_bytes, d.write_bytes) if d else (float("nan"), float("nan"))
+            elif g == "net":
+                n = psutil.net_io_counters(nowrap=False)
+                held += (n.bytes_sent, n.bytes_recv)
+        self._held = held
+
+    def read_into(self, row) -> None:
+        if self._first_slow:
+            row[:self._first_slow] = psutil.cpu_percent(percpu=True)
+        if self._held:
+            if self._ticks % self.slow_every == 0:
+                self._read_slow()
+            row[self._first_slow:] = self._held
+        self._ticks += 1
+
+
+class JitterStats:
+    """
+    Tracks how far each sample landed from its scheduled tick.
+    """
+
+    def __init__(self):
+        self.samples = 0
+        self.missed_ticks = 0
+        self.max_lateness = 0.0
+        self.total_lateness = 0.0
+
+    def record(self, lateness: float) -> None:
+        self.samples += 1
+        self.total_lateness += lateness
+        self.max_lateness = max(self.max_lateness, lateness)
+
+    def summary(self) -> str:
+        mean = self.total_lateness / self.samples if self.samples else 0.0
+        return (f"samples={self.samples} missed_ticks={self.missed_ticks} "
+                f"jitter_mean={mean * 1e3:.2f}ms jitter_max={self.max_lateness * 1e3:.2f}ms")
+
+
+def sample_fixed_rate(on_tick, total_samples: int, interval: float, jitter: JitterStats) -> None:
+    """
+    Call `on_tick()` every `interval` seconds on an absolute schedule.
+
+    Each tick is start + i * interval, so time spent reading (or anything else)
+    never accumulates as drift. If the sampler falls more than one interval
+    behind, the missed ticks are skipped and counted rather than fired in a burst.
+    Sampling stops early if `on_tick` returns False.
+    """
+    start = time.monotonic()
+    i = 0
+    while i < total_samples:
+        deadline = start + i * interval
+        delay = deadline - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        elif -delay >= interval:
+            skipped = min(int(-delay // interval), total_samples - i)
+            jitter.missed_ticks += skipped
+            i += skipped
+            continue
+
+        jitter.record(time.monotonic() - deadline)
+        if on_tick() is False:
+            return
+        i += 1
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
 
 
-def read_ram_percent_one_sec() -> float:
-    val = float(psutil.virtual_memory().percent)
-    time.sleep(1)
-    return val
+def _spill_file(args, job: dict, table: str, series_names=None) -> SpillFile | None:
+    if args.no_spill:
+        return None
+    path = Path(args.spill_dir) / f"{job['id']}.{table}{SPILL_SUFFIX}"
+    return SpillFile(path, job, table=table, series_names=series_names)
+
+
+def _job_prepare(job: dict):
+    def prepare(cur):
+        insert_job(cur, job["start_time"], job["resource"], job["description"], job_id=job["id"])
+    return prepare
+
+
+def record_single(conn, job: dict, total_samples: int, args, jitter: JitterStats):
+    """
+    One metric (CPU or RAM) into public.hardware_usage via a BatchWriter.
+    """
+    read_func = read_cpu_percent if job["resource"] == "CPU" else read_ram_percent
+    read_func()  # prime psutil's CPU counters so the first real sample is meaningful
+    job_id = job["id"]
+
+    writer = BatchWriter(conn, batch_size=args.batch_size, flush_interval=args.flush_interval,
+                         max_queue=args.max_queue, spill=_spill_file(args, job, "hardware_usage"),
+                         retry_interval=args.retry_interval, prepare=_job_prepare(job))
+    writer.start()
+
+    def on_tick():
+        # reading timestamp is when we *took* the reading (not when stored)
+        reading_time = datetime.now(timezone.utc)
+        writer.submit((reading_time, read_func(), job_id))
+        if jitter.samples % STATUS_EVERY == 0:
+            st = writer.stats
+            print(f"[DB] written={st.written} queued={writer.queue.qsize()} dropped={st.dropped} "
+                  f"spilled={st.spilled} last_flush={st.last_flush_seconds * 1e3:.1f}ms")
+        return writer.error is None
+
+    return writer, on_tick
+
+
+def record_multi(conn, job: dict, groups, total_samples: int, args, jitter: JitterStats):
+    """
+    Several metrics per tick into public.metric_reading via a MetricRingBuffer + BlockWriter.
+    """
+    reader = MultiMetricReader(groups, slow_every=round(args.slow_interval / args.interval))
+    series_ids = None
+    if conn is not None:
+        with conn:
+            with conn.cursor() as cur:
+                series_ids = insert_metric_series(cur, job["id"], reader.names)
+    print(f"[OK] Recording {len(reader.names)} series: {', '.join(reader.names)}")
+
+    # Room for `max_queue` samples, but never more than the whole run needs
+    buffer = MetricRingBuffer(min(args.max_queue, total_samples), len(reader.names))
+    insert_job_row = _job_prepare(job)
+
+    def prepare(cur):
+        insert_job_row(cur)
+        writer.series_ids = insert_metric_series(cur, job["id"], reader.names)
+
+    writer = BlockWriter(conn, buffer, series_ids, block_size=args.batch_size, flush_interval=args.flush_interval,
+                         spill=_spill_file(args, job, "metric_reading", reader.names),
+                         retry_interval=args.retry_interval, prepare=prepare)
+    writer.start()
+    status_every = max(1, int(STATUS_EVERY / args.interval))
+
+    def on_tick():
+        reader.read_into(buffer.values[buffer.next_slot()])
+        buffer.commit(time.time_ns())
+        writer.notify()
+        if jitter.samples % status_every == 0:
+            st = writer.stats
+            print(f"[DB] written={st.written} buffered={len(buffer)} overwritten={buffer.overwritten} "
+                  f"spilled={st.spilled} last_flush={st.last_flush_seconds * 1e3:.1f}ms")
+        return writer.error is None
+
+    return writer, on_tick
 
 
 def main():
     parser = argparse.ArgumentParser(
-        description="Record CPU or RAM usage every second and store in Postgres."
+        description="Record CPU, RAM or several metrics at a fixed rate and store them in Postgres."
     )
     parser.add_argument("duration", help='Total time (e.g., "100", "2m", "1h30m").')
     parser.add_argument(
         "metric",
-        choices=["CPU", "RAM", "cpu", "ram"],
-        help="Which metric to record.",
+        choices=["CPU", "RAM", "MULTI", "cpu", "ram", "multi"],
+        help="Which metric to record (MULTI records every group in --metrics).",
     )
     parser.add_argument("description", help="Job description text.")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="Seconds between readings (default 1; e.g. 0.01 for 100 Hz).")
+    parser.add_argument("--metrics", default=",".join(MULTI_METRIC_GROUPS),
+                        help=f"MULTI mode metric groups (default {','.join(MULTI_METRIC_GROUPS)}).")
+    parser.add_argument("--slow-interval", type=float, default=SLOW_INTERVAL,
+                        help=f"MULTI mode: seconds between ram/swap/disk/net reads, held in between "
+                             f"(default {SLOW_INTERVAL:g}; at most --interval reads them every tick).")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Readings per DB insert.")
+    parser.add_argument("--flush-interval", type=float, default=FLUSH_INTERVAL,
+                        help="Max seconds a reading waits in memory before it is written.")
+    parser.add_argument("--max-queue", type=int, default=MAX_QUEUE,
+                        help="Readings buffered for the DB writer before new ones are dropped.")
+    parser.add_argument("--spill-dir", default=SPILL_DIR,
+                        help=f"Where readings are spilled while the DB is down or lagging (default {SPILL_DIR}).")
+    parser.add_argument("--retry-interval", type=float, default=RETRY_INTERVAL,
+                        help="Seconds between reconnect attempts while spilling.")
+    parser.add_argument("--no-spill", action="store_true",
+                        help="Stop on the first DB failure instead of spilling to disk.")
     args = parser.parse_args()
 
     try:
         total_seconds = parse_duration(args.duration)
+        if args.interval <= 0:
+            raise ValueError("--interval must be > 0")
+        if args.slow_interval <= 0:
+            raise ValueError("--slow-interval must be > 0")
+        groups = [g.strip().lower() for g in args.metrics.split(",") if g.strip()]
+        unknown = set(groups) - set(MULTI_METRIC_GROUPS)
+        if unknown or not groups:
+            raise ValueError(f"--metrics must be a subset of {','.join(MULTI_METRIC_GROUPS)}")
     except ValueError as e:
         print(f"[Args] {e}", file=sys.stderr)
         sys.exit(1)
 
     metric = args.metric.upper()
-    read_func = read_cpu_percent_one_sec if metric == "CPU" else read_ram_percent_one_sec
+    total_samples = max(1, int(total_seconds / args.interval))
 
     start_time = datetime.now(timezone.utc)
+    # Client-side id, so a job can start (and spill) while the DB is unreachable
+    job = {"id": str(uuid.uuid4()), "start_time": start_time, "resource": metric, "description": args.description}
 
-    conn = get_db_conn()
+    conn = None
     try:
+        conn = get_db_conn(exit_on_failure=args.no_spill)
         with conn:
             with conn.cursor() as cur:
-                job_id = insert_job(cur, start_time, metric, args.description)
-                print(f"[OK] Started job {job_id} at {start_time.isoformat()} for {metric}")
-
-        batch = []
-        collected = 0
+                insert_job(cur, start_time, metric, args.description, job_id=job["id"])
+    except Exception as e:
+        if args.no_spill:
+            raise
+        print(f"[DB] Unavailable ({e}); readings are spilled to {args.spill_dir} until it is back.",
+              file=sys.stderr)
+        if conn is not None:
+            conn.close()
+        conn = None
+    if conn is not None:
+        # Monthly partitions for the job's span, so its rows never land in the DEFAULT partition
+        try:
+            ensure_partitions(start_time, start_time + timedelta(seconds=total_seconds))
+        except Exception as e:
+            print(f"[DB] Could not create partitions ({e}); rows go to the default partition.", file=sys.stderr)
+    print(f"[OK] Started job {job['id']} at {start_time.isoformat()} for {metric}")
 
-        for _ in range(total_seconds):
-            # reading timestamp is when we *took* the reading (not when stored)
-            reading_time = datetime.now(timezone.utc)
-            reading_val = read_func()
-
-            batch.append((reading_time, reading_val, job_id))
-            collected += 1
-
-            # Every BATCH_SIZE readings, write to DB
-            if len(batch) == BATCH_SIZE:
-                with conn:
-                    with conn.cursor() as cur:
-                        insert_readings_batch(cur, batch)
-                print(f"[DB] Inserted {len(batch)} readings (total so far: {collected})")
-                batch.clear()
-
-        # Insert any remaining readings after the loop
-        if batch:
-            with conn:
-                with conn.cursor() as cur:
-                    insert_readings_batch(cur, batch)
-            print(f"[DB] Inserted final {len(batch)} readings (grand total: {collected})")
-
-        print("[DONE] All readings recorded.")
+    jitter = JitterStats()
+    if metric == "MULTI":
+        writer, on_tick = record_multi(conn, job, groups, total_samples, args, jitter)
+    else:
+        writer, on_tick = record_single(conn, job, total_samples, args, jitter)
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
 
+    interrupted = False
+    wall_start, cpu_start = time.monotonic(), time.thread_time()
+    try:
+        sample_fixed_rate(on_tick, total_samples, args.interval, jitter)
+    except KeyboardInterrupt:
+        interrupted = True
+        print("\n[STOP] Interrupted, flushing buffered readings...")
     finally:
-        conn.close()
+        overhead = (time.thread_time() - cpu_start) / max(time.monotonic() - wall_start, 1e-9)
+        writer.close()
+        if writer.conn is not None:
+            writer.conn.close()
+
+    st = writer.stats
+    # Sampler thread CPU time as a share of one core and of the whole machine
+    print(f"[Sampler] {jitter.summary()} cpu_overhead={overhead * 100:.2f}% of one core, "
+          f"{overhead * 100 / (psutil.cpu_count() or 1):.2f}% of total CPU")
+    print(f"[DB] written={st.written} batches={st.batches} dropped={st.dropped} "
+          f"queue_high_water={st.queue_high_water} max_flush={st.max_flush_seconds * 1e3:.1f}ms "
+          f"spilled={st.spilled} replayed={st.replayed} db_failures={st.db_failures}")
+    if writer.error is not None:
+        print("[FAILED] Some readings were not stored.", file=sys.stderr)
+        sys.exit(3)
+    if writer.spill is not None and writer.spill.rows:
+        print(f"[DONE] Recording finished; {writer.spill.rows} readings still in {writer.spill.path}.")
+        sys.exit(4)
+    print("[DONE] Recording interrupted." if interrupted else "[DONE] All readings recorded.")
 
 
 if __name__ == "__main__":
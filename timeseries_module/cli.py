@@ -0,0 +1,263 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from .loader import detect_layout, load_dataset
+from .missing_values import methods as mv_methods
+from .outliers import methods as outlier_methods
+from .pipeline import run_pipeline
+from .rolling import methods as rolling_methods
+
+# Exit status (deterministic: depends only on the per-file outcomes, not on their order)
+EXIT_OK = 0            # every file processed
+EXIT_FAILED = 1        # at least one file failed
+EXIT_USAGE = 2         # bad arguments or no input file matched
+EXIT_INTERRUPTED = 130
+
+MISSING_FUNCTIONS = {
+    name: getattr(mv_methods, name) for name in mv_methods.__all__ if name not in mv_methods.GRID_FUNCTIONS
+}
+OUTLIER_FUNCTIONS = {
+    name.removeprefix("remove_outliers_"): getattr(outlier_methods, name)
+    for name in outlier_methods.__all__ if name.startswith("remove_outliers_")
+}
+
+
+def parse_rolling(spec: str | None) -> tuple:
+    """
+    "mean:7" -> (rolling_mean, {"window": 7}); "median" -> (rolling_median, {}); None -> (None, None).
+    """
+    if not spec:
+        return None, None
+    name, _, window = spec.partition(":")
+    fn_name = f"rolling_{name.strip().lower()}"
+    if fn_name in rolling_methods.CROSS_SERIES:
+        raise ValueError(f"Rolling method '{name}' needs a second series and cannot be used with --rolling.")
+    fn = getattr(rolling_methods, fn_name, None)
+    if fn is None or not callable(fn):
+        raise ValueError(f"Unknown rolling method '{name}'.")
+    return fn, ({"window": int(window)} if window else {})
+
+
+def parse_branches(specs: list[str] | None) -> dict:
+    """
+    ["mean:7", "std:14"] -> {"mean_7": (rolling_mean, {"window": 7}), "std_14": (rolling_std, {"window": 14})}.
+    """
+    branches = {}
+    for spec in specs or []:
+        fn, kwargs = parse_rolling(spec)
+        name = spec.strip().lower().replace(":", "_")
+        if name in branches:
+            raise ValueError(f"Rolling spec '{spec}' given twice.")
+        branches[name] = (fn, kwargs)
+    return branches
+
+
+def expand_inputs(patterns: list[str]) -> list[Path]:
+    """
+    Files matching any of the glob patterns ("**" recurses), de-duplicated and sorted.
+    """
+    files = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) or ([pattern] if Path(pattern).is_file() else [])
+        files.update(Path(m).resolve() for m in matches if Path(m).is_file())
+    return sorted(files)
+
+
+def output_dirs(files: list[Path], root: Path) -> dict:
+    """
+    One output directory per file, named after its stem; stems that occur
+    more than once are prefixed with their parent directories until unique.
+    """
+    names = {f: [f.stem] for f in files}
+    while True:
+        seen = {}
+        for f, parts in names.items():
+            seen.setdefault("__".join(parts), []).append(f)
+        clashes = [fs for fs in seen.values() if len(fs) > 1]
+        if not clashes:
+            break
+        grew = False
+        for fs in clashes:
+            for f in fs:
+                parent = f.parents[len(names[f]) - 1]
+                if parent.name:
+                    names[f].insert(0, parent.name)
+                    grew = True
+        if not grew:
+            break
+    return {f: root / "__".join(parts) for f, parts in names.items()}
+
+
+def pick_columns(df: pd.DataFrame, path: Path, value_column: str | None, time_column: str | None) -> tuple:
+    """
+    The requested columns, else the detected time column and the last numeric column.
+    """
+    if time_column is None:
+        time_column = detect_layout(path).time_column
+    if value_column is None:
+        layout = detect_layout(path)
+        skip = {time_column, *layout.parts.values()}
+        numeric = [c for c in df.select_dtypes("number").columns if c not in skip]
+        if not numeric:
+            raise ValueError("no numeric column found; pass --value-column.")
+        value_column = numeric[-1]
+    if value_column not in df.columns:
+        raise ValueError(f"value column '{value_column}' not found.")
+    if time_column is not None and time_column not in df.columns:
+        raise ValueError(f"time column '{time_column}' not found.")
+    return value_column, time_column
+
+
+def process_file(path: Path, out_dir: Path, options: dict) -> dict:
+    """
+    Load one file and run the pipeline on it (runs in a worker process).
+    Returns {"path", "rows", "seconds", "value_column", "error"}.
+    """
+    start = time.perf_counter()
+    result = {"path": str(path), "rows": 0, "seconds": 0.0, "value_column": None, "error": None}
+    try:
+        df = load_dataset(path, cache=options["cache"])
+        value_column, time_column = pick_columns(df, path, options["value_column"], options["time_column"])
+        # One spec keeps the classic rolling.csv; several share the cleaned data as branches
+        specs = options["rolling"] or []
+        rolling_fn, rolling_kwargs = parse_rolling(specs[0] if len(specs) == 1 else None)
+        run_pipeline(
+            input_df=df,
+            output_path=out_dir,
+            outlier_sensitivity_degree=options["sensitivity"],
+            value_column=value_column,
+            missing_value_function=MISSING_FUNCTIONS.get(options["missing"]),
+            outlier_fn=OUTLIER_FUNCTIONS.get(options["outlier"]),
+            time_column=time_column,
+            rolling_fn=rolling_fn,
+            rolling_kwargs=rolling_kwargs,
+            export=True,
+            branches=parse_branches(specs) if len(specs) > 1 else None,
+            max_workers=options["threads"],
+            regular_grid=({"max_gap": options["max_gap"], "freq": options["freq"]}
+                          if options["max_gap"] or options["freq"] else None),
+        )
+        result.update(rows=len(df), value_column=value_column)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="timeseries-batch",
+        description="Run the cleaning/rolling pipeline over many files in parallel, one output directory per file.",
+        epilog="Exit status: 0 all files processed, 1 at least one file failed, "
+               "2 bad arguments or no matching input, 130 interrupted.",
+    )
+    parser.add_argument("inputs", nargs="+", help='Input files or glob patterns (quote them), e.g. "data/*.csv".')
+    parser.add_argument("-o", "--output", default="output/batch", help="Output root (default output/batch).")
+    parser.add_argument("--value-column", help="Column to process (default: last numeric column of each file).")
+    parser.add_argument("--time-column", help="Time column (default: detected per file).")
+    parser.add_argument("--missing", choices=[*MISSING_FUNCTIONS, "none"], default="none",
+                        help="Missing-value method (default none).")
+    parser.add_argument("--max-gap",
+                        help='Insert rows missing from the time grid and fill only gaps up to this long, '
+                             'e.g. "10s" (gap report in gaps.csv).')
+    parser.add_argument("--freq", help='Grid step for --max-gap, e.g. "1s" (default: median sampling interval).')
+    parser.add_argument("--outlier", choices=[*OUTLIER_FUNCTIONS, "none"], default="none",
+                        help="Outlier method (default none).")
+    parser.add_argument("--sensitivity", choices=["low", "medium", "high"], default="medium",
+                        help="Outlier sensitivity (default medium).")
+    parser.add_argument("--rolling", action="append",
+                        help='Rolling spec as method[:window], e.g. "mean:7" or "ewm_mean:750". Repeat it for '
+                             'several outputs from one cleaning pass (rolling_<method>_<window>.csv).')
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: all cores).")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Threads per file for the rolling branches and exports (default: one per task, max 8).")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the loader's .npy sidecars.")
+    parser.add_argument("--fail-fast", action="store_true", help="Stop scheduling files after the first failure.")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print the summary and errors.")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        parse_branches(args.rolling)
+    except ValueError as e:
+        print(f"[Args] {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if args.jobs <= 0:
+        print("[Args] --jobs must be > 0.", file=sys.stderr)
+        return EXIT_USAGE
+    if args.threads is not None and args.threads <= 0:
+        print("[Args] --threads must be > 0.", file=sys.stderr)
+        return EXIT_USAGE
+    for option in ("max_gap", "freq"):
+        try:
+            if getattr(args, option) is not None:
+                pd.Timedelta(getattr(args, option))
+        except ValueError:
+            print(f"[Args] --{option.replace('_', '-')} is not a duration: {getattr(args, option)}", file=sys.stderr)
+            return EXIT_USAGE
+    if args.missing == "none" and args.outlier == "none" and not args.rolling and not (args.max_gap or args.freq):
+        print("[Args] Nothing to do: pass --missing, --outlier, --max-gap and/or --rolling.", file=sys.stderr)
+        return EXIT_USAGE
+    files = expand_inputs(args.inputs)
+    if not files:
+        print(f"[Args] No input file matches {' '.join(args.inputs)}.", file=sys.stderr)
+        return EXIT_USAGE
+
+    options = {
+        "value_column": args.value_column, "time_column": args.time_column,
+        "missing": args.missing, "outlier": args.outlier, "sensitivity": args.sensitivity,
+        "rolling": args.rolling, "threads": args.threads,
+        "max_gap": args.max_gap, "freq": args.freq, "cache": not args.no_cache,
+    }
+    dirs = output_dirs(files, Path(args.output))
+    jobs = min(args.jobs, len(files))
+    if not args.quiet:
+        print(f"[INFO] {len(files)} file(s), {jobs} worker(s) -> {args.output}")
+
+    results, start = [], time.perf_counter()
+    pool = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        futures = {pool.submit(process_file, f, dirs[f], options): f for f in files}
+        for done, future in enumerate(as_completed(futures), 1):
+            r = future.result()
+            results.append(r)
+            name = Path(r["path"]).name
+            if r["error"]:
+                print(f"[ERROR] [{done}/{len(files)}] {name}: {r['error']}", file=sys.stderr)
+                if args.fail_fast:
+                    for f in futures:
+                        f.cancel()
+                    break
+            elif not args.quiet:
+                print(f"[{done}/{len(files)}] {name}: {r['rows']:,} rows ({r['value_column']}) "
+                      f"in {r['seconds']:.2f}s")
+    except KeyboardInterrupt:
+        pool.shutdown(wait=False, cancel_futures=True)
+        print("\n[INFO] Interrupted.", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    pool.shutdown(wait=True, cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    failed = sorted(r["path"] for r in results if r["error"])
+    rows = sum(r["rows"] for r in results)
+    skipped = len(files) - len(results)
+    print(f"[INFO] {len(results) - len(failed)}/{len(files)} file(s) ok, {rows:,} rows in {elapsed:.2f}s "
+          f"({rows / elapsed if elapsed > 0 else 0:,.0f} rows/s)"
+          + (f", {len(failed)} failed" if failed else "") + (f", {skipped} not run" if skipped else ""))
+    return EXIT_FAILED if failed or skipped else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
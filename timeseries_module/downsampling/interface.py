@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+def downsample(df: pd.DataFrame, downsample_fn, value_column: str, n_out: int = 2_000, **kwargs) -> pd.DataFrame:
+    """
+    Reduce a series to a plotting budget of about `n_out` points.
+
+    df: pd.DataFrame
+        Raw data, a pipeline output (clean.csv / rolling.csv) or any frame with `value_column`.
+    downsample_fn: function
+        One of:
+          - downsample_minmax (every bucket's extremes: no spike is lost)
+          - downsample_lttb (visual shape with fewer points)
+    kwargs:
+        time_column, keep (rows always kept, e.g. "outlier_flag" or removed_mask(...)), preselect (LTTB).
+    """
+    if value_column not in df.columns:
+        raise ValueError(f"value_column '{value_column}' not found in DataFrame.")
+    if kwargs.get("time_column") is not None and kwargs["time_column"] not in df.columns:
+        raise ValueError(f"time_column '{kwargs['time_column']}' not found in DataFrame.")
+    return downsample_fn(df, value_column, n_out=int(n_out), **kwargs)
+
+
+def removed_mask(raw: pd.DataFrame, cleaned: pd.DataFrame) -> np.ndarray:
+    """
+    Rows of `raw` that an outlier step dropped from `cleaned` (same index),
+    to pass as keep=... so the outliers stay visible on the raw plot.
+    """
+    return ~raw.index.isin(cleaned.index)
+
+
+def downsample_rollup(df: pd.DataFrame, n_out: int = 2_000) -> pd.DataFrame:
+    """
+    Merge consecutive rollup buckets (columns bucket, count, min, max, mean, std,
+    as returned by database.rollup.read_usage_series) into at most `n_out`
+    buckets: min of mins, max of maxes, count-weighted mean and pooled
+    population std, so min/max envelopes keep every spike.
+    """
+    if len(df) <= n_out:
+        return df.copy()
+    group = np.arange(len(df)) * n_out // len(df)
+    count = df["count"].to_numpy(dtype=float)
+    mean = df["mean"].to_numpy(dtype=float)
+    std = df["std"].to_numpy(dtype=float)
+    g = pd.DataFrame({
+        "bucket": df["bucket"].to_numpy(),
+        "count": count,
+        "min": df["min"].to_numpy(dtype=float),
+        "max": df["max"].to_numpy(dtype=float),
+        "sum": count * mean,
+        "sum_sq": count * (std * std + mean * mean),
+    }).groupby(group)
+    out = g.agg(bucket=("bucket", "first"), count=("count", "sum"), min=("min", "min"),
+                max=("max", "max"), sum=("sum", "sum"), sum_sq=("sum_sq", "sum"))
+    out["mean"] = out["sum"] / out["count"]
+    out["std"] = np.sqrt(np.maximum(out["sum_sq"] / out["count"] - out["mean"] ** 2, 0.0))
+    out = out.drop(columns=["sum", "sum_sq"]).reset_index(drop=True)
+    out["count"] = out["count"].astype(df["count"].dtype)
+    out.attrs = dict(df.attrs)
+    if out.attrs.get("resolution"):
+        # Buckets now span a varying number of source buckets; report the widest
+        out.attrs["resolution"] = df.attrs["resolution"] * int(np.bincount(group).max())
+    return out
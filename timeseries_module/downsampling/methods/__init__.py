@@ -0,0 +1,7 @@
+from .minmax import downsample_minmax
+from .lttb import downsample_lttb
+
+__all__ = [
+    "downsample_minmax",
+    "downsample_lttb",
+]
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from .minmax import bucket_starts, keep_mask, minmax_indices, plot_axis
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets (Steinarsson, 2013) on points without NaNs:
+    first and last point, plus per bucket the point forming the largest
+    triangle with the previously chosen point and the next bucket's mean.
+    The buckets are visited in order (each choice depends on the previous one);
+    the work inside a bucket and the bucket means are vectorized.
+    """
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n) if n <= n_out else np.array([0, n - 1])
+    # n_out - 2 equal-count buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    sizes = np.diff(edges)
+    mean_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / sizes
+    mean_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / sizes
+    # The bucket after the last one is the final point
+    mean_x = np.append(mean_x, x[-1])
+    mean_y = np.append(mean_y, y[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        cx, cy = mean_x[b + 1], mean_y[b + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - cx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (cy - ay))
+        a = lo + int(np.argmax(area))
+        out[b + 1] = a
+    return out
+
+
+def downsample_lttb(
+    df: pd.DataFrame,
+    value_column: str,
+    n_out: int = 2_000,
+    time_column: str | None = None,
+    keep=None,
+    preselect: int | None = 4,
+) -> pd.DataFrame:
+    """
+    Reduce `df` to about `n_out` rows that keep the visual shape of the series
+    (LTTB, x = `time_column` or row position; NaN rows are dropped).
+
+    preselect: first reduce to the min/max rows of preselect * n_out buckets
+        and run LTTB on those (MinMaxLTTB, Van Der Donckt et al., 2023): the same
+        picture for a fraction of the work on 10^7 points. None runs LTTB on every row.
+    keep: rows always kept on top of the budget (boolean column name or mask,
+        e.g. outlier flags), so they stay visible.
+    Returns rows of `df` in order.
+    """
+    if n_out < 3:
+        raise ValueError("n_out must be >= 3.")
+    forced = keep_mask(df, keep)
+    if len(df) <= n_out:
+        return df.copy()
+    y = df[value_column].to_numpy(dtype=float, na_value=np.nan)
+    x = plot_axis(df, time_column)
+    rows = np.flatnonzero(~np.isnan(y))
+    if preselect and len(rows) > preselect * n_out:
+        rows = minmax_indices(y, bucket_starts(x, preselect * n_out // 2))
+    picked = rows[lttb_indices(x[rows], y[rows], n_out)]
+    return df.iloc[np.union1d(picked, np.flatnonzero(forced))].copy()
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+def plot_axis(df: pd.DataFrame, time_column: str | None = None) -> np.ndarray:
+    """
+    x coordinates for downsampling: seconds since the first timestamp of
+    `time_column` (must be sorted), or the row position.
+    """
+    if time_column is None:
+        return np.arange(len(df), dtype=float)
+    t = pd.to_datetime(df[time_column])
+    ns = t.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    return (ns - ns[0]) / 1e9 if len(ns) else ns.astype(float)
+
+
+def bucket_starts(x: np.ndarray, n_buckets: int) -> np.ndarray:
+    """
+    Start row of each of `n_buckets` equal-width buckets over sorted `x`
+    (empty buckets are dropped).
+    """
+    if len(x) == 0:
+        return np.empty(0, dtype=np.int64)
+    edges = np.linspace(x[0], x[-1], n_buckets + 1)[:-1]
+    return np.unique(np.searchsorted(x, edges, side="left"))
+
+
+def keep_mask(df: pd.DataFrame, keep) -> np.ndarray:
+    """
+    Rows that must survive downsampling: None, a boolean column name or a boolean array.
+    """
+    if keep is None:
+        return np.zeros(len(df), dtype=bool)
+    if isinstance(keep, str):
+        return df[keep].fillna(False).to_numpy(dtype=bool)
+    return np.asarray(keep, dtype=bool)
+
+
+def minmax_indices(y: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Row of the minimum and of the maximum of `y` in every bucket (NaNs ignored),
+    sorted. O(n): per-bucket extremes with reduceat, then the first row reaching each.
+    """
+    if len(starts) == 0:
+        return np.empty(0, dtype=np.int64)
+    valid = ~np.isnan(y)
+    lo = np.where(valid, y, np.inf)
+    hi = np.where(valid, y, -np.inf)
+    bucket = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(y))))
+    picked = []
+    for values, reduce in ((lo, np.minimum), (hi, np.maximum)):
+        extreme = reduce.reduceat(values, starts)
+        rows = np.flatnonzero((values == extreme[bucket]) & valid)
+        first = np.concatenate([[True], bucket[rows][1:] != bucket[rows][:-1]]) if len(rows) else rows.astype(bool)
+        picked.append(rows[first])
+    return np.unique(np.concatenate(picked))
+
+
+def downsample_minmax(
+    df: pd.DataFrame,
+    value_column: str,
+    n_out: int = 2_000,
+    time_column: str | None = None,
+    keep=None,
+) -> pd.DataFrame:
+    """
+    Keep the minimum and maximum row of each of n_out // 2 equal-width buckets
+    (by `time_column`, else by row), so every spike stays visible at
+    n_out points. Rows in `keep` (boolean column name or mask, e.g. outlier
+    flags) are always kept on top of the budget. Returns rows of `df` in order.
+    """
+    if n_out < 2:
+        raise ValueError("n_out must be >= 2.")
+    forced = keep_mask(df, keep)
+    if len(df) <= n_out:
+        return df.copy()
+    y = df[value_column].to_numpy(dtype=float, na_value=np.nan)
+    starts = bucket_starts(plot_axis(df, time_column), n_out // 2)
+    rows = np.union1d(minmax_indices(y, starts), np.flatnonzero(forced))
+    return df.iloc[rows].copy()
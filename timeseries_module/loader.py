@@ -0,0 +1,323 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import warnings
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+__all__ = [
+    "Layout",
+    "detect_layout",
+    "read_source",
+    "load_dataset",
+    "clear_cache",
+]
+
+CACHE_SUFFIX = ".cache"
+CACHE_VERSION = 2
+
+TIME_NAMES = ("date_time", "datetime", "timestamp", "time", "date")
+PARTS = ("year", "month", "day", "hour", "minute", "second")
+# Tried in order on the first rows; the first that parses all of them is used for the whole column
+TIME_FORMATS = (
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%d_%H-%M-%S",
+    "%d/%m/%Y",
+    "%d/%m/%Y %H:%M",
+    "%m/%d/%Y",
+)
+
+
+@dataclass
+class Layout:
+    """
+    How a CSV is parsed:
+      - time_column / time_format: a timestamp column and its strptime format
+        (None: ISO8601 parsing)
+      - parts: Year/Month/Day[/Hour...] columns combined into `time_column`
+      - index_column: a leading unnamed index column, dropped
+    """
+    kind: str
+    time_column: str | None = None
+    time_format: str | None = None
+    parts: dict = field(default_factory=dict)   # part name -> source column
+    index_column: bool = False
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, "time_column": self.time_column, "time_format": self.time_format,
+                "parts": self.parts, "index_column": self.index_column}
+
+
+def _sniff_format(samples: list[str]) -> str | None:
+    for fmt in TIME_FORMATS:
+        try:
+            for s in samples:
+                datetime.strptime(s, fmt)
+            return fmt
+        except ValueError:
+            continue
+    return None
+
+
+_FIELD_WIDTH = {"Y": 4, "m": 2, "d": 2, "H": 2, "M": 2, "S": 2}
+
+
+def _parse_fixed_width(values: np.ndarray, fmt: str) -> np.ndarray | None:
+    """
+    Vectorized strptime for fixed-width numeric formats (e.g. "%Y-%m-%d_%H-%M-%S"):
+    digits are read straight from the byte matrix of the strings. None when the
+    format or the data does not fit (the caller falls back to pandas).
+    """
+    layout, pos, i = [], 0, 0
+    while i < len(fmt):
+        if fmt[i] == "%":
+            code = fmt[i + 1: i + 2]
+            if code not in _FIELD_WIDTH:
+                return None
+            layout.append((code, pos))
+            pos += _FIELD_WIDTH[code]
+            i += 2
+        else:
+            pos += 1
+            i += 1
+    try:
+        raw = np.asarray(values).astype(f"S{pos}")
+    except (UnicodeEncodeError, ValueError):
+        return None
+    if raw.size == 0 or np.char.str_len(raw).min() != pos:
+        return None
+    digits = raw.view(np.uint8).reshape(-1, pos).astype(np.int64) - ord("0")
+    parts = {}
+    for code, start in layout:
+        block = digits[:, start: start + _FIELD_WIDTH[code]]
+        if block.min() < 0 or block.max() > 9:
+            return None
+        parts[code] = block @ (10 ** np.arange(block.shape[1] - 1, -1, -1))
+    n = len(raw)
+    month = parts.get("m", np.ones(n, dtype=np.int64))
+    months = (parts.get("Y", np.full(n, 1970)) - 1970) * 12 + month - 1
+    days = months.astype("datetime64[M]").astype("datetime64[D]") + (parts.get("d", np.ones(n, dtype=np.int64)) - 1)
+    seconds = sum(parts.get(c, 0) * k for c, k in (("H", 3600), ("M", 60), ("S", 1))) + np.zeros(n, dtype=np.int64)
+    # Out-of-range fields (month 13, 30 February, 25:00) would silently roll over; let pandas decide
+    if (month < 1).any() or (month > 12).any() or (days.astype("datetime64[M]") != months.astype("datetime64[M]")).any() \
+            or (seconds >= 86_400).any():
+        return None
+    return (days.astype("datetime64[s]") + seconds.astype("timedelta64[s]")).astype("datetime64[ns]")
+
+
+def detect_layout(path: str | Path, sample_rows: int = 20) -> Layout:
+    """
+    Recognise the layouts of the shipped datasets from the header and a few rows:
+      - "timestamp": one time column (date, Date, time, datetime, ...); its
+        format is sniffed, e.g. "%Y-%m-%d_%H-%M-%S" for 4threads.csv
+      - "parts": Year/Month/Day/Hour columns (solar data) -> a "datetime" column
+      - "indexed": either of the above behind an unnamed index column
+        (temperature_2014_18.csv)
+      - "plain": no time information
+    """
+    head = pd.read_csv(path, nrows=sample_rows, dtype=str, keep_default_na=False)
+    columns = list(head.columns)
+    index_column = bool(columns) and (columns[0] == "" or columns[0].startswith("Unnamed: 0"))
+    if index_column:
+        columns = columns[1:]
+    lower = {c.lower(): c for c in columns}
+
+    parts = {p: lower[p] for p in PARTS if p in lower}
+    if {"year", "month", "day"} <= parts.keys():
+        return Layout("indexed" if index_column else "parts", time_column="datetime",
+                      parts=parts, index_column=index_column)
+
+    for name in TIME_NAMES:
+        if name in lower:
+            col = lower[name]
+            samples = [s for s in head[col].tolist() if s][:sample_rows]
+            return Layout("indexed" if index_column else "timestamp", time_column=col,
+                          time_format=_sniff_format(samples) if samples else None, index_column=index_column)
+    return Layout("indexed" if index_column else "plain", index_column=index_column)
+
+
+def read_source(path: str | Path, layout: Layout | None = None) -> pd.DataFrame:
+    """
+    Parse a CSV with its (detected) layout: numbers with the C parser,
+    timestamps with one explicit vectorized format instead of per-row inference.
+    """
+    layout = layout or detect_layout(path)
+    time_col = layout.time_column if not layout.parts else None
+    df = pd.read_csv(path, index_col=0 if layout.index_column else None,
+                     dtype={time_col: str} if time_col else None)
+    if layout.index_column:
+        df = df.reset_index(drop=True)
+
+    if layout.parts:
+        fields = {p: df[c] for p, c in layout.parts.items()}
+        t = pd.to_datetime(pd.DataFrame(fields), errors="coerce")
+        # New timestamp column first, source columns kept
+        df.insert(0, layout.time_column, t)
+    elif time_col:
+        parsed = _parse_fixed_width(df[time_col].to_numpy(), layout.time_format) if layout.time_format else None
+        if parsed is None:
+            parsed = pd.to_datetime(df[time_col], format=layout.time_format or "ISO8601", errors="coerce")
+        df[time_col] = parsed
+    return df
+
+
+# --- binary sidecar -------------------------------------------------------------------------
+
+def _cache_dir(path: Path) -> Path:
+    return path.with_name(path.name + CACHE_SUFFIX)
+
+
+def _file_hash(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _source_stat(path: Path) -> dict:
+    st = path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _write_cache(path: Path, df: pd.DataFrame, layout: Layout, source: dict) -> None:
+    target = _cache_dir(path)
+    tmp = Path(tempfile.mkdtemp(prefix=target.name + ".", dir=target.parent))
+    try:
+        columns = []
+        for i, name in enumerate(df.columns):
+            s = df[name]
+            entry = {"name": name, "file": f"{i}.npy", "dtype": str(s.dtype)}
+            if isinstance(s.dtype, pd.DatetimeTZDtype):
+                entry["tz"] = str(s.dt.tz)
+                values = s.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy()
+            elif isinstance(s.dtype, np.dtype) and s.dtype != object:
+                values = s.to_numpy()
+            else:
+                # Text (object / str dtype) and nullable extension columns: fixed-width
+                # strings plus an explicit null mask, so a missing value does not come back as "nan"
+                mask = s.isna().to_numpy()
+                numeric = getattr(s.dtype, "numpy_dtype", None)
+                if numeric is not None and numeric.kind in "biuf":
+                    values = s.to_numpy(dtype=numeric, na_value=0)
+                else:
+                    values = np.where(mask, "", s.astype(object).to_numpy()).astype(str)
+                entry["mask"] = f"{i}.mask.npy"
+                np.save(tmp / entry["mask"], mask, allow_pickle=False)
+            np.save(tmp / entry["file"], values, allow_pickle=False)
+            columns.append(entry)
+        meta = {"version": CACHE_VERSION, "source": source,
+                "layout": layout.to_dict(), "rows": len(df), "columns": columns}
+        (tmp / "meta.json").write_text(json.dumps(meta, indent=1))
+        if target.exists():
+            shutil.rmtree(target)
+        os.replace(tmp, target)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+
+def _read_cache(path: Path, mmap: bool) -> pd.DataFrame:
+    target = _cache_dir(path)
+    meta = json.loads((target / "meta.json").read_text())
+    data = {}
+    for entry in meta["columns"]:
+        # Copy-on-write maps: pages are shared until a caller writes to them
+        values = np.load(target / entry["file"], mmap_mode="c" if mmap else None, allow_pickle=False)
+        if "tz" in entry:
+            values = pd.DatetimeIndex(values).tz_localize("UTC").tz_convert(entry["tz"])
+        elif "mask" in entry:
+            values = values.astype(object)
+            values[np.load(target / entry["mask"], allow_pickle=False)] = None
+            # A Series keeps object columns as object (pandas 3 would infer str from a bare array)
+            values = pd.Series(values, dtype=entry["dtype"], copy=False)
+        data[entry["name"]] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def _cache_state(path: Path, verify: bool) -> tuple[bool, str | None]:
+    """
+    (usable, source hash if computed). The sidecar is reused when the source's
+    size and mtime match the recorded ones (no re-hash unless `verify`), or when
+    they differ but the content hash is unchanged (e.g. a fresh checkout).
+    """
+    meta_path = _cache_dir(path) / "meta.json"
+    if not meta_path.exists():
+        return False, None
+    try:
+        meta = json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return False, None
+    if meta.get("version") != CACHE_VERSION:
+        return False, None
+    recorded = meta["source"]
+    if not verify and _source_stat(path) == {k: recorded[k] for k in ("size", "mtime_ns")}:
+        return True, None
+    digest = _file_hash(path)
+    if digest != recorded["hash"]:
+        return False, digest
+    # Same content under a new mtime: refresh the stamp so the next load skips the hash
+    meta["source"].update(_source_stat(path))
+    meta_path.write_text(json.dumps(meta, indent=1))
+    return True, digest
+
+
+def load_dataset(
+    path: str | Path,
+    layout: Layout | None = None,
+    cache: bool = True,
+    mmap: bool = True,
+    verify: bool = False,
+) -> pd.DataFrame:
+    """
+    Load a dataset CSV with its layout detected (see detect_layout).
+
+    The parsed frame is stored in a sidecar directory next to the file
+    (`<name>.csv.cache/`, one .npy per column + meta.json). Later loads
+    memory-map those arrays instead of parsing the CSV, as long as the
+    source is unchanged (size and mtime; the content hash when they differ,
+    or always with verify=True). A sidecar that cannot be written (read-only
+    data directory) only costs the cache: the parsed frame is still returned.
+
+    Passing `layout` explicitly bypasses the sidecar for reading, and refreshes it.
+    """
+    path = Path(path)
+    if cache and layout is None:
+        usable, digest = _cache_state(path, verify)
+        if usable:
+            return _read_cache(path, mmap)
+    else:
+        digest = None
+
+    # Stamp the sidecar with the source as it was *before* parsing: a concurrent
+    # edit then shows up as a stat/hash mismatch on the next load
+    source = {**_source_stat(path), "hash": digest or _file_hash(path)} if cache else None
+    layout = layout or detect_layout(path)
+    df = read_source(path, layout)
+    if cache:
+        try:
+            _write_cache(path, df, layout, source)
+        except (OSError, ValueError) as e:
+            warnings.warn(f"Could not write the cache for {path}: {e}")
+    return df
+
+
+def clear_cache(path: str | Path) -> bool:
+    """
+    Remove the sidecar of `path`. Returns True if there was one.
+    """
+    target = _cache_dir(Path(path))
+    if target.exists():
+        shutil.rmtree(target)
+        return True
+    return False
@@ -13,6 +13,9 @@ def main(
     rolling_fn=None,
     rolling_kwargs: dict | None = None,
     export: bool = True,
+    branches=None,
+    max_workers: int | None = None,
+    regular_grid: dict | None = None,
 ) -> pd.DataFrame:
     """
     Main entry point for the time series module.
@@ -50,6 +53,14 @@ def main(
     export : bool, optional
         If True (default), writes `<output_path>/clean.csv` and, when `rolling_fn` is provided,
         `<output_path>/rolling.csv`.
+    branches : dict or None, optional
+        Several rolling outputs sharing the cleaned data, e.g. {"mean_7": (rolling_mean, {"window": 7})};
+        computed concurrently and written to `<output_path>/rolling_<name>.csv` when `export=True` (see `run_branches`).
+    max_workers : int or None, optional
+        Thread pool size for the branches and exports.
+    regular_grid : dict or None, optional
+        e.g. {"max_gap": "10s"}: insert rows missing from the sampling of `time_column` and fill
+        only gaps up to `max_gap` (see `resample_regular`); the report goes to `gaps.csv`.
 
     Returns
     -------
@@ -67,4 +78,7 @@ def main(
         rolling_fn=rolling_fn,
         rolling_kwargs=rolling_kwargs,
         export=export,
+        branches=branches,
+        max_workers=max_workers,
+        regular_grid=regular_grid,
     )
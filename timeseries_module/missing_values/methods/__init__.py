@@ -2,10 +2,16 @@ from .fill_forward import fill_forward
 from .fill_backward import fill_backward
 from .window_mean import window_mean
 from .linear_interpolation import linear_interpolation
+from .regular_grid import detect_gaps, resample_regular
 
 __all__ = [
     "fill_forward",
     "fill_backward",
     "window_mean",
     "linear_interpolation",
+    "detect_gaps",
+    "resample_regular",
 ]
+
+# Not fill functions of (df, value_column): they need the time column
+GRID_FUNCTIONS = ("detect_gaps", "resample_regular")
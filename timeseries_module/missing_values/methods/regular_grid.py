@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+
+def _times(df: pd.DataFrame, time_column: str, time_format: str | None) -> tuple[np.ndarray, object]:
+    """
+    (epoch ns in UTC, time zone or None) of `time_column`.
+    """
+    t = pd.to_datetime(df[time_column], format=time_format)
+    if t.isna().any():
+        raise ValueError(f"time_column '{time_column}' contains missing or unparseable timestamps.")
+    return t.to_numpy(dtype="datetime64[ns]").astype(np.int64), t.dt.tz
+
+
+def _to_datetimes(ns: np.ndarray, tz):
+    # Back to datetimes in the input's time zone (tz-aware input is stored as UTC ns)
+    t = pd.DatetimeIndex(ns.astype("datetime64[ns]"))
+    return t.tz_localize("UTC").tz_convert(tz) if tz is not None else t
+
+
+def _step(t: np.ndarray, freq) -> int:
+    """
+    Grid step in ns: `freq` (e.g. "1s") or the median positive spacing of `t`
+    (from an evenly spread sample of at most 100k spacings).
+    """
+    if freq is not None:
+        step = pd.Timedelta(freq).value
+    else:
+        at = np.arange(0, len(t) - 1, max(1, len(t) // 100_000))
+        d = t[at + 1] - t[at]
+        d = d[d > 0]
+        step = int(np.median(d)) if len(d) else 0
+    if step <= 0:
+        raise ValueError("Could not infer a grid step; please provide 'freq' (e.g., freq='1s').")
+    return step
+
+
+def _missing_per_row(t: np.ndarray, step: int, tolerance: float) -> np.ndarray:
+    """
+    Number of grid points missing after each row (0 for regular spacing and jitter below tolerance * step).
+    """
+    d = np.diff(t)
+    missing = np.where(d > tolerance * step, np.rint(d / step).astype(np.int64) - 1, 0)
+    return np.append(np.maximum(missing, 0), 0)
+
+
+def detect_gaps(
+    df: pd.DataFrame,
+    time_column: str,
+    freq=None,
+    tolerance: float = 1.5,
+    time_format: str | None = None,
+) -> pd.DataFrame:
+    """
+    Gaps in the sampling of `time_column` (must be sorted): spacings longer than
+    `tolerance` grid steps. The step is `freq` (e.g. "1s") or the median spacing.
+
+    Returns one row per gap: start / end (the observations around it), duration
+    and the number of missing grid points.
+    """
+    t, tz = _times(df, time_column, time_format)
+    if len(t) < 2:
+        return _report(t, np.zeros(len(t), dtype=np.int64), tz)
+    return _report(t, _missing_per_row(t, _step(t, freq), tolerance), tz)
+
+
+def _report(t: np.ndarray, missing: np.ndarray, tz, filled: np.ndarray | None = None) -> pd.DataFrame:
+    rows = np.flatnonzero(missing)
+    report = pd.DataFrame({
+        "start": _to_datetimes(t[rows], tz),
+        "end": _to_datetimes(t[rows + 1], tz),
+        "duration": (t[rows + 1] - t[rows]).astype("timedelta64[ns]"),
+        "missing": missing[rows],
+    })
+    if filled is not None:
+        report["filled"] = filled
+    return report
+
+
+def _span_around_nans(t: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """
+    For every row, the time between the last valid value at or before it and the
+    first valid value at or after it (0 on valid rows; the series ends bound leading/trailing runs).
+    """
+    n = len(t)
+    idx = np.arange(n)
+    prev = np.maximum.accumulate(np.where(valid, idx, -1))
+    nxt = np.minimum.accumulate(np.where(valid, idx, n)[::-1])[::-1]
+    start = np.where(prev >= 0, t[np.maximum(prev, 0)], t[0])
+    end = np.where(nxt < n, t[np.minimum(nxt, n - 1)], t[-1])
+    return end - start
+
+
+def resample_regular(
+    df: pd.DataFrame,
+    value_column: str,
+    time_column: str,
+    fill=None,
+    max_gap=None,
+    freq=None,
+    tolerance: float = 1.5,
+    indicator: str | None = None,
+    carry=None,
+    time_format: str | None = None,
+    **fill_kwargs,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Turn missing *rows* into NaNs on a regular grid, then fill them.
+
+    Rows of `df` (sorted by `time_column`) are kept as they are; only the
+    missing grid points inside gaps (spacing > tolerance * step, step = `freq`
+    or the median spacing) are inserted, so a mostly dense series costs no more
+    than its gaps. `time_column` keeps its time zone. Other columns are missing
+    on inserted rows (so integer columns become float with NaN) unless listed
+    in `carry`.
+
+    fill: fill_forward, fill_backward, linear_interpolation, window_mean
+        (or None), applied to `value_column` with `fill_kwargs`.
+    max_gap: e.g. "10s" - only NaN runs (inserted or already in the frame)
+        spanning at most this long between the valid values around them are
+        filled, whole; longer ones stay NaN. None fills every run.
+    indicator: optional name of a boolean column marking inserted rows.
+    carry: columns copied onto inserted rows from the row before the gap,
+        keeping their dtype - e.g. ["job_id"] for key columns.
+
+    Returns (frame, gap report); the report has one row per time gap:
+    start, end, duration, missing (inserted rows) and filled (all of them filled).
+    """
+    if time_column not in df.columns:
+        raise ValueError(f"time_column '{time_column}' not found in DataFrame.")
+    carry = [carry] if isinstance(carry, str) else list(carry or [])
+    missing_columns = [c for c in carry if c not in df.columns]
+    if missing_columns:
+        raise ValueError(f"carry columns not found in DataFrame: {missing_columns}")
+    t, tz = _times(df, time_column, time_format)
+    order = None
+    if len(t) > 1 and (np.diff(t) < 0).any():
+        order = np.argsort(t, kind="stable")
+        t = t[order]
+    n = len(t)
+    step = _step(t, freq) if n > 1 else 1
+    missing = _missing_per_row(t, step, tolerance) if n > 1 else np.zeros(n, dtype=np.int64)
+    total = int(missing.sum())
+
+    # Output position of every source row; inserted rows fill the holes (no loop per gap)
+    pos = np.arange(n) + np.concatenate([[0], np.cumsum(missing)[:-1]]) if n else np.arange(0)
+    src = np.full(n + total, -1, dtype=np.int64)
+    src[pos] = order if order is not None else np.arange(n)
+    gap_rows = np.repeat(np.arange(n), missing)
+    k = np.arange(total) - np.repeat(np.cumsum(missing) - missing, missing) + 1
+    times = np.empty(n + total, dtype=np.int64)
+    times[pos] = t
+    times[src < 0] = t[gap_rows] + k * step
+
+    # Carried columns take the source row before each gap instead of a missing value
+    carried = src.copy()
+    carried[src < 0] = order[gap_rows] if order is not None else gap_rows
+    out = pd.DataFrame({
+        c: _to_datetimes(times, tz) if c == time_column
+        else df[c].array.take(carried) if c in carry
+        else pd.api.extensions.take(df[c].array, src, allow_fill=True)
+        for c in df.columns
+    })
+    inserted = src < 0
+    if indicator:
+        out[indicator] = inserted
+
+    if fill is not None:
+        before = out[value_column].notna().to_numpy()
+        filled = fill(out, value_column, **fill_kwargs)
+        if max_gap is not None:
+            keep = before | (_span_around_nans(times, before) <= pd.Timedelta(max_gap).value)
+            filled[value_column] = filled[value_column].where(keep)
+        out = filled
+
+    # A gap counts as filled when all of its inserted rows got a value
+    counts = missing[missing > 0]
+    done = out[value_column].notna().to_numpy()[inserted]
+    filled = np.logical_and.reduceat(done, np.cumsum(counts) - counts) if total else np.zeros(0, dtype=bool)
+    return out, _report(t, missing, tz, filled)
@@ -16,6 +16,7 @@ def apply_outliers(func, df: pd.DataFrame, value_column: str, **kwargs) -> pd.Da
             - remove_outliers_iqr
             - remove_outliers_linear_regression
             - remove_outliers_lof
+            - remove_outliers_seasonal_residual
     df: pd.DataFrame
         The input DataFrame.
     value_column: str
@@ -38,12 +39,13 @@ def handle_outliers(df: pd.DataFrame, outlier_fn, value_column: str, sensitivity
             - remove_outliers_iqr
             - remove_outliers_linear_regression
             - remove_outliers_lof
+            - remove_outliers_seasonal_residual
     sensitivity_degree: str
         One of: 'low', 'medium', 'high'.
     value_column: str
         Name of the column to operate on.
     time_column: str or None
-        Optional time column (used by linear_regression, optionally by LOF).
+        Optional time column (used by linear_regression and seasonal_residual, optionally by LOF).
     kwargs:
         Extra parameters to override the defaults from sensitivity mapping.
     """
@@ -64,6 +66,13 @@ def handle_outliers(df: pd.DataFrame, outlier_fn, value_column: str, sensitivity
         if "linear_regression" in name and time_column is not None:
             options["time_column"] = time_column
 
+    elif "seasonal" in name:
+        # Residual thresholds follow the z-score / IQR presets of the chosen method
+        iqr = kwargs.get("method") == "iqr"
+        options["threshold"] = cfg["iqr_k"] if iqr else cfg["z_threshold"]
+        if time_column is not None:
+            options["time_column"] = time_column
+
     elif "iqr" in name:
         options["threshold"] = cfg["iqr_k"]
 
@@ -1,13 +1,35 @@
 import numpy as np
 import pandas as pd
 
-def remove_outliers_iqr(df: pd.DataFrame, value_column: str, threshold: float = 1.5) -> pd.DataFrame:
+from ...sketches import KLLSketch
+
+def remove_outliers_iqr(
+    df: pd.DataFrame,
+    value_column: str,
+    threshold: float = 1.5,
+    approximate: bool = False,
+    k: int = 200,
+    sketch: KLLSketch | None = None,
+    seed: int | None = 0,
+) -> pd.DataFrame:
     """
     Remove rows outside [Q1 - threshold*IQR, Q3 + threshold*IQR] for `value_column`.
     Keeps NaN rows.
+
+    With approximate=True the quartiles come from a KLL sketch of size `k`
+    (rank error ≈ 1.3% for k=200) instead of sorting the whole column.
+    Pass a prebuilt `sketch` (e.g. merged across chunks, workers or jobs)
+    to take the bounds from it; the rows of `df` are then only filtered.
+    The sketch's compaction is randomized; the fixed `seed` keeps re-runs on
+    the same data identical (None for a fresh draw each call).
     """
     s = df[value_column]
-    q1, q3 = s.quantile(0.25), s.quantile(0.75)
+    if sketch is None and approximate:
+        sketch = KLLSketch(k=k, seed=seed).update(s.to_numpy(dtype=float, na_value=np.nan))
+    if sketch is not None:
+        q1, q3 = sketch.quantiles([0.25, 0.75])
+    else:
+        q1, q3 = s.quantile(0.25), s.quantile(0.75)
     iqr = q3 - q1
 
     if iqr == 0 or np.isnan(iqr):
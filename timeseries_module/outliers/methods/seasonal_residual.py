@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+def _detrend(values: np.ndarray) -> np.ndarray:
+    """
+    Subtract the least-squares line through the non-NaN values.
+    """
+    x = np.arange(len(values), dtype=float)
+    ok = ~np.isnan(values)
+    if ok.sum() < 2:
+        return values - np.nanmean(values) if ok.any() else values.copy()
+    slope, intercept = np.polyfit(x[ok], values[ok], 1)
+    return values - (slope * x + intercept)
+
+
+def detect_period(
+    values,
+    min_period: int = 2,
+    max_period: int | None = None,
+    min_strength: float = 0.2,
+) -> int | None:
+    """
+    Dominant period (in rows) of a series, from its autocorrelation computed
+    with an FFT in O(n log n). NaNs count as the mean; a linear trend is removed first.
+
+    The strongest autocorrelation peak in [min_period, max_period] wins
+    (max_period defaults to n // 2, i.e. at least two full cycles); among
+    peaks within 90% of it the shortest lag is taken (refined within ±5% on
+    the autocorrelation at its multiples), so a multiple of the period is not picked over the
+    period itself.
+    Returns None when no peak reaches `min_strength` (no clear seasonality).
+    """
+    v = _detrend(np.asarray(values, dtype=float))
+    v = np.where(np.isnan(v), 0.0, v - np.nanmean(v))
+    n = len(v)
+    max_period = n // 2 if max_period is None else min(int(max_period), n // 2)
+    if n < 4 or max_period < max(min_period, 2):
+        return None
+
+    size = 1 << (2 * n - 1).bit_length()
+    spectrum = np.fft.rfft(v, size)
+    acf = np.fft.irfft(spectrum * np.conj(spectrum), size)[:n]
+    if acf[0] <= 0:
+        return None
+    # Unbiased estimate (divide by the overlap), else peaks drift to shorter lags
+    acf /= acf[0] * (n - np.arange(n)) / n
+
+    lags = np.arange(max(min_period, 2), max_period + 1)
+    # A peak must rise 0.1 above the lowest autocorrelation at any shorter lag;
+    # this drops the spurious maxima noise leaves on the initial decay
+    dip = np.minimum.accumulate(acf)
+    peaks = lags[(acf[lags] > acf[lags - 1]) & (acf[lags] >= acf[np.minimum(lags + 1, n - 1)])
+                 & (acf[lags] - dip[lags] >= 0.1)]
+    if peaks.size == 0:
+        return None
+    best = acf[peaks].max()
+    if best < min_strength:
+        return None
+    # Refine within ±5%: noise and slower cycles shift a single peak by a few lags,
+    # so score each candidate on its first (up to) 10 multiples as well
+    first = int(peaks[acf[peaks] >= 0.9 * best][0])
+    cand = np.arange(max(first - first // 20, 2), min(first + first // 20, max_period) + 1)
+    multiples = cand[:, None] * np.arange(1, 11)
+    score = np.where(multiples < n, acf[np.minimum(multiples, n - 1)], 0.0).sum(axis=1)
+    return int(cand[np.argmax(score)])
+
+
+def seasonal_residuals(values, period: int | None) -> np.ndarray:
+    """
+    Detrended values minus their per-phase median profile (phase = row % period).
+    Without a period only the trend and the overall median are removed.
+    """
+    v = _detrend(np.asarray(values, dtype=float))
+    if not period or period < 2:
+        return v - np.nanmedian(v)
+    n = len(v)
+    rows = -(-n // period)
+    grid = np.full(rows * period, np.nan)
+    grid[:n] = v
+    with np.errstate(all="ignore"):
+        profile = np.nanmedian(grid.reshape(rows, period), axis=0)
+    return v - np.tile(profile, rows)[:n]
+
+
+def remove_outliers_seasonal_residual(
+    df: pd.DataFrame,
+    value_column: str,
+    time_column: str = None,
+    threshold: float = 3.0,
+    method: str = "zscore",
+    period: int | None = None,
+    max_period: int | None = None,
+) -> pd.DataFrame:
+    """
+    Remove the linear trend and the seasonal profile (per-phase median over the
+    dominant period, detected with detect_period unless `period` is given),
+    then remove rows whose residual is an outlier:
+      - method="zscore": |residual z-score| > threshold
+      - method="iqr": residual outside [Q1 - threshold*IQR, Q3 + threshold*IQR]
+    Unlike the global detectors, the peaks of every daily/yearly cycle are not flagged.
+    Rows are taken in `time_column` order if given, else row order. Keeps NaN rows.
+    """
+    if method not in ("zscore", "iqr"):
+        raise ValueError("method must be 'zscore' or 'iqr'.")
+
+    values = df[value_column].to_numpy(dtype=float, na_value=np.nan)
+    if time_column is not None:
+        order = np.argsort(df[time_column].to_numpy(), kind="stable")
+    else:
+        order = np.arange(len(df))
+    ordered = values[order]
+    if np.count_nonzero(~np.isnan(ordered)) < 2:
+        return df.copy()
+
+    if period is None:
+        period = detect_period(ordered, max_period=max_period)
+    residual = np.empty(len(df))
+    residual[order] = seasonal_residuals(ordered, period)
+
+    ok = ~np.isnan(residual)
+    if method == "zscore":
+        sigma = residual[ok].std()
+        if sigma == 0 or np.isnan(sigma):
+            return df.copy()
+        inside = np.abs(residual - residual[ok].mean()) <= threshold * sigma
+    else:
+        q1, q3 = np.quantile(residual[ok], [0.25, 0.75])
+        iqr = q3 - q1
+        if iqr == 0 or np.isnan(iqr):
+            return df.copy()
+        inside = (residual >= q1 - threshold * iqr) & (residual <= q3 + threshold * iqr)
+
+    return df.loc[~ok | inside].copy()
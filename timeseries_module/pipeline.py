@@ -1,9 +1,82 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import pandas as pd
 from .outliers.interface import handle_outliers
 from .missing_values.interface import apply_missing_values
+from .missing_values.methods.regular_grid import resample_regular
 from .rolling.interface import compute_rolling
 
+def _normalize_branches(branches) -> dict:
+    """
+    {name: fn | (fn, kwargs)} or [(name, fn, kwargs), ...] -> {name: (fn, kwargs)}.
+    """
+    items = branches.items() if isinstance(branches, dict) else [(b[0], b[1:]) for b in branches]
+    out = {}
+    for name, spec in items:
+        fn, kwargs = (spec, {}) if callable(spec) else (spec[0], dict(spec[1]) if len(spec) > 1 and spec[1] else {})
+        if not re.fullmatch(r"[\w.-]+", str(name)):
+            raise ValueError(f"Branch name '{name}' must be usable as a file name (letters, digits, _ . -).")
+        out[str(name)] = (fn, kwargs)
+    return out
+
+
+def _run_branch(df, fn, kwargs, value_column, csv_path):
+    result = compute_rolling(df=df, rolling_fn=fn, value_column=value_column, **kwargs)
+    if csv_path is not None:
+        result.to_csv(csv_path, index=False)
+    return result
+
+
+def run_branches(
+    df: pd.DataFrame,
+    branches,
+    value_column: str,
+    output_path: str | Path | None = None,
+    max_workers: int | None = None,
+) -> dict:
+    """
+    Apply several rolling branches to the same (cleaned) DataFrame concurrently.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Shared input; branches only read it (every rolling method works on a copy).
+    branches : dict or list
+        {name: rolling_fn} or {name: (rolling_fn, kwargs)}, or a list of
+        (name, rolling_fn, kwargs), e.g. {"mean_7": (rolling_mean, {"window": 7}),
+        "p90": (rolling_quantile, {"window": 30, "q": 0.9})}.
+    value_column : str
+        Column the branches operate on.
+    output_path : str | pathlib.Path | None
+        If given, each branch is written to `<output_path>/rolling_<name>.csv`
+        as soon as it is computed, while other branches are still running.
+    max_workers : int | None
+        Thread pool size (default: one thread per branch, at most 8). The
+        pandas/numpy window kernels release the GIL, so branches overlap.
+
+    Returns
+    -------
+    dict
+        {name: DataFrame}, in the order of `branches`.
+    """
+    specs = _normalize_branches(branches)
+    if not specs:
+        return {}
+    out_dir = Path(output_path) if output_path is not None else None
+    if out_dir is not None:
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+    workers = max_workers or min(len(specs), 8)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="branch") as pool:
+        futures = {
+            name: pool.submit(_run_branch, df, fn, kwargs, value_column,
+                              out_dir / f"rolling_{name}.csv" if out_dir is not None else None)
+            for name, (fn, kwargs) in specs.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
 def run_pipeline(
     input_df: pd.DataFrame,
     output_path: str | Path,
@@ -15,6 +88,9 @@ def run_pipeline(
     rolling_fn=None,          
     rolling_kwargs: dict | None = None,
     export: bool = True,
+    branches=None,
+    max_workers: int | None = None,
+    regular_grid: dict | None = None,
 ) -> pd.DataFrame:
     """
     Run a minimal cleaning pipeline on a time-series DataFrame, with an optional rolling step.
@@ -60,6 +136,20 @@ def run_pipeline(
     export : bool, optional
         If True (default), writes `<output_path>/clean.csv` when missing-values or outliers are applied,
         and writes `<output_path>/rolling.csv` when a rolling function is applied.
+    branches : dict, list or None, optional
+        Several rolling outputs from the same cleaned data, e.g.
+        {"mean": rolling_mean, "p90": (rolling_quantile, {"window": 30, "q": 0.9})}
+        (see `run_branches`). They run concurrently on a thread pool, together with
+        `rolling_fn` and the exports; each is written to `<output_path>/rolling_<name>.csv`.
+        Missing values and outliers are handled once for all of them. Branches are
+        skipped when `export=False`; call `run_branches` on the result to get them as DataFrames.
+    max_workers : int or None, optional
+        Thread pool size for the branches (default: one per branch, at most 8) and for the exports.
+    regular_grid : dict or None, optional
+        Options for `resample_regular` (e.g. {"max_gap": "10s"} or {"freq": "1s", "max_gap": "1min"}).
+        Step (1) then first inserts the rows missing from the sampling of `time_column`
+        (required) and applies `missing_value_function` only to gaps up to `max_gap`;
+        the gap report is written to `<output_path>/gaps.csv`.
 
     Returns
     -------
@@ -69,8 +159,13 @@ def run_pipeline(
 
     df = input_df.copy()
 
-    # 1) Missing values (skip if None)
-    if missing_value_function is not None:
+    # 1) Missing values (skip if None); with regular_grid, missing rows become NaNs first
+    gap_report = None
+    if regular_grid is not None:
+        if time_column is None:
+            raise ValueError("regular_grid needs a time_column.")
+        df, gap_report = resample_regular(df, value_column, time_column, fill=missing_value_function, **regular_grid)
+    elif missing_value_function is not None:
         df = apply_missing_values(missing_value_function, df, value_column)
 
     # 2) Outliers (skip if None)
@@ -83,25 +178,28 @@ def run_pipeline(
             time_column=time_column,
         )
 
-    # 3) Rolling (optional; run on the cleaned df)
-    rolling_df = None
-    if rolling_fn is not None:
-        rolling_df = compute_rolling(
-            df=df,
-            rolling_fn=rolling_fn,
-            value_column=value_column,
-            **(rolling_kwargs or {})
-        )
-
-    # 4) Export final result
-    if export:
-        out_dir = Path(output_path)
+    # 3) Rolling (optional; run on the cleaned df) and 4) exports, concurrently:
+    #    the branches only read the cleaned df, and every CSV is written as soon as it is ready
+    out_dir = Path(output_path) if export else None
+    if out_dir is not None:
         out_dir.mkdir(parents=True, exist_ok=True)
+    # Branches only produce their CSVs: without export there is nothing to compute them for
+    specs = _normalize_branches(branches) if branches else {}
+    tasks = 2 + (rolling_fn is not None)
+    with ThreadPoolExecutor(max_workers=max_workers or tasks, thread_name_prefix="pipeline") as pool:
+        pending = []
+        if out_dir is not None and (missing_value_function is not None or outlier_fn is not None
+                                    or regular_grid is not None):
+            pending.append(pool.submit(df.to_csv, out_dir / "clean.csv", index=False))
+        if out_dir is not None and gap_report is not None:
+            pending.append(pool.submit(gap_report.to_csv, out_dir / "gaps.csv", index=False))
+        if rolling_fn is not None:
+            pending.append(pool.submit(_run_branch, df, rolling_fn, rolling_kwargs or {}, value_column,
+                                       out_dir / "rolling.csv" if out_dir is not None else None))
 
-        if missing_value_function is not None or outlier_fn is not None:
-            df.to_csv(out_dir / "clean.csv", index=False)
-
-        if rolling_fn is not None and rolling_df is not None:
-            rolling_df.to_csv(out_dir / "rolling.csv", index=False)
+        if specs and out_dir is not None:
+            run_branches(df, specs, value_column, output_path=out_dir, max_workers=max_workers)
+        for future in pending:
+            future.result()
 
     return df
@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+
+__all__ = [
+    "COMPRESSION_METHODS",
+    "deadband_mask",
+    "swinging_door_mask",
+    "compress_series",
+    "reconstruct_series",
+]
+
+COMPRESSION_METHODS = ("deadband", "swinging_door")
+
+
+def _as_ns(times) -> np.ndarray:
+    return pd.to_datetime(pd.Series(times), utc=True).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+
+
+def deadband_mask(values, tolerance: float = 0.0) -> np.ndarray:
+    """
+    Keep a point when it differs from the last kept point by more than `tolerance`.
+    NaN runs are kept at their boundaries (first NaN, first value after it),
+    and the first and last points are always kept.
+    With tolerance=0 only actual changes are kept, so step reconstruction is exact.
+    """
+    v = np.asarray(values, dtype=float)
+    n = len(v)
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return keep
+
+    nan = np.isnan(v)
+    if tolerance == 0:
+        # Vectorized: "differs from the last kept point" == "differs from the previous point"
+        keep[1:] = (v[1:] != v[:-1]) & ~(nan[1:] & nan[:-1])
+    else:
+        last = v[0]
+        for i in range(1, n):
+            if nan[i] != np.isnan(last) or (not nan[i] and abs(v[i] - last) > tolerance):
+                keep[i] = True
+                last = v[i]
+    keep[0] = keep[-1] = True
+    return keep
+
+
+def swinging_door_mask(times, values, tolerance: float) -> np.ndarray:
+    """
+    Swinging-door trending: drop points as long as the line from the last kept
+    point to the current one passes within `tolerance` of every point in between,
+    so linear interpolation between kept points never errs by more than `tolerance`.
+    NaNs break the series (their boundaries are kept, as in deadband_mask).
+    """
+    if tolerance < 0:
+        raise ValueError("tolerance must be >= 0.")
+    v = np.asarray(values, dtype=float)
+    n = len(v)
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return keep
+    t = _as_ns(times)
+    t = (t - t[0]).astype(float)
+    keep[0] = keep[-1] = True
+
+    anchor = 0
+    upper, lower = np.inf, -np.inf
+    for i in range(1, n):
+        if np.isnan(v[i]) or np.isnan(v[anchor]):
+            # Keep both sides of a NaN boundary and restart the doors after it
+            if np.isnan(v[i]) != np.isnan(v[i - 1]):
+                keep[i - 1] = keep[i] = True
+            anchor, upper, lower = i, np.inf, -np.inf
+            continue
+
+        dt = t[i] - t[anchor]
+        if dt <= 0:
+            keep[i - 1] = keep[i] = True
+            anchor, upper, lower = i, np.inf, -np.inf
+            continue
+
+        slope = (v[i] - v[anchor]) / dt
+        if not lower <= slope <= upper:
+            # Doors closed on point i: the segment anchor -> i-1 was still valid,
+            # so archive i-1 and swing again from it
+            anchor = i - 1
+            keep[anchor] = True
+            upper, lower = np.inf, -np.inf
+            dt = t[i] - t[anchor]
+            if dt <= 0:
+                keep[i] = True
+                anchor = i
+                continue
+        # Every later segment from the anchor must pass within tolerance of point i
+        upper = min(upper, (v[i] + tolerance - v[anchor]) / dt)
+        lower = max(lower, (v[i] - tolerance - v[anchor]) / dt)
+    return keep
+
+
+def compress_series(
+    df: pd.DataFrame,
+    value_column: str,
+    time_column: str = "date_time",
+    method: str = "deadband",
+    tolerance: float = 0.0,
+) -> pd.DataFrame:
+    """
+    Return only the rows that `method` ("deadband" or "swinging_door") keeps.
+    Rebuild the full series with reconstruct_series (how="step" for deadband,
+    how="linear" for swinging_door).
+    """
+    if method not in COMPRESSION_METHODS:
+        raise ValueError(f"method must be one of {COMPRESSION_METHODS}.")
+    if tolerance < 0:
+        raise ValueError("tolerance must be >= 0.")
+    if df.empty:
+        return df.copy()
+
+    if method == "deadband":
+        keep = deadband_mask(df[value_column].to_numpy(dtype=float), tolerance)
+    else:
+        keep = swinging_door_mask(df[time_column], df[value_column].to_numpy(dtype=float), tolerance)
+    return df.loc[keep].copy()
+
+
+def reconstruct_series(kept_times, kept_values, times, how: str = "step") -> np.ndarray:
+    """
+    Values at `times` from a compressed series.
+      - "step": last kept value at or before each time (exact for deadband with tolerance=0)
+      - "linear": interpolate between the surrounding kept points (NaN-adjacent gaps fall back to step)
+    Times before the first kept point are NaN.
+    """
+    if how not in ("step", "linear"):
+        raise ValueError("how must be 'step' or 'linear'.")
+    kt = _as_ns(kept_times)
+    kv = np.asarray(kept_values, dtype=float)
+    t = _as_ns(times)
+    out = np.full(len(t), np.nan)
+    if len(kt) == 0 or len(t) == 0:
+        return out
+
+    idx = np.searchsorted(kt, t, side="right") - 1
+    valid = idx >= 0
+    out[valid] = kv[idx[valid]]
+    if how == "step":
+        return out
+
+    nxt = idx + 1
+    inner = valid & (nxt < len(kt))
+    i, j = idx[inner], nxt[inner]
+    left, right = kv[i], kv[j]
+    ok = ~np.isnan(left) & ~np.isnan(right)
+    frac = (t[inner] - kt[i]) / np.maximum(kt[j] - kt[i], 1)
+    out[np.flatnonzero(inner)[ok]] = left[ok] + (right[ok] - left[ok]) * frac[ok]
+    return out
@@ -8,6 +8,48 @@ def apply_rolling(func, df: pd.DataFrame, value_column: str, **kwargs) -> pd.Dat
 
 
 
+def rolling_defaults(rolling_fn, **kwargs) -> dict:
+    """
+    The options compute_rolling calls `rolling_fn` (a function or its name) with:
+    the method's defaults, overridden by `kwargs`.
+    """
+    name = getattr(rolling_fn, "__name__", str(rolling_fn)).lower()
+    options = {}
+
+    # Exponentially weighted: no frame, `window` is the span unless span/halflife/alpha is given
+    if "ewm" in name:
+        options["min_periods"] = 2 if "zscore" in name else 1
+        if not any(k in kwargs for k in ("span", "halflife", "alpha")):
+            options["window"] = 7
+
+    # Two-series statistics: trailing window over the pair, no `center`
+    elif any(k in name for k in ("_cov", "_corr", "_beta")):
+        options["min_periods"] = 1 if "cov" in name else 2
+        options["window"] = 14
+        if "cov" in name:
+            options["ddof"] = 0
+
+    else:
+        # Common defaults
+        options["min_periods"] = 1
+        options["center"] = False
+
+        # Window defaults (you can change these if you prefer)
+        if "std" in name or "var" in name:
+            options["window"] = 14
+            options["ddof"] = 0
+        else:
+            options["window"] = 7
+
+        # Quantile defaults
+        if "quantile" in name:
+            options["q"] = 0.5
+            options["method"] = "linear"
+
+    options.update(kwargs)
+    return options
+
+
 def compute_rolling(
     df: pd.DataFrame,
     rolling_fn,            
@@ -15,7 +57,7 @@ def compute_rolling(
     **kwargs
 ) -> pd.DataFrame:
     """
-    Wrapper that applies a rolling function with simple defaults.
+    Wrapper that applies a rolling function with simple defaults (see rolling_defaults).
 
     df: pd.DataFrame
         The input data.
@@ -24,6 +66,8 @@ def compute_rolling(
           - rolling_mean / rolling_median / rolling_sum / rolling_min / rolling_max
           - rolling_std / rolling_var
           - rolling_quantile
+          - rolling_ewm_mean / rolling_ewm_var / rolling_ewm_std / rolling_ewm_zscore
+          - rolling_cov / rolling_corr / rolling_beta (pass other_column=...)
     value_column: str
         Column to operate on.
     kwargs:
@@ -33,25 +77,19 @@ def compute_rolling(
         raise ValueError(f"value_column '{value_column}' not found in DataFrame.")
 
     name = getattr(rolling_fn, "__name__", "").lower()
-    options = {}
+    options = rolling_defaults(rolling_fn, **kwargs)
 
-    # Common defaults
-    options["min_periods"] = 1
-    options["center"] = False
+    if "ewm" in name:
+        if "window" in options and float(options["window"]) <= 1:
+            raise ValueError("Please provide a 'window' (span) > 1 (e.g., window=7).")
+        return apply_rolling(rolling_fn, df, value_column, **options)
 
-    # Window defaults (you can change these if you prefer)
-    if "std" in name or "var" in name:
-        options["window"] = 14
-        options["ddof"] = 0
-    else:
-        options["window"] = 7
-
-    # Quantile defaults
-    if "quantile" in name:
-        options["q"] = 0.5
-        options["method"] = "linear"
-
-    options.update(kwargs)
+    if any(k in name for k in ("_cov", "_corr", "_beta")):
+        if "other_column" not in options:
+            raise ValueError(f"'{name}' needs other_column=... (the second series).")
+        if int(options["window"]) <= 0:
+            raise ValueError("Please provide a positive 'window' (e.g., window=14).")
+        return apply_rolling(rolling_fn, df, value_column, **options)
 
     if int(options.get("window", 0)) <= 0:
         raise ValueError("Please provide a positive 'window' (e.g., window=7).")
@@ -61,4 +99,3 @@ def compute_rolling(
             raise ValueError("'q' must be in [0, 1].")
 
     return apply_rolling(rolling_fn, df, value_column, **options)
-
@@ -6,6 +6,8 @@ from .sum import rolling_sum
 from .min_ import rolling_min
 from .max_ import rolling_max
 from .quantile import rolling_quantile
+from .cross import rolling_cov, rolling_corr, rolling_beta, rolling_pairwise, asof_align
+from .ewm import rolling_ewm_mean, rolling_ewm_var, rolling_ewm_std, rolling_ewm_zscore, EWMState
 
 __all__ = [
     "rolling_mean",
@@ -15,5 +17,18 @@ __all__ = [
     "rolling_sum",
     "rolling_min",
     "rolling_max",
-    "rolling_quantile"
+    "rolling_quantile",
+    "rolling_ewm_mean",
+    "rolling_ewm_var",
+    "rolling_ewm_std",
+    "rolling_ewm_zscore",
+    "EWMState",
+    "rolling_cov",
+    "rolling_corr",
+    "rolling_beta",
+    "rolling_pairwise",
+    "asof_align",
 ]
+
+# Need a second series (other_column / columns), so they are not single-column rolling functions
+CROSS_SERIES = ("rolling_cov", "rolling_corr", "rolling_beta", "rolling_pairwise")
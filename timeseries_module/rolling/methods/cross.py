@@ -0,0 +1,222 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+_STATS = ("cov", "corr", "beta")
+
+
+def _window_sums(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing sums over `window` rows along axis 0 in O(n). Prefix sums restart
+    every `window` rows and each window adds the suffix sum of the block before,
+    so rounding error stays at the scale of one window (differences of one global
+    cumsum cancel on long trended series).
+    """
+    n = values.shape[0]
+    if n == 0:
+        return values.astype(float)
+    blocks = -(-n // window)
+    padded = np.zeros((blocks * window,) + values.shape[1:])
+    padded[:n] = values
+    padded = padded.reshape((blocks, window) + values.shape[1:])
+    out = np.cumsum(padded, axis=1).reshape((-1,) + values.shape[1:])[:n]
+    suffix = np.cumsum(padded[:, ::-1], axis=1)[:, ::-1].reshape((-1,) + values.shape[1:])
+    # Row t (t >= window) also covers rows t-window+1 .. end of the previous block,
+    # unless it closes its own block (then the window is exactly that block)
+    t = np.arange(window, n)
+    t = t[(t + 1) % window != 0]
+    out[t] += suffix[t - window + 1]
+    return out
+
+
+class _Moments:
+    """
+    Running cross-moments of column pairs over a trailing window: count, sums,
+    sums of squares and the cross sum, each computed once and shared by
+    cov / corr / beta. Only rows where both columns are non-NaN count.
+    Columns are centred on their mean first (moments are shift-invariant)
+    and the window sums are block-wise, so neither large offsets nor long
+    trends make them cancel.
+    """
+
+    def __init__(self, x: np.ndarray, window: int):
+        self.window = window
+        x = np.asarray(x, dtype=float)
+        self.x = x - np.nan_to_num(np.nanmean(x, axis=0)) if x.size else x
+        self.valid = ~np.isnan(self.x)
+        # Per-column sums, reused for every pair whose columns have no NaNs
+        z = np.where(self.valid, self.x, 0.0)
+        self.n = _window_sums(self.valid.astype(float), window)
+        self.s = _window_sums(z, window)
+        self.ss = _window_sums(z * z, window)
+        self.complete = self.valid.all(axis=0)
+
+    def pair(self, i: int, j: int):
+        """
+        (count, sum_i, sum_j, sum_ii, sum_jj, sum_ij) over the window for columns i, j.
+        """
+        xi, xj = self.x[:, i], self.x[:, j]
+        if self.complete[i] and self.complete[j]:
+            cross = _window_sums(xi * xj, self.window)
+            return self.n[:, i], self.s[:, i], self.s[:, j], self.ss[:, i], self.ss[:, j], cross
+        both = self.valid[:, i] & self.valid[:, j]
+        a, b = np.where(both, xi, 0.0), np.where(both, xj, 0.0)
+        sums = _window_sums(np.column_stack([both, a, b, a * a, b * b, a * b]).astype(float), self.window)
+        return tuple(sums.T)
+
+    def stat(self, i: int, j: int, stat: str, min_periods: int, ddof: int = 0) -> np.ndarray:
+        n, si, sj, sii, sjj, sij = self.pair(i, j)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cij = sij - si * sj / n                  # co-moment (n * population covariance)
+            if stat == "cov":
+                out = cij / (n - ddof)
+                out[n - ddof <= 0] = np.nan
+            else:
+                cjj = np.maximum(sjj - sj * sj / n, 0.0)
+                if stat == "beta":
+                    out = np.where(cjj > 0, cij / cjj, np.nan)
+                else:
+                    cii = np.maximum(sii - si * si / n, 0.0)
+                    denom = np.sqrt(cii * cjj)
+                    out = np.where(denom > 0, np.clip(cij / denom, -1.0, 1.0), np.nan)
+        out[n < max(int(min_periods), 1)] = np.nan
+        return out
+
+
+def _check(stat: str, window: int) -> None:
+    if stat not in _STATS:
+        raise ValueError(f"stat must be one of {_STATS}.")
+    if int(window) <= 0:
+        raise ValueError("Please provide a positive 'window' (e.g., window=14).")
+
+
+def _cross(df, value_column, other_column, window, min_periods, ddof, stat, output_column, suffix):
+    _check(stat, window)
+    if other_column not in df.columns:
+        raise ValueError(f"other_column '{other_column}' not found in DataFrame.")
+    out = df.copy()
+    x = np.column_stack([out[value_column].to_numpy(dtype=float, na_value=np.nan),
+                         out[other_column].to_numpy(dtype=float, na_value=np.nan)])
+    col = output_column or f"{value_column}_{other_column}_roll_{suffix}"
+    out[col] = _Moments(x, int(window)).stat(0, 1, stat, min_periods, ddof)
+    return out
+
+
+def rolling_cov(
+    df: pd.DataFrame,
+    value_column: str,
+    other_column: str,
+    window: int,
+    min_periods: int = 1,
+    ddof: int = 0,
+    output_column: str | None = None,
+) -> pd.DataFrame:
+    """
+    Rolling covariance of `value_column` with `other_column` over a trailing
+    window, from running cross-moments in one O(n) pass (rows where either
+    value is NaN are skipped). For series with different timestamps, align
+    them first with asof_align.
+    """
+    return _cross(df, value_column, other_column, window, min_periods, ddof, "cov", output_column, "cov")
+
+
+def rolling_corr(
+    df: pd.DataFrame,
+    value_column: str,
+    other_column: str,
+    window: int,
+    min_periods: int = 2,
+    output_column: str | None = None,
+) -> pd.DataFrame:
+    """
+    Rolling Pearson correlation of `value_column` with `other_column`
+    (NaN while either side is constant in the window); see rolling_cov.
+    """
+    return _cross(df, value_column, other_column, window, min_periods, 0, "corr", output_column, "corr")
+
+
+def rolling_beta(
+    df: pd.DataFrame,
+    value_column: str,
+    other_column: str,
+    window: int,
+    min_periods: int = 2,
+    output_column: str | None = None,
+) -> pd.DataFrame:
+    """
+    Rolling regression slope of `value_column` on `other_column`
+    (cov / var(other)), e.g. how much RAM moves per point of CPU; see rolling_cov.
+    """
+    return _cross(df, value_column, other_column, window, min_periods, 0, "beta", output_column, "beta")
+
+
+def rolling_pairwise(
+    df: pd.DataFrame,
+    columns: list[str],
+    window: int,
+    stat: str = "corr",
+    min_periods: int = 2,
+    ddof: int = 0,
+) -> pd.DataFrame:
+    """
+    `stat` ("corr", "cov" or "beta") for every pair of `columns` at once.
+    Per-column moments are computed once and shared across pairs.
+
+    Returns a DataFrame on df's index with one column per pair, labelled by
+    a (column_a, column_b) MultiIndex for a before b in `columns` (beta is
+    the slope of a on b). `result.iloc[t].unstack()` gives the pair matrix at row t.
+    """
+    _check(stat, window)
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise ValueError(f"columns not found in DataFrame: {missing}")
+    x = np.column_stack([df[c].to_numpy(dtype=float, na_value=np.nan) for c in columns])
+    moments = _Moments(x, int(window))
+    pairs = list(combinations(range(len(columns)), 2))
+    data = {(columns[i], columns[j]): moments.stat(i, j, stat, min_periods, ddof) for i, j in pairs}
+    out = pd.DataFrame(data, index=df.index)
+    out.columns = pd.MultiIndex.from_tuples(out.columns, names=["a", "b"]) if pairs else out.columns
+    return out
+
+
+def asof_align(
+    left: pd.DataFrame,
+    right: pd.DataFrame,
+    time_column: str,
+    value_column: str,
+    other_column: str | None = None,
+    tolerance=None,
+    direction: str = "backward",
+    relative: bool = False,
+    time_format: str | None = None,
+    suffixes: tuple[str, str] = ("", "_other"),
+) -> pd.DataFrame:
+    """
+    Align two series with different timestamps: each `left` row gets the
+    latest `right` value at or before its time (direction="backward"; or
+    "forward" / "nearest"), no older than `tolerance` (e.g. "2s"), else NaN.
+
+    relative=True aligns on the time elapsed since each series' first
+    timestamp, to compare two runs recorded at different times (e.g.
+    data/4threads.csv vs data/6threads.csv). `time_format` is passed to
+    pd.to_datetime (e.g. "%Y-%m-%d_%H-%M-%S").
+
+    Returns `left`'s time and value columns plus the matched right value,
+    named `other_column` (default: right's `value_column` + suffixes[1]),
+    ordered by time - ready for rolling_cov / rolling_corr / rolling_beta.
+    """
+    other_column = other_column or f"{value_column}{suffixes[1]}"
+    value_left = f"{value_column}{suffixes[0]}"
+
+    def prepare(frame, column):
+        t = pd.to_datetime(frame[time_column], format=time_format)
+        if relative:
+            t = t - t.min()
+        out = pd.DataFrame({time_column: t, column: frame[value_column].to_numpy()})
+        return out.dropna(subset=[time_column]).sort_values(time_column, kind="stable")
+
+    return pd.merge_asof(
+        prepare(left, value_left), prepare(right, other_column), on=time_column, direction=direction,
+        tolerance=pd.Timedelta(tolerance) if tolerance is not None else None,
+    ).reset_index(drop=True)
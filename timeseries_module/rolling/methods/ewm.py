@@ -0,0 +1,291 @@
+import math
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+_LN2 = math.log(2.0)
+_CHUNK = 1024        # Rows per vectorized scan step
+_MAX_DECAY = 300.0   # Max -log(total decay) within one step (keeps 1 / decay finite)
+_MIN_DECAY = math.exp(-_MAX_DECAY)  # Per-value decay floor; below it the history is forgotten either way
+
+
+class EWMStats(NamedTuple):
+    mean: float
+    var: float
+    std: float
+    zscore: float    # of the value against the mean/std *before* it was added
+
+
+def _to_seconds(t) -> float:
+    if isinstance(t, (int, float, np.integer, np.floating)):
+        return float(t)
+    return pd.Timestamp(t).value / 1e9
+
+
+class EWMState:
+    """
+    Constant-memory exponentially weighted mean / variance for live streams.
+
+    Decay is set by exactly one of:
+      - span (rows):       alpha = 2 / (span + 1)
+      - halflife (rows):   alpha = 1 - exp(-ln 2 / halflife)
+      - alpha
+      - halflife as a time span (pd.Timedelta, "5min", ...): each value decays
+        the history by exp(-ln 2 * dt / halflife), dt being the time since the
+        previous value, so irregular timestamps are weighted by elapsed time.
+
+    Weights follow pandas' `ewm(adjust=True)`: the mean is sum(w*x) / sum(w),
+    the variance is the biased (population) weighted variance. A NaN value
+    still decays the history but adds nothing. `update(value, t)` returns the
+    statistics after the value; `zscore` compares the value with the
+    statistics before it, so a spike does not hide itself.
+
+    The batch methods (rolling_ewm_*) run the same recurrence vectorized and
+    give the same results up to floating-point rounding.
+    """
+
+    def __init__(self, span: float | None = None, halflife=None, alpha: float | None = None,
+                 min_periods: int = 1):
+        given = [x is not None for x in (span, halflife, alpha)]
+        if sum(given) != 1:
+            raise ValueError("Pass exactly one of span, halflife or alpha.")
+        self.time_halflife = None
+        if halflife is not None and not isinstance(halflife, (int, float, np.integer, np.floating)):
+            self.time_halflife = pd.Timedelta(halflife).total_seconds()
+            if self.time_halflife <= 0:
+                raise ValueError("halflife must be positive.")
+            self.alpha = None
+        else:
+            self.alpha = ewm_alpha(span=span, halflife=halflife, alpha=alpha)
+        self.min_periods = max(int(min_periods), 1)
+        self.weight = 0.0    # sum of weights
+        self.mean = math.nan
+        self.m2 = 0.0        # weighted sum of squared deviations from the mean
+        self.count = 0
+        self.last_t = None
+
+    @property
+    def time_based(self) -> bool:
+        return self.time_halflife is not None
+
+    def _decay(self, t) -> float:
+        if not self.time_based:
+            return max(1.0 - self.alpha, _MIN_DECAY)
+        if t is None:
+            raise ValueError("A time-based halflife needs a timestamp `t` for every update.")
+        t = _to_seconds(t)
+        last, self.last_t = self.last_t, t
+        if last is None or t <= last:
+            return 1.0
+        return max(math.exp(-_LN2 * (t - last) / self.time_halflife), _MIN_DECAY)
+
+    def stats(self) -> EWMStats:
+        if self.count < self.min_periods:
+            return EWMStats(math.nan, math.nan, math.nan, math.nan)
+        var = max(self.m2 / self.weight, 0.0)
+        return EWMStats(self.mean, var, math.sqrt(var), math.nan)
+
+    def update(self, value: float, t=None) -> EWMStats:
+        """
+        Add one value (observed at time `t`; required for a time-based halflife).
+        """
+        prior = self.stats()
+        d = self._decay(t)
+        self.weight *= d
+        self.m2 *= d
+        if value == value:
+            # Weighted Welford/West step: old weights scaled by d, new weight 1
+            self.weight += 1.0
+            old = 0.0 if self.count == 0 else self.mean
+            self.mean = old + (value - old) / self.weight
+            self.m2 += (value - old) * (value - self.mean)
+            self.count += 1
+        now = self.stats()
+        z = (value - prior.mean) / prior.std if prior.std > 0 else math.nan
+        return now._replace(zscore=z)
+
+
+def ewm_alpha(span: float | None = None, halflife: float | None = None, alpha: float | None = None) -> float:
+    """
+    Smoothing factor from span or halflife (in rows), like pandas.
+    """
+    if span is not None:
+        if span <= 1:
+            raise ValueError("span must be > 1.")
+        return 2.0 / (span + 1.0)
+    if halflife is not None:
+        if halflife <= 0:
+            raise ValueError("halflife must be positive.")
+        return 1.0 - math.exp(-_LN2 / halflife)
+    # alpha = 1 keeps only the latest value: the variance is pure rounding noise
+    if not 0 < alpha < 1:
+        raise ValueError("alpha must be in (0, 1).")
+    return float(alpha)
+
+
+def ewm_scan(values, state: EWMState, times=None) -> dict:
+    """
+    Run `state` over a whole array, vectorized in chunks, leaving it as if
+    `update` had been called for every value. Returns arrays mean, var, std,
+    zscore (one entry per value, same semantics as EWMState.update).
+
+    Within a chunk the decayed sums are closed-form cumulative sums, scaled by
+    the chunk's running decay; values are centred on the mean at the chunk
+    start to avoid cancellation in the variance.
+    """
+    x = np.asarray(values, dtype=float)
+    n = len(x)
+    if state.time_based and times is None:
+        raise ValueError("A time-based halflife needs a time column.")
+    if n == 0:
+        return {"mean": np.empty(0), "var": np.empty(0), "std": np.empty(0), "zscore": np.empty(0)}
+    if state.time_based:
+        ts = np.array([_to_seconds(t) for t in times]) if not np.issubdtype(np.asarray(times).dtype, np.number) \
+            else np.asarray(times, dtype=float)
+        prev = np.concatenate([[ts[0] if state.last_t is None else state.last_t], ts[:-1]])
+        log_d = -_LN2 * np.maximum(ts - prev, 0.0) / state.time_halflife
+        state.last_t = float(ts[-1])
+    else:
+        log_d = np.full(n, math.log(1.0 - state.alpha))
+    # Same floor as EWMState._decay; also keeps 1 / decay finite
+    log_d = np.maximum(log_d, -_MAX_DECAY)
+    prior = state.stats()
+
+    valid = ~np.isnan(x)
+    mean = np.empty(n)
+    m2 = np.empty(n)
+    weight = np.empty(n)
+    count = np.empty(n, dtype=np.int64)
+
+    s = 0
+    while s < n:
+        e = min(s + _CHUNK, n)
+        cum = np.cumsum(log_d[s:e])
+        cut = int(np.searchsorted(-cum, _MAX_DECAY, side="right"))
+        e = s + max(cut, 1)
+        q = np.exp(cum[: e - s])                  # decay from the chunk start to each row
+        v = valid[s:e]
+        c = state.mean if state.count else (x[s:e][v][0] if v.any() else 0.0)
+        y = np.where(v, x[s:e] - c, 0.0)
+        w0, sy0 = state.weight, (state.mean - c) * state.weight if state.count else 0.0
+        syy0 = state.m2 + (sy0 * sy0 / w0 if w0 > 0 else 0.0)
+        with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+            inv = 1.0 / q
+            w = q * (w0 + np.cumsum(v * inv))
+            sy = q * (sy0 + np.cumsum(y * inv))
+            syy = q * (syy0 + np.cumsum(y * y * inv))
+            my = sy / w
+            weight[s:e] = w
+            mean[s:e] = c + my
+            m2[s:e] = np.maximum(syy - sy * my, 0.0)
+        count[s:e] = state.count + np.cumsum(v)
+        if count[e - 1]:
+            state.weight, state.mean, state.m2 = float(w[-1]), float(mean[e - 1]), float(m2[e - 1])
+        else:
+            state.weight, state.m2 = float(w[-1]) if np.isfinite(w[-1]) else 0.0, 0.0
+        state.count = int(count[e - 1])
+        s = e
+
+    ready = count >= state.min_periods
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = np.where(ready, m2 / weight, np.nan)
+    mean = np.where(ready, mean, np.nan)
+    std = np.sqrt(var)
+    prior_mean = np.concatenate([[prior.mean], mean[:-1]])
+    prior_std = np.concatenate([[prior.std], std[:-1]])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = np.where(prior_std > 0, (x - prior_mean) / prior_std, np.nan)
+    return {"mean": mean, "var": var, "std": std, "zscore": z}
+
+
+def _ewm(df, value_column, stat, window, span, halflife, alpha, time_column, min_periods, output_column, suffix):
+    if span is None and halflife is None and alpha is None:
+        span = window
+    state = EWMState(span=span, halflife=halflife, alpha=alpha, min_periods=min_periods)
+    times = None
+    if state.time_based:
+        if time_column is None:
+            raise ValueError("A time-based halflife needs `time_column`.")
+        times = pd.to_datetime(df[time_column]).to_numpy(dtype="datetime64[ns]").astype(np.int64) / 1e9
+    out = df.copy()
+    col = output_column or f"{value_column}_ewm_{suffix}"
+    values = out[value_column].to_numpy(dtype=float, na_value=np.nan)
+    out[col] = ewm_scan(values, state, times)[stat]
+    return out
+
+
+def rolling_ewm_mean(
+    df: pd.DataFrame,
+    value_column: str,
+    window: float | None = None,
+    span: float | None = None,
+    halflife=None,
+    alpha: float | None = None,
+    time_column: str | None = None,
+    min_periods: int = 1,
+    output_column: str | None = None,
+) -> pd.DataFrame:
+    """
+    Exponentially weighted mean (see EWMState for span / halflife / alpha and
+    time-based halflife with `time_column`). `window` is taken as the span
+    when no other decay is given, so EW methods fit the window-based specs.
+    """
+    return _ewm(df, value_column, "mean", window, span, halflife, alpha, time_column, min_periods,
+                output_column, "mean")
+
+
+def rolling_ewm_var(
+    df: pd.DataFrame,
+    value_column: str,
+    window: float | None = None,
+    span: float | None = None,
+    halflife=None,
+    alpha: float | None = None,
+    time_column: str | None = None,
+    min_periods: int = 1,
+    output_column: str | None = None,
+) -> pd.DataFrame:
+    """
+    Exponentially weighted (population) variance; parameters as rolling_ewm_mean.
+    """
+    return _ewm(df, value_column, "var", window, span, halflife, alpha, time_column, min_periods,
+                output_column, "var")
+
+
+def rolling_ewm_std(
+    df: pd.DataFrame,
+    value_column: str,
+    window: float | None = None,
+    span: float | None = None,
+    halflife=None,
+    alpha: float | None = None,
+    time_column: str | None = None,
+    min_periods: int = 1,
+    output_column: str | None = None,
+) -> pd.DataFrame:
+    """
+    Exponentially weighted (population) standard deviation; parameters as rolling_ewm_mean.
+    """
+    return _ewm(df, value_column, "std", window, span, halflife, alpha, time_column, min_periods,
+                output_column, "std")
+
+
+def rolling_ewm_zscore(
+    df: pd.DataFrame,
+    value_column: str,
+    window: float | None = None,
+    span: float | None = None,
+    halflife=None,
+    alpha: float | None = None,
+    time_column: str | None = None,
+    min_periods: int = 2,
+    output_column: str | None = None,
+) -> pd.DataFrame:
+    """
+    Z-score of each value against the exponentially weighted mean/std of the
+    values before it (NaN until `min_periods` values and a non-zero std);
+    parameters as rolling_ewm_mean.
+    """
+    return _ewm(df, value_column, "zscore", window, span, halflife, alpha, time_column, min_periods,
+                output_column, "zscore")
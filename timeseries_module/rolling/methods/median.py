@@ -1,5 +1,7 @@
 import pandas as pd
 
+from ...sketches import rolling_sketch_quantiles
+
 def rolling_median(
     df: pd.DataFrame,
     value_column: str,
@@ -7,9 +9,20 @@ def rolling_median(
     min_periods: int = 1,
     center: bool = False,
     output_column: str | None = None,
+    approximate: bool = False,
+    k: int = 200,
+    blocks: int = 8,
 ) -> pd.DataFrame:
-    
+    """
+    approximate=True: sketch-based median, see rolling_quantile.
+    """
     out = df.copy()
     col = output_column or f"{value_column}_roll_median" 
+    if approximate and window > k:
+        if center:
+            raise ValueError("approximate=True supports trailing windows only (center=False).")
+        out[col] = rolling_sketch_quantiles(out[value_column].to_numpy(dtype=float, na_value=float("nan")),
+                                            window, [0.5], min_periods=min_periods, k=k, blocks=blocks)[:, 0]
+        return out
     out[col] = out[value_column].rolling(window=window, min_periods=min_periods, center=center).median()
     return out
@@ -1,5 +1,7 @@
 import pandas as pd
 
+from ...sketches import rolling_sketch_quantiles
+
 def rolling_quantile(
     df: pd.DataFrame,
     value_column: str,
@@ -9,6 +11,9 @@ def rolling_quantile(
     center: bool = False,
     method: str | None = None,
     output_column: str | None = None,
+    approximate: bool = False,
+    k: int = 200,
+    blocks: int = 8,
 ) -> pd.DataFrame:
     """
     Rolling quantile using the NEW pandas API (>= 2.2), which uses `method=...`
@@ -21,9 +26,22 @@ def rolling_quantile(
     method : str | None
         Quantile algorithm name per pandas >= 2.2 (e.g., "linear", etc.).
         If None, pandas' default is used (currently "linear").
+    approximate : bool
+        Use KLL sketches of size `k` over blocks of ceil(window / `blocks`)
+        rows (bounded memory per window, mergeable across chunks); the rows
+        at the window edges are counted exactly. Rank error within about 1.5x
+        the sketch's (max 0.75% measured for k=200), see
+        `rolling_sketch_quantiles`. Trailing windows only; windows of at
+        most `k` rows are computed exactly.
     """
     out = df.copy()
     col = output_column or f"{value_column}_roll_q{q:g}"
+    if approximate and window > k:
+        if center:
+            raise ValueError("approximate=True supports trailing windows only (center=False).")
+        out[col] = rolling_sketch_quantiles(out[value_column].to_numpy(dtype=float, na_value=float("nan")),
+                                            window, [q], min_periods=min_periods, k=k, blocks=blocks)[:, 0]
+        return out
     roll = out[value_column].rolling(window=window, min_periods=min_periods, center=center)
 
     if method is None:
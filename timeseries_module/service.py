@@ -0,0 +1,384 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import signal
+import sys
+import time
+from collections import OrderedDict, deque
+from urllib.parse import unquote
+
+from .rolling.methods.ewm import _to_seconds
+from .streaming import METHODS, StreamDetector
+
+# Exit status, as in timeseries-batch
+EXIT_OK = 0
+EXIT_USAGE = 2
+
+MAX_BATCH = 10_000        # readings per request; larger batches would stall the event loop
+MAX_BODY = 4 << 20        # bytes
+MAX_SERIES = 100_000      # series kept in memory; the least recently used are dropped beyond that
+LATENCY_SAMPLES = 10_000  # recent requests kept for the latency percentiles
+RATE_WINDOW = 10.0        # seconds over which the current throughput is measured
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class RequestError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _clean(values: list) -> list:
+    # JSON has no NaN: undefined scores and statistics are sent as null
+    return [None if isinstance(v, float) and math.isnan(v) else v for v in values]
+
+
+def to_seconds(t) -> float | None:
+    """
+    Epoch seconds of a reading's time (number or ISO string); None stays None.
+    """
+    if t is None:
+        return None
+    if isinstance(t, bool):
+        raise ValueError(f"invalid time {t!r}")
+    seconds = _to_seconds(t)
+    if seconds != seconds:
+        raise ValueError(f"invalid time {t!r}")
+    return seconds
+
+
+def _percentile(ordered: list, q: float) -> float | None:
+    if not ordered:
+        return None
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class ScoringService:
+    """
+    Per-series streaming state (StreamDetector) and the request handlers,
+    independent of the transport.
+
+    A series is created by its first batch, with that batch's settings
+    (method / sensitivity / window / min_periods / halflife, defaulting to the
+    service's); later batches continue its state. Different settings for an
+    existing series are rejected - reset it first.
+    """
+
+    def __init__(self, method: str = "zscore", sensitivity: str = "medium", window: int = 300,
+                 min_periods: int = 30, halflife=None, max_series: int = MAX_SERIES):
+        self.defaults = {"method": method, "sensitivity": sensitivity, "window": window,
+                         "min_periods": min_periods, "halflife": halflife}
+        StreamDetector(**self.defaults)   # validate once at startup
+        self.max_series = max_series
+        self.series = OrderedDict()       # name -> StreamDetector, least recently used first
+        self.started = time.monotonic()
+        self.requests = self.points = self.errors = self.evicted = 0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)   # (seconds, points) per scoring request
+        self.recent = deque()                            # (monotonic time, points) within RATE_WINDOW
+
+    def _check(self, batch, created: dict) -> tuple:
+        """
+        Validate one batch without touching any state: (name, detector or None, new detector
+        or None, float values, times in seconds or None). Raises RequestError.
+        """
+        if not isinstance(batch, dict) or not isinstance(batch.get("series"), str):
+            raise RequestError(400, 'each batch needs a "series" name and "values".')
+        name = batch["series"]
+        values, times = batch.get("values"), batch.get("times")
+        if not isinstance(values, list) or (times is not None and (not isinstance(times, list) or len(times) != len(values))):
+            raise RequestError(400, '"values" must be a list, and "times" (optional) a list of the same length.')
+        try:
+            # bool is an int in Python, but a flag is not a reading
+            if any(isinstance(v, (bool, str)) for v in values):
+                raise ValueError("readings must be numbers or null")
+            floats = [math.nan if v is None else float(v) for v in values]
+            if any(math.isinf(v) for v in floats):
+                raise ValueError("readings must be finite (an infinite one would poison the window sums)")
+            seconds = [to_seconds(t) for t in times] if times is not None else None
+        except (TypeError, ValueError, OverflowError) as e:
+            raise RequestError(400, f"series '{name}': {e}")
+
+        settings = {k: batch[k] for k in self.defaults if k in batch}
+        current = self.series.get(name) or created.get(name)
+        fresh = None
+        if current is None:
+            try:
+                fresh = StreamDetector(**{**self.defaults, **settings})
+            except (TypeError, ValueError) as e:
+                raise RequestError(400, f"series '{name}': {e}")
+            current = fresh
+        elif settings:
+            # Compare normalized settings ("High" is "high", min_periods 1 is 2, window "10" is 10)
+            expected = current.settings()
+            try:
+                requested = StreamDetector(**{**expected, **settings}).settings()
+            except (TypeError, ValueError) as e:
+                raise RequestError(400, f"series '{name}': {e}")
+            changed = {k: v for k, v in requested.items() if expected[k] != v}
+            if changed:
+                raise RequestError(409, f"series '{name}' exists with {expected}; reset it to change {sorted(changed)}.")
+        if current.time_based and (seconds is None or any(t is None for t in seconds)):
+            raise RequestError(400, f"series '{name}': a time-based halflife needs \"times\" for every reading.")
+        return name, current, fresh, floats, seconds
+
+    def handle_score(self, payload, start: float | None = None) -> dict:
+        """
+        POST /score with one batch {"series", "values", ["times"], [settings]}
+        or {"batches": [batch, ...]} for several series in one round trip.
+        The whole request is validated first: an error leaves every series unchanged,
+        so a client can retry it.
+        `start` (perf_counter) is when the request was received, for the latency metrics.
+        """
+        start = start if start is not None else time.perf_counter()
+        batches = payload.get("batches") if isinstance(payload, dict) and "batches" in payload else [payload]
+        if not isinstance(batches, list):
+            raise RequestError(400, '"batches" must be a list.')
+        # Malformed batches are reported by _check (400); only count what can be counted
+        n = sum(len(b["values"]) for b in batches if isinstance(b, dict) and isinstance(b.get("values"), list))
+        if n > MAX_BATCH:
+            raise RequestError(413, f"at most {MAX_BATCH} readings per request (got {n}).")
+        created, checked = {}, []
+        for batch in batches:
+            name, detector, fresh, floats, seconds = self._check(batch, created)
+            if fresh is not None:
+                created[name] = fresh
+            checked.append((name, detector, floats, seconds))
+
+        results = []
+        for name, detector, floats, seconds in checked:
+            if name in created:
+                self.series[name] = created.pop(name)
+                if len(self.series) > self.max_series:
+                    self.series.popitem(last=False)
+                    self.evicted += 1
+            self.series.move_to_end(name)
+            result = detector.update_many(floats, seconds)
+            results.append({"series": name, "outlier": result["outlier"], "score": _clean(result["score"]),
+                            "mean": _clean(result["mean"]), "std": _clean(result["std"])})
+
+        self.latencies.append((time.perf_counter() - start, n))
+        self.recent.append((time.monotonic(), n))
+        self._trim_recent()
+        self.points += n
+        return results[0] if payload is batches[0] else {"results": results}
+
+    def reset(self, name: str) -> dict:
+        if self.series.pop(name, None) is None:
+            raise RequestError(404, f"unknown series '{name}'.")
+        return {"series": name, "reset": True}
+
+    def describe(self, name: str) -> dict:
+        detector = self.series.get(name)
+        if detector is None:
+            raise RequestError(404, f"unknown series '{name}'.")
+        mean, std = detector.stats()
+        return {"series": name, **detector.settings(), "readings": detector.count,
+                "mean": _clean([mean])[0], "std": _clean([std])[0]}
+
+    def _trim_recent(self) -> None:
+        now = time.monotonic()
+        while self.recent and self.recent[0][0] < now - RATE_WINDOW:
+            self.recent.popleft()
+
+    def metrics(self) -> dict:
+        self._trim_recent()
+        now = time.monotonic()
+        uptime = now - self.started
+        span = min(RATE_WINDOW, uptime) or 1.0
+        seconds = sorted(s for s, _ in self.latencies)
+        per_point = sorted(s / n for s, n in self.latencies if n)
+        to_us = lambda v: round(v * 1e6, 2) if v is not None else None
+        return {
+            "uptime_seconds": round(uptime, 3),
+            "series": len(self.series),
+            "series_evicted": self.evicted,
+            "requests": self.requests,
+            "errors": self.errors,
+            "points": self.points,
+            "points_per_second": round(sum(n for _, n in self.recent) / span, 1),
+            "points_per_second_avg": round(self.points / uptime, 1) if uptime > 0 else 0.0,
+            # Time from the received body to the result (JSON decoding and scoring; not the network)
+            "latency_us": {"p50": to_us(_percentile(seconds, 0.50)), "p95": to_us(_percentile(seconds, 0.95)),
+                           "p99": to_us(_percentile(seconds, 0.99)), "max": to_us(seconds[-1] if seconds else None)},
+            "per_point_us": {"p50": to_us(_percentile(per_point, 0.50)), "p99": to_us(_percentile(per_point, 0.99))},
+        }
+
+    def route(self, method: str, path: str, body: bytes) -> dict:
+        """
+        Dispatch one request. Returns the JSON response; raises RequestError.
+        """
+        path = path.split("?", 1)[0].rstrip("/") or "/"
+        if path == "/score":
+            if method != "POST":
+                raise RequestError(405, "use POST /score.")
+            start = time.perf_counter()
+            try:
+                payload = json.loads(body or b"null")
+            except ValueError as e:
+                raise RequestError(400, f"invalid JSON: {e}")
+            return self.handle_score(payload, start)
+        if path.startswith("/series/"):
+            name = unquote(path[len("/series/"):])
+            if method == "DELETE":
+                return self.reset(name)
+            if method == "GET":
+                return self.describe(name)
+            raise RequestError(405, "use GET or DELETE /series/<name>.")
+        if path == "/metrics" and method == "GET":
+            return self.metrics()
+        if path == "/health" and method == "GET":
+            return {"status": "ok"}
+        raise RequestError(404, f"no route for {method} {path}.")
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    """
+    (method, path, headers, body) of the next HTTP/1.1 request, or None at end of stream.
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, path, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise RequestError(400, "malformed request line.")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise RequestError(400, "invalid Content-Length.")
+    if length > MAX_BODY:
+        raise RequestError(413, f"body larger than {MAX_BODY} bytes.")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, headers, body
+
+
+def _response(status: int, payload: dict, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + body
+
+
+def make_handler(service: ScoringService):
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # One connection carries many requests (keep-alive); clients should reuse it
+        try:
+            while True:
+                keep_alive = True
+                try:
+                    request = await _read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                    service.requests += 1
+                    status, payload = 200, service.route(method, path, body)
+                except RequestError as e:
+                    service.requests += 1
+                    service.errors += 1
+                    status, payload = e.status, {"error": str(e)}
+                    keep_alive = keep_alive and e.status not in (400, 413)
+                except asyncio.IncompleteReadError:
+                    break
+                except Exception as e:
+                    service.errors += 1
+                    status, payload, keep_alive = 500, {"error": f"{type(e).__name__}: {e}"}, False
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def serve(service: ScoringService, host: str = "127.0.0.1", port: int = 8765,
+                unix: str | None = None, ready=None) -> None:
+    """
+    Serve `service` on host:port, or on the Unix socket `unix`, until SIGINT/SIGTERM.
+    """
+    handler = make_handler(service)
+    if unix:
+        if os.path.exists(unix):
+            os.unlink(unix)
+        server = await asyncio.start_unix_server(handler, path=unix)
+    else:
+        server = await asyncio.start_server(handler, host=host, port=port)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    if ready is not None:
+        ready(server)
+    async with server:
+        await stop.wait()
+    if unix and os.path.exists(unix):
+        os.unlink(unix)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="timeseries-service",
+        description="Local anomaly-scoring service: POST micro-batches of readings per series, "
+                    "get outlier flags and rolling mean/std back.",
+        epilog="Routes: POST /score, GET|DELETE /series/<name>, GET /metrics, GET /health.",
+    )
+    where = parser.add_mutually_exclusive_group()
+    where.add_argument("--port", type=int, default=8765, help="TCP port (default 8765).")
+    where.add_argument("--unix", help="Serve on this Unix socket path instead of TCP.")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host (default 127.0.0.1, local only).")
+    parser.add_argument("--method", choices=METHODS, default="zscore", help="Default detector (default zscore).")
+    parser.add_argument("--sensitivity", choices=["low", "medium", "high"], default="medium",
+                        help="Default sensitivity, as in handle_outliers (default medium).")
+    parser.add_argument("--window", type=int, default=300, help="Default trailing window in readings (default 300).")
+    parser.add_argument("--min-periods", type=int, default=30,
+                        help="Readings before a series gets verdicts (default 30).")
+    parser.add_argument("--halflife", help='Time-based halflife for --method ewm, e.g. "5min" (needs "times").')
+    parser.add_argument("--max-series", type=int, default=MAX_SERIES,
+                        help=f"Series kept in memory, least recently used dropped first (default {MAX_SERIES}).")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        service = ScoringService(method=args.method, sensitivity=args.sensitivity, window=args.window,
+                                 min_periods=args.min_periods, halflife=args.halflife, max_series=args.max_series)
+    except ValueError as e:
+        print(f"[Args] {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    def ready(server):
+        where = args.unix or f"http://{args.host}:{args.port}"
+        print(f"[INFO] Scoring service on {where} ({args.method}, {args.sensitivity}, window {args.window})")
+
+    try:
+        asyncio.run(serve(service, host=args.host, port=args.port, unix=args.unix, ready=ready))
+    except OSError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return EXIT_USAGE
+    print(f"[INFO] Stopped after {service.points:,} readings in {service.requests:,} requests.")
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from urllib.parse import quote
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+class ServiceError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+class ServiceClient:
+    """
+    Async client for timeseries-service over one keep-alive connection
+    (TCP host:port or a Unix socket). Requests on one client are sent one at a time;
+    open several clients for concurrency.
+
+        async with ServiceClient(port=8765) as client:
+            result = await client.score("job42/cpu", [51.2, 50.9, 97.0])
+            result["outlier"]   # [False, False, True] once the series has history
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, unix: str | None = None):
+        self.host, self.port, self.unix = host, port, unix
+        self.reader = self.writer = None
+        self.lock = asyncio.Lock()
+
+    async def connect(self) -> "ServiceClient":
+        if self.unix:
+            self.reader, self.writer = await asyncio.open_unix_connection(self.unix)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+            self.reader = self.writer = None
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def request(self, method: str, path: str, payload=None) -> dict:
+        body = json.dumps(payload, separators=(",", ":")).encode() if payload is not None else b""
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n")
+        async with self.lock:
+            if self.writer is None:
+                await self.connect()
+            self.writer.write(head.encode() + body)
+            await self.writer.drain()
+            status_line = await self.reader.readline()
+            if not status_line:
+                await self.close()
+                raise ConnectionError("connection closed by the service.")
+            status = int(status_line.split()[1])
+            headers = {}
+            while True:
+                line = await self.reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+            data = await self.reader.readexactly(int(headers.get("content-length", 0)))
+            if headers.get("connection", "").lower() == "close":
+                await self.close()
+        result = json.loads(data) if data else {}
+        if status != 200:
+            raise ServiceError(status, result.get("error", ""))
+        return result
+
+    async def score(self, series: str, values: list, times: list | None = None, **settings) -> dict:
+        """
+        Score a micro-batch; `settings` (method, sensitivity, window, min_periods,
+        halflife) apply when the series is created.
+        """
+        batch = {"series": series, "values": values, **settings}
+        if times is not None:
+            batch["times"] = times
+        return await self.request("POST", "/score", batch)
+
+    async def score_many(self, batches: list[dict]) -> list[dict]:
+        return (await self.request("POST", "/score", {"batches": batches}))["results"]
+
+    async def reset(self, series: str) -> dict:
+        return await self.request("DELETE", f"/series/{quote(series, safe='')}")
+
+    async def metrics(self) -> dict:
+        return await self.request("GET", "/metrics")
+
+
+def _synthetic(rng: random.Random, state: dict, n: int, spike_rate: float) -> list[float]:
+    # Slowly drifting level with noise and occasional spikes, like a CPU reading
+    out = []
+    for _ in range(n):
+        state["level"] += rng.gauss(0.0, 0.05)
+        x = state["level"] + rng.gauss(0.0, 1.0)
+        if rng.random() < spike_rate:
+            x += rng.choice((-1, 1)) * rng.uniform(8.0, 15.0)
+        out.append(round(x, 4))
+    return out
+
+
+async def load_test(host: str = "127.0.0.1", port: int = 8765, unix: str | None = None,
+                    connections: int = 8, series: int = 64, batch: int = 100,
+                    duration: float = 10.0, spike_rate: float = 0.001, seed: int = 0,
+                    settings: dict | None = None) -> dict:
+    """
+    `connections` concurrent clients send `batch`-sized micro-batches round-robin
+    over `series` series ("load-<i>") for `duration` seconds.
+    Returns client-side throughput and round-trip latency, plus the service metrics.
+    """
+    rng = random.Random(seed)
+    levels = [{"level": 50.0 + 10 * rng.random()} for _ in range(series)]
+    names = [f"load-{i}" for i in range(series)]
+    latencies, counts = [], {"points": 0, "flags": 0, "errors": 0}
+    deadline = time.perf_counter() + duration
+
+    async def worker(k: int):
+        async with ServiceClient(host, port, unix) as client:
+            # Start from fresh state so reruns are comparable
+            for name in names[k::connections]:
+                try:
+                    await client.reset(name)
+                except ServiceError:
+                    pass
+            i = k
+            while time.perf_counter() < deadline:
+                s = i % series
+                i += connections
+                values = _synthetic(rng, levels[s], batch, spike_rate)
+                start = time.perf_counter()
+                try:
+                    result = await client.score(names[s], values, **(settings or {}))
+                except ServiceError:
+                    counts["errors"] += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+                counts["points"] += batch
+                counts["flags"] += sum(result["outlier"])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(k) for k in range(connections)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    pick = lambda q: round(latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1e3, 3) if latencies else None
+    async with ServiceClient(host, port, unix) as client:
+        server = await client.metrics()
+    return {
+        "seconds": round(elapsed, 3),
+        "requests": len(latencies),
+        "points": counts["points"],
+        "outliers": counts["flags"],
+        "errors": counts["errors"],
+        "points_per_second": round(counts["points"] / elapsed, 1) if elapsed > 0 else 0.0,
+        "round_trip_ms": {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)},
+        "round_trip_us_per_point": round(pick(0.50) * 1e3 / batch, 2) if latencies else None,
+        "service": server,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="timeseries-loadtest",
+        description="Load-test a local timeseries-service with synthetic micro-batches.",
+    )
+    where = parser.add_mutually_exclusive_group()
+    where.add_argument("--port", type=int, default=8765, help="TCP port (default 8765).")
+    where.add_argument("--unix", help="Unix socket path of the service.")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host (default 127.0.0.1).")
+    parser.add_argument("-c", "--connections", type=int, default=8, help="Concurrent connections (default 8).")
+    parser.add_argument("--series", type=int, default=64, help="Distinct series (default 64).")
+    parser.add_argument("--batch", type=int, default=100, help="Readings per request (default 100).")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="Seconds to run (default 10).")
+    parser.add_argument("--spike-rate", type=float, default=0.001, help="Share of injected spikes (default 0.001).")
+    parser.add_argument("--method", help="Detector for the test series (default: the service's).")
+    parser.add_argument("--json", action="store_true", help="Print the full result as JSON.")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if min(args.connections, args.series, args.batch) <= 0 or args.duration <= 0:
+        print("[Args] --connections, --series, --batch and --duration must be > 0.", file=sys.stderr)
+        return EXIT_USAGE
+    try:
+        result = asyncio.run(load_test(
+            host=args.host, port=args.port, unix=args.unix, connections=args.connections,
+            series=args.series, batch=args.batch, duration=args.duration, spike_rate=args.spike_rate,
+            settings={"method": args.method} if args.method else None,
+        ))
+    except (OSError, ServiceError) as e:
+        print(f"[ERROR] Could not reach the service: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    if args.json:
+        print(json.dumps(result, indent=1))
+    else:
+        rt, svc = result["round_trip_ms"], result["service"]
+        print(f"[INFO] {result['points']:,} readings in {result['requests']:,} requests over {result['seconds']}s "
+              f"-> {result['points_per_second']:,.0f} readings/s, {result['outliers']:,} flagged, "
+              f"{result['errors']} errors")
+        print(f"[INFO] round trip p50 {rt['p50']} ms, p95 {rt['p95']} ms, p99 {rt['p99']} ms "
+              f"({result['round_trip_us_per_point']} us/reading)")
+        print(f"[INFO] service: p50 {svc['latency_us']['p50']} us, p99 {svc['latency_us']['p99']} us per request, "
+              f"{svc['per_point_us']['p50']} us/reading")
+    return EXIT_FAILED if result["errors"] else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
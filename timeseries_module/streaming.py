@@ -0,0 +1,188 @@
+import math
+from bisect import bisect_left, insort
+from collections import deque
+
+from .outliers.interface import _SENSITIVITY
+from .rolling.methods.ewm import EWMState
+
+__all__ = [
+    "METHODS",
+    "StreamDetector",
+]
+
+# Streaming counterparts of remove_outliers_zscore / remove_outliers_iqr, plus an EW z-score
+METHODS = ("zscore", "iqr", "ewm")
+_RESUM_EVERY = 100_000   # readings between exact recomputations of the running sums
+
+
+def _quantile(ordered: list, q: float) -> float:
+    """
+    Linear-interpolated quantile of a sorted list (pandas' default method).
+    """
+    pos = (len(ordered) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+class StreamDetector:
+    """
+    Outlier verdicts and rolling statistics for one live series, one reading at a time.
+
+    The thresholds are the `handle_outliers` sensitivity presets
+    ("low" | "medium" | "high"), applied over a trailing window:
+      - "zscore": |x - mean| / std > z_threshold, mean and population std of
+        the previous `window` readings (like remove_outliers_zscore on that window)
+      - "iqr": x outside [Q1 - iqr_k * IQR, Q3 + iqr_k * IQR] of the previous
+        `window` readings (like remove_outliers_iqr)
+      - "ewm": |EW z-score| > z_threshold, EW statistics with span=`window`
+        or `halflife` (rows, or a time span such as "5min" with timestamps)
+
+    A reading is judged against the history before it, so a spike does not
+    hide itself; no verdict is given before `min_periods` readings. The
+    detector statistics see every reading (as the batch detectors do), while
+    the returned rolling mean/std cover only the readings that were kept, the
+    way the pipeline computes rolling features after removing outliers
+    (population std, like compute_rolling's rolling_std). O(1) per reading for
+    zscore/ewm, O(window) memmove for iqr.
+    """
+
+    def __init__(self, method: str = "zscore", sensitivity: str = "medium", window: int = 300,
+                 min_periods: int = 30, halflife=None):
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {METHODS}.")
+        if int(window) < 2:
+            raise ValueError("Please provide a 'window' of at least 2 readings.")
+        if str(sensitivity).lower() not in _SENSITIVITY:
+            raise ValueError(f"sensitivity must be one of {tuple(_SENSITIVITY)}.")
+        cfg = _SENSITIVITY[str(sensitivity).lower()]
+        self.method = method
+        self.sensitivity = str(sensitivity).lower()
+        self.window = int(window)
+        self.min_periods = max(int(min_periods), 2)
+        self.threshold = cfg["iqr_k"] if method == "iqr" else cfg["z_threshold"]
+        self.halflife = halflife
+        self.count = 0
+
+        if method == "ewm":
+            self.ewm_all = EWMState(halflife=halflife) if halflife is not None else EWMState(span=self.window)
+            self.ewm_kept = EWMState(halflife=halflife) if halflife is not None else EWMState(span=self.window)
+            return
+        self.values = deque()          # (value, kept) in arrival order
+        self.ordered = []              # window values, sorted (iqr only)
+        # Sums are taken around the first value so they do not cancel for large offsets
+        self.offset = None
+        self.n = self.s = self.ss = 0.0
+        self.n_kept = self.s_kept = self.ss_kept = 0.0
+
+    @property
+    def time_based(self) -> bool:
+        return self.method == "ewm" and self.ewm_all.time_based
+
+    def settings(self) -> dict:
+        return {"method": self.method, "sensitivity": self.sensitivity, "window": self.window,
+                "min_periods": self.min_periods, "halflife": self.halflife}
+
+    def _score(self, value: float) -> float:
+        """
+        Distance of `value` from the window, in units of the method's threshold scale.
+        """
+        if self.n < self.min_periods:
+            return math.nan
+        if self.method == "zscore":
+            mean = self.s / self.n
+            var = max(self.ss / self.n - mean * mean, 0.0)
+            return abs(value - self.offset - mean) / math.sqrt(var) if var > 0 else math.nan
+        q1, q3 = _quantile(self.ordered, 0.25), _quantile(self.ordered, 0.75)
+        iqr = q3 - q1
+        if iqr <= 0:
+            return math.nan
+        # 0 inside the box, else how many IQRs beyond it (flagged past iqr_k)
+        return max(q1 - value, value - q3, 0.0) / iqr
+
+    def update(self, value: float, t=None) -> tuple:
+        """
+        Add one reading (observed at `t`, needed for a time-based halflife).
+        Returns (outlier, score, mean, std); NaN readings are never outliers and change nothing
+        but the EW decay.
+        """
+        if self.method == "ewm":
+            z = self.ewm_all.update(value, t).zscore
+            outlier = self.count >= self.min_periods and abs(z) > self.threshold
+            if value == value:
+                self.count += 1
+            kept = self.ewm_kept.update(math.nan if outlier else value, t)
+            return outlier, abs(z), kept.mean, kept.std
+        if value != value:
+            return False, math.nan, *self.stats()
+
+        score = self._score(value)
+        outlier = score > self.threshold
+        if self.offset is None:
+            self.offset = value
+        x = value - self.offset
+        self.values.append((value, not outlier))
+        self.n += 1
+        self.s += x
+        self.ss += x * x
+        if not outlier:
+            self.n_kept += 1
+            self.s_kept += x
+            self.ss_kept += x * x
+        if self.method == "iqr":
+            insort(self.ordered, value)
+        if len(self.values) > self.window:
+            self._evict()
+        self.count += 1
+        if self.count % _RESUM_EVERY == 0:
+            self._resum()
+        return outlier, score, *self.stats()
+
+    def _resum(self) -> None:
+        # Running add/subtract accumulates rounding error over a long stream; start over from the window
+        self.offset = self.values[-1][0]
+        xs = [(v - self.offset, kept) for v, kept in self.values]
+        self.n, self.s, self.ss = float(len(xs)), sum(x for x, _ in xs), sum(x * x for x, _ in xs)
+        kept = [x for x, k in xs if k]
+        self.n_kept, self.s_kept, self.ss_kept = float(len(kept)), sum(kept), sum(x * x for x in kept)
+
+    def _evict(self) -> None:
+        old, kept = self.values.popleft()
+        x = old - self.offset
+        self.n -= 1
+        self.s -= x
+        self.ss -= x * x
+        if kept:
+            self.n_kept -= 1
+            self.s_kept -= x
+            self.ss_kept -= x * x
+        if self.method == "iqr":
+            del self.ordered[bisect_left(self.ordered, old)]
+
+    def stats(self) -> tuple:
+        """
+        (mean, std) of the kept readings in the window.
+        """
+        if self.method == "ewm":
+            stats = self.ewm_kept.stats()
+            return stats.mean, stats.std
+        if self.n_kept == 0:
+            return math.nan, math.nan
+        mean = self.s_kept / self.n_kept
+        return mean + self.offset, math.sqrt(max(self.ss_kept / self.n_kept - mean * mean, 0.0))
+
+    def update_many(self, values, times=None) -> dict:
+        """
+        Score a micro-batch in order. Returns {"outlier", "score", "mean", "std"} lists.
+        Readings are converted up front, so a bad value raises before any state changes.
+        """
+        values = [math.nan if v is None else float(v) for v in values]
+        out = {"outlier": [], "score": [], "mean": [], "std": []}
+        times = times if times is not None else [None] * len(values)
+        for value, t in zip(values, times):
+            outlier, score, mean, std = self.update(value, t)
+            out["outlier"].append(bool(outlier))
+            out["score"].append(score)
+            out["mean"].append(mean)
+            out["std"].append(std)
+        return out